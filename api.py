@@ -0,0 +1,332 @@
+# api.py - Headless REST/WebSocket API for MindCare Pro, separate from the Streamlit UI
+#
+# Every worker process loads the models once (model_registry) and keeps its
+# sessions in memory. Run several workers, each on its own port with its own
+# MINDCARE_WORKER_ID. Session ids start with "<worker id>-", and the load
+# balancer routes /sessions/<id>/... to that worker (new sessions can go
+# anywhere):
+#
+#   MINDCARE_WORKER_ID=w1 uvicorn api:app --port 8001 &
+#   MINDCARE_WORKER_ID=w2 uvicorn api:app --port 8002 &
+#
+# Accounts (MINDCARE_USER_DB) are shared by all workers through SQLite.
+# Mood logs (MINDCARE_MOOD_DATA_DIR) are not: each worker keeps a user's
+# logs in memory and rewrites the whole month file from that copy when a
+# mood is logged, and never re-reads files another worker wrote. With
+# mood persistence on, every session of a given user must be served by
+# the same worker (or run a single worker), or their logs overwrite each
+# other.
+import asyncio
+import os
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+import metrics
+import model_registry
+from assessments import INSTRUMENTS
+from chat_pipeline import ChatPipeline
+from dialogue_generator import DialogueSession
+from mental_health_bot import MentalHealthChatbot
+from state_backend import InMemoryStateStore
+from user_integrated import UserManager
+
+WORKER_ID = os.environ.get("MINDCARE_WORKER_ID", "")
+sessions = InMemoryStateStore(
+    ttl_seconds=float(os.environ.get("MINDCARE_SESSION_TTL", "3600")),
+    id_prefix=f"{WORKER_ID}-" if WORKER_ID else "",
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if os.environ.get("MINDCARE_WARMUP") == "eager":
+        await asyncio.get_running_loop().run_in_executor(None, model_registry.warm_up)
+    else:
+        model_registry.start_warm_up()
+    yield
+
+
+app = FastAPI(title="MindCare Pro API", lifespan=lifespan)
+
+
+class Credentials(BaseModel):
+    username: str
+    password: str
+    email: str = ""
+
+
+class MoodIn(BaseModel):
+    score: int = Field(ge=1, le=10)
+    emotion: str = "general"
+    notes: str = ""
+
+
+class JournalIn(BaseModel):
+    title: str = Field(min_length=1)
+    content: str = Field(min_length=1)
+    mood_score: int = Field(5, ge=1, le=10)
+    tags: List[str] = []
+
+
+class ChatIn(BaseModel):
+    message: str = Field(min_length=1)
+    generate: bool = False
+
+
+class AssessmentIn(BaseModel):
+    responses: List[int]
+    notes: str = ""
+
+
+@contextmanager
+def session_state(session_id: str):
+    """Lock a session's state for one request; 404 if it does not exist"""
+    if session_id not in sessions:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    with sessions.session(session_id) as state:
+        yield state
+
+
+def chatbot_for(state) -> MentalHealthChatbot:
+    """Per-session helpers, created on first use like main() does in the UI"""
+    if 'chatbot' not in state:
+        state.chatbot = MentalHealthChatbot(state)
+        state.dialogue_session = DialogueSession()
+        state.chat_pipeline = ChatPipeline(state.chatbot)
+    return state.chatbot
+
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "worker_id": WORKER_ID,
+        "sessions": len(sessions),
+        "model_state": model_registry.registry.state(),
+        "models": model_registry.registry.stats(),
+        "warm_up": model_registry.registry.warm_up_info,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """This worker's metrics in the Prometheus text format"""
+    metrics.registry.gauge("mindcare_api_sessions", "Live sessions on this worker").set(len(sessions))
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/sessions", status_code=201)
+def create_session():
+    return {"session_id": sessions.create()}
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+def delete_session(session_id: str):
+    sessions.delete(session_id)
+
+
+# Accounts
+
+@app.post("/sessions/{session_id}/register", status_code=201)
+def register(session_id: str, credentials: Credentials):
+    with session_state(session_id) as state:
+        if not UserManager(state=state).create_user(credentials.username, credentials.email, credentials.password):
+            raise HTTPException(status_code=409, detail="Username already exists")
+    return {"username": credentials.username}
+
+
+@app.post("/sessions/{session_id}/login")
+def login(session_id: str, credentials: Credentials):
+    with session_state(session_id) as state:
+        if not UserManager(state=state).authenticate_user(credentials.username, credentials.password):
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+        return {"user_id": state.current_user}
+
+
+@app.post("/sessions/{session_id}/demo")
+def demo(session_id: str):
+    with session_state(session_id) as state:
+        UserManager(state=state).start_demo_session()
+        return {"user_id": state.current_user}
+
+
+@app.post("/sessions/{session_id}/logout")
+def logout(session_id: str):
+    with session_state(session_id) as state:
+        UserManager(state=state).logout_user()
+    return {"logged_out": True}
+
+
+# Mood
+
+@app.post("/sessions/{session_id}/mood", status_code=201)
+def log_mood(session_id: str, mood: MoodIn):
+    with session_state(session_id) as state:
+        chatbot_for(state).mood_tracker.log_mood(mood.score, mood.emotion, mood.notes)
+    return {"logged": True}
+
+
+@app.get("/sessions/{session_id}/mood")
+def mood_summary(session_id: str, days: int = Query(7, ge=1, le=365)):
+    with session_state(session_id) as state:
+        tracker = chatbot_for(state).mood_tracker
+        window = tracker.get_mood_window(days)
+        return {
+            "days": days,
+            "count": window.count,
+            "mean": window.mean if not window.empty else None,
+            "most_common_emotion": window.most_common_emotion,
+            "trend": tracker.get_mood_trend(days),
+            "daily": [{"date": day, "mean": mean, "emotion": emotion} for day, mean, emotion in window.daily()],
+        }
+
+
+# Journal
+
+@app.post("/sessions/{session_id}/journal", status_code=201)
+def add_journal_entry(session_id: str, entry: JournalIn):
+    with session_state(session_id) as state:
+        entry_id = chatbot_for(state).journal_manager.add_entry(entry.title, entry.content, entry.mood_score, entry.tags)
+    return {"id": entry_id}
+
+
+@app.get("/sessions/{session_id}/journal")
+def list_journal_entries(session_id: str, limit: int = Query(10, ge=1, le=100),
+                         before_ts: Optional[float] = None, before_id: Optional[int] = None):
+    """Summaries newest first; pass next_cursor back as before_ts/before_id"""
+    before = (before_ts, before_id) if before_ts is not None and before_id is not None else None
+    with session_state(session_id) as state:
+        entries, cursor = chatbot_for(state).journal_manager.get_entries(limit, before=before)
+    return {"entries": entries, "next_cursor": {"before_ts": cursor[0], "before_id": cursor[1]} if cursor else None}
+
+
+@app.get("/sessions/{session_id}/journal/search")
+def search_journal(session_id: str, q: str = Query(..., min_length=1), semantic: bool = False,
+                   limit: int = Query(20, ge=1, le=100)):
+    with session_state(session_id) as state:
+        return {"entries": chatbot_for(state).journal_manager.search_entries(q, limit=limit, semantic=semantic)}
+
+
+@app.get("/sessions/{session_id}/journal/stats")
+def journal_stats(session_id: str):
+    with session_state(session_id) as state:
+        chatbot_for(state)
+        stats = state.journal_store.stats
+        return {
+            "entries": stats.entry_count,
+            "total_words": stats.total_words,
+            "avg_words": stats.avg_words,
+            "avg_mood": stats.avg_mood,
+            "days_journaling": stats.days_journaling,
+            "top_tags": stats.tag_counts.most_common(5),
+        }
+
+
+@app.get("/sessions/{session_id}/journal/{entry_id}")
+def get_journal_entry(session_id: str, entry_id: int):
+    with session_state(session_id) as state:
+        try:
+            return chatbot_for(state).journal_manager.get_entry(entry_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Unknown journal entry") from None
+
+
+@app.delete("/sessions/{session_id}/journal/{entry_id}", status_code=204)
+def delete_journal_entry(session_id: str, entry_id: int):
+    with session_state(session_id) as state:
+        try:
+            chatbot_for(state).journal_manager.delete_entry(entry_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Unknown journal entry") from None
+
+
+# Assessments
+
+@app.post("/sessions/{session_id}/assessments/{instrument_key}", status_code=201)
+def take_assessment(session_id: str, instrument_key: str, assessment: AssessmentIn):
+    """Score a PHQ-9 or GAD-7; stored on the profile when a user is logged in"""
+    instrument = INSTRUMENTS.get(instrument_key)
+    if instrument is None:
+        raise HTTPException(status_code=404, detail=f"Unknown instrument; use one of {sorted(INSTRUMENTS)}")
+    if len(assessment.responses) != len(instrument.questions):
+        raise HTTPException(status_code=422, detail=f"{instrument.name} needs {len(instrument.questions)} responses")
+    if any(not 0 <= response <= instrument.max_response for response in assessment.responses):
+        raise HTTPException(status_code=422, detail=f"Responses must be 0-{instrument.max_response}")
+    with session_state(session_id) as state:
+        user_manager = UserManager(state=state)
+        profile = user_manager.get_current_user_profile()
+        if profile is not None:
+            result = profile.add_assessment(instrument.key, assessment.responses, assessment.notes)
+            user_manager.save_profile(profile)
+        else:
+            result = {"responses": assessment.responses, **instrument.score(assessment.responses)}
+    return {**result, "stored": profile is not None}
+
+
+# Chat
+
+@app.post("/sessions/{session_id}/chat")
+def chat(session_id: str, message: ChatIn):
+    """The whole reply at once; use the WebSocket endpoint to stream it"""
+    with session_state(session_id) as state:
+        chatbot_for(state)
+        turn = state.chat_pipeline.submit(message.message, state.dialogue_session, message.generate)
+    reply = "".join(turn)
+    return {"reply": reply, "emotion": turn.emotion, "cancelled": turn.cancelled, "trace": turn.trace.summary()}
+
+
+async def _stream_turn(websocket: WebSocket, turn):
+    # The pipeline's loop thread hands each chunk over to this loop
+    async for chunk in turn.stream():
+        await websocket.send_json({"type": "chunk", "text": chunk})
+    await websocket.send_json({
+        "type": "done",
+        "emotion": turn.emotion,
+        "cancelled": turn.cancelled,
+        "trace": turn.trace.summary(),
+    })
+
+
+@app.websocket("/sessions/{session_id}/chat/ws")
+async def chat_ws(websocket: WebSocket, session_id: str):
+    """Send {"message", "generate"}; receive "chunk" messages and a final "done"
+
+    A new message cancels the reply still streaming for the previous one.
+    """
+    await websocket.accept()
+    if session_id not in sessions:
+        await websocket.close(code=4404, reason="Unknown or expired session")
+        return
+
+    def submit(message: str, generate: bool):
+        # Under the session lock, like the REST endpoints; blocks, so off the loop
+        with session_state(session_id) as state:
+            chatbot_for(state)
+            return state.chat_pipeline.submit(message, state.dialogue_session, generate)
+
+    loop = asyncio.get_running_loop()
+    turn = streaming = None
+    try:
+        while True:
+            data = await websocket.receive_json()
+            message = str(data.get("message", "")).strip()
+            if not message:
+                await websocket.send_json({"type": "error", "detail": "Empty message"})
+                continue
+            if streaming is not None:
+                streaming.cancel()
+            try:
+                turn = await loop.run_in_executor(None, submit, message, bool(data.get("generate")))
+            except HTTPException:
+                await websocket.close(code=4404, reason="Unknown or expired session")
+                return
+            streaming = asyncio.create_task(_stream_turn(websocket, turn))
+    except WebSocketDisconnect:
+        if turn is not None:
+            turn.cancel()
+        if streaming is not None:
+            streaming.cancel()
@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 st.set_page_config(
     page_title="MindCare Pro - Mental Health Support",
@@ -5,14 +6,33 @@ st.set_page_config(
     layout="wide"
 )
 
+# Only light modules here: the login page must render without loading
+# torch, transformers, pandas or plotly (benchmarks/bench_import_time.py)
 from user_integrated import check_user_authentication
-from mental_health_bot import main as mindcare_main
+from ui_styles import inject_css
+import model_registry
+import metrics
 
 def run_app():
+    inject_css()
+    # MINDCARE_METRICS_PORT: Prometheus /metrics for this process
+    metrics.serve_from_env()
+    
+    # Models are shared by every session in this process. By default they
+    # load on a background thread while the login page and the template
+    # replies are served; MINDCARE_WARMUP=eager loads them before the first
+    # page renders
+    if os.environ.get("MINDCARE_WARMUP") == "eager":
+        with st.spinner("Loading AI models..."):
+            model_registry.start_warm_up("eager")
+    else:
+        model_registry.start_warm_up()
+    
     try:
         # User authentication and onboarding
         if check_user_authentication():
             st.info("Loading MindCare Pro...")
+            from mental_health_bot import main as mindcare_main
             mindcare_main()
     except Exception as e:
         st.error(f"An error occurred: {e}")
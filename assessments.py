@@ -0,0 +1,314 @@
+# assessments.py - Compiled screening instruments (PHQ-9, GAD-7) and vectorized batch scoring
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+RESPONSE_OPTIONS = ("Not at all", "Several days", "More than half the days", "Nearly every day")
+UNKNOWN_SEVERITY = -1
+_UNKNOWN_INFO = {"level": "Unknown", "color": "#6c757d", "description": "Score out of range"}
+DEFAULT_RECOMMENDATIONS = ("Please consult with a mental health professional",)
+
+
+class Band(NamedTuple):
+    """One severity band of an instrument, with the text shown for it"""
+    low: int
+    high: int
+    level: str
+    color: str
+    description: str
+    alert: str                       # Streamlit status call: success, info, warning or error
+    summary: str                     # one-sentence interpretation
+    recommendations: Tuple[str, ...]
+    next_steps: Tuple[str, ...]
+
+
+class ScoreBatch(NamedTuple):
+    """Per-row results of Instrument.score_batch"""
+    totals: "np.ndarray"     # int16 total scores
+    severity: "np.ndarray"   # int8 band codes; UNKNOWN_SEVERITY for invalid rows
+    risk: "np.ndarray"       # bool, the risk item answered above 0 (all False without one)
+    valid: "np.ndarray"      # bool, every response within range
+
+
+class Instrument(NamedTuple):
+    """An immutable, compiled questionnaire; build it with compile_instrument
+
+    ``band_by_score`` maps every possible total to its band code, so
+    scoring never searches the bands.
+    """
+    key: str
+    name: str
+    condition: str
+    prompt: str
+    questions: Tuple[str, ...]
+    options: Tuple[str, ...]
+    bands: Tuple[Band, ...]
+    risk_item: Optional[int]
+    max_score: int
+    band_by_score: Tuple[int, ...]
+
+    @property
+    def max_response(self) -> int:
+        return len(self.options) - 1
+
+    @property
+    def levels(self) -> Tuple[str, ...]:
+        return tuple(band.level for band in self.bands)
+
+    def band_code(self, score: int) -> int:
+        """Index into ``bands``, or UNKNOWN_SEVERITY if out of range"""
+        if 0 <= score <= self.max_score:
+            return self.band_by_score[score]
+        return UNKNOWN_SEVERITY
+
+    def band(self, score: int) -> Optional[Band]:
+        code = self.band_code(score)
+        return self.bands[code] if code != UNKNOWN_SEVERITY else None
+
+    def label(self, score: int) -> str:
+        """e.g. "Moderate Depression\""""
+        band = self.band(score)
+        return f"{band.level} {self.condition}" if band else "Unknown"
+
+    def severity_info(self, score: int) -> Dict:
+        """Level, color and description for a total score"""
+        band = self.band(score)
+        if band is None:
+            return {**_UNKNOWN_INFO, "score": score}
+        return {"level": band.level, "color": band.color, "description": band.description, "score": score}
+
+    def recommendations(self, score: int) -> List[str]:
+        band = self.band(score)
+        return list(band.recommendations if band else DEFAULT_RECOMMENDATIONS)
+
+    def score(self, responses: List[int]) -> Dict:
+        """Total, severity, risk flag and recommendations of one assessment"""
+        if len(responses) != len(self.questions):
+            raise ValueError(f"{self.name} needs {len(self.questions)} responses, got {len(responses)}")
+        total = sum(responses)
+        return {
+            "instrument": self.key,
+            "total_score": total,
+            "severity": self.severity_info(total)["level"],
+            "risk": self.risk_item is not None and responses[self.risk_item] > 0,
+            "recommendations": self.recommendations(total),
+        }
+
+    def score_batch(self, responses) -> ScoreBatch:
+        """Score an (N, items) integer array of responses in one vectorized pass
+
+        Rows with a response out of range get severity UNKNOWN_SEVERITY and
+        valid False; their totals are still the plain row sums. Store the
+        responses as uint8 to keep millions of rows small.
+        """
+        # numpy loads with the first batch, not with the login page
+        import numpy as np
+        responses = np.asarray(responses)
+        items = len(self.questions)
+        if responses.ndim != 2 or responses.shape[1] != items:
+            raise ValueError(f"Expected an (N, {items}) array, got shape {responses.shape}")
+        if not np.issubdtype(responses.dtype, np.integer):
+            raise ValueError(f"Expected integer responses, got {responses.dtype}")
+
+        if np.issubdtype(responses.dtype, np.unsignedinteger):
+            valid = (responses <= self.max_response).all(axis=1)
+        else:
+            valid = ((responses >= 0) & (responses <= self.max_response)).all(axis=1)
+        totals = responses.sum(axis=1, dtype=np.int16)
+        severity = _band_table(self)[np.clip(totals, 0, self.max_score)]
+        severity[~valid] = UNKNOWN_SEVERITY
+        if self.risk_item is not None:
+            risk = responses[:, self.risk_item] > 0
+        else:
+            risk = np.zeros(len(responses), dtype=bool)
+        return ScoreBatch(totals, severity, risk, valid)
+
+    def cohort_summary(self, batch: ScoreBatch) -> Dict:
+        """Band distribution, mean score and risk-item rate of a scored cohort"""
+        import numpy as np
+        valid = batch.valid
+        count = int(valid.sum())
+        counts = np.bincount(batch.severity[valid].astype(np.intp), minlength=len(self.bands))
+        return {
+            "instrument": self.key,
+            "assessments": int(len(valid)),
+            "valid": count,
+            "invalid": int(len(valid)) - count,
+            "mean_score": float(batch.totals[valid].mean()) if count else None,
+            "severity_counts": {level: int(n) for level, n in zip(self.levels, counts)},
+            "risk": int(batch.risk[valid].sum()),
+            "risk_rate": float(batch.risk[valid].mean()) if count else None,
+        }
+
+
+def compile_instrument(key: str, name: str, condition: str, prompt: str, questions, bands,
+                       options=RESPONSE_OPTIONS, risk_item: Optional[int] = None) -> Instrument:
+    """Freeze a definition and precompute its score-to-band table"""
+    questions, options, bands = tuple(questions), tuple(options), tuple(bands)
+    max_score = len(questions) * (len(options) - 1)
+    band_by_score = []
+    for score in range(max_score + 1):
+        codes = [code for code, band in enumerate(bands) if band.low <= score <= band.high]
+        if len(codes) != 1:
+            raise ValueError(f"{name}: score {score} falls in {len(codes)} bands")
+        band_by_score.append(codes[0])
+    return Instrument(key, name, condition, prompt, questions, options, bands, risk_item,
+                      max_score, tuple(band_by_score))
+
+
+_band_tables: Dict[str, "np.ndarray"] = {}
+
+
+def _band_table(instrument: Instrument):
+    table = _band_tables.get(instrument.key)
+    if table is None:
+        import numpy as np
+        table = _band_tables[instrument.key] = np.array(instrument.band_by_score, dtype=np.int8)
+    return table
+
+
+PHQ9 = compile_instrument(
+    key="phq9",
+    name="PHQ-9",
+    condition="Depression",
+    prompt="Over the last 2 weeks, how often have you been bothered by any of the following problems?",
+    questions=[
+        "Little interest or pleasure in doing things",
+        "Feeling down, depressed, or hopeless",
+        "Trouble falling or staying asleep, or sleeping too much",
+        "Feeling tired or having little energy",
+        "Poor appetite or overeating",
+        "Feeling bad about yourself or that you are a failure or have let yourself or your family down",
+        "Trouble concentrating on things, such as reading the newspaper or watching television",
+        "Moving or speaking so slowly that other people could have noticed. Or the opposite - being so fidgety or restless that you have been moving around a lot more than usual",
+        "Thoughts that you would be better off dead, or of hurting yourself",
+    ],
+    # Item 9 asks about self-harm; any answer above 0 needs follow-up
+    risk_item=8,
+    bands=[
+        Band(0, 4, "Minimal", "#28a745", "Minimal depression symptoms", "success",
+             "Your scores suggest minimal depression. Continue with healthy lifestyle practices and monitor your mood.",
+             ("Continue with your current self-care practices",
+              "Regular exercise and social connections are great for maintaining mental health",
+              "Consider journaling to track your mood patterns",
+              "Practice gratitude exercises daily"),
+             ("Continue regular exercise and healthy sleep habits",
+              "Practice stress management techniques",
+              "Stay connected with friends and family")),
+        Band(5, 9, "Mild", "#ffc107", "Mild depression symptoms", "info",
+             "Your scores suggest mild depression. Consider lifestyle changes and monitoring your symptoms.",
+             ("Try incorporating more physical activity into your routine",
+              "Consider talking to a counselor or therapist",
+              "Practice stress-reduction techniques like meditation",
+              "Maintain regular sleep and eating schedules",
+              "Stay connected with supportive friends and family"),
+             ("Consider counseling or therapy",
+              "Increase physical activity and social engagement",
+              "Practice mindfulness or meditation",
+              "Monitor symptoms over time")),
+        Band(10, 14, "Moderate", "#fd7e14", "Moderate depression symptoms", "warning",
+             "Your scores suggest moderate depression. It's recommended to seek professional help.",
+             ("It's recommended to speak with a mental health professional",
+              "Consider therapy (CBT has shown great results for depression)",
+              "Regular exercise can be as effective as medication for mild-moderate depression",
+              "Practice mindfulness and stress-reduction techniques",
+              "Avoid alcohol and drugs as they can worsen symptoms"),
+             ("Schedule an appointment with a mental health professional",
+              "Consider therapy (CBT, interpersonal therapy)",
+              "Discuss treatment options with your doctor",
+              "Join a support group")),
+        Band(15, 19, "Moderately Severe", "#dc3545", "Moderately severe depression symptoms", "warning",
+             "Your scores suggest moderately severe depression. Professional treatment is strongly recommended.",
+             ("Please consider seeing a mental health professional soon",
+              "A combination of therapy and medication may be helpful",
+              "Reach out to trusted friends, family, or support groups",
+              "Create a safety plan if you're having thoughts of self-harm",
+              "Consider intensive outpatient programs if available"),
+             ("Seek immediate professional help",
+              "Consider both therapy and medication",
+              "Involve trusted friends or family in your care",
+              "Create a safety plan")),
+        Band(20, 27, "Severe", "#721c24", "Severe depression symptoms", "error",
+             "Your scores suggest severe depression. Immediate professional intervention is recommended.",
+             ("Please seek professional help immediately",
+              "Contact a mental health crisis line if needed",
+              "Consider inpatient treatment if you're having suicidal thoughts",
+              "Inform a trusted person about how you're feeling",
+              "Create a comprehensive safety plan with professional help"),
+             ("Seek immediate professional help",
+              "Consider intensive treatment options",
+              "Contact crisis resources if needed",
+              "Don't face this alone - reach out for support")),
+    ],
+)
+
+GAD7 = compile_instrument(
+    key="gad7",
+    name="GAD-7",
+    condition="Anxiety",
+    prompt="Over the last 2 weeks, how often have you been bothered by the following problems?",
+    questions=[
+        "Feeling nervous, anxious, or on edge",
+        "Not being able to stop or control worrying",
+        "Worrying too much about different things",
+        "Trouble relaxing",
+        "Being so restless that it is hard to sit still",
+        "Becoming easily annoyed or irritable",
+        "Feeling afraid, as if something awful might happen",
+    ],
+    bands=[
+        Band(0, 4, "Minimal", "#28a745", "Minimal anxiety symptoms", "success",
+             "Your scores suggest minimal anxiety. Keep up the habits that help you feel steady.",
+             ("Continue with your current self-care practices",
+              "Keep a regular sleep schedule and limit caffeine",
+              "Notice what situations raise your stress"),
+             ("Continue regular exercise and healthy sleep habits",
+              "Practice relaxation techniques when you feel tense")),
+        Band(5, 9, "Mild", "#ffc107", "Mild anxiety symptoms", "info",
+             "Your scores suggest mild anxiety. Self-help strategies and monitoring are a good start.",
+             ("Practice breathing or grounding exercises daily",
+              "Try scheduling a short 'worry time' instead of worrying all day",
+              "Regular physical activity can lower anxiety",
+              "Talk to someone you trust about what worries you"),
+             ("Monitor symptoms over time",
+              "Consider counseling if symptoms persist")),
+        Band(10, 14, "Moderate", "#fd7e14", "Moderate anxiety symptoms", "warning",
+             "Your scores suggest moderate anxiety. It's recommended to talk to a mental health professional.",
+             ("It's recommended to speak with a mental health professional",
+              "Cognitive behavioral therapy (CBT) is effective for anxiety",
+              "Practice relaxation and mindfulness techniques regularly",
+              "Avoid alcohol and limit caffeine, which can worsen anxiety"),
+             ("Schedule an appointment with a mental health professional",
+              "Discuss treatment options with your doctor")),
+        Band(15, 21, "Severe", "#721c24", "Severe anxiety symptoms", "error",
+             "Your scores suggest severe anxiety. Professional treatment is strongly recommended.",
+             ("Please seek professional help soon",
+              "A combination of therapy and medication may be helpful",
+              "Reach out to trusted friends or family for support",
+              "Contact a crisis line if your anxiety feels unmanageable"),
+             ("Seek professional help",
+              "Consider both therapy and medication",
+              "Contact crisis resources if needed")),
+    ],
+)
+
+INSTRUMENTS: Dict[str, Instrument] = {PHQ9.key: PHQ9, GAD7.key: GAD7}
+
+
+def get_instrument(key: str) -> Instrument:
+    try:
+        return INSTRUMENTS[key]
+    except KeyError:
+        raise KeyError(f"Unknown instrument: {key}") from None
+
+
+# PHQ-9 shortcuts used by the depression screening paths
+PHQ9_QUESTIONS = PHQ9.questions
+PHQ9_RESPONSE_OPTIONS = dict(enumerate(PHQ9.options))
+SEVERITY_NAMES = PHQ9.levels
+severity_info = PHQ9.severity_info
+recommendations = PHQ9.recommendations
+score_phq9 = PHQ9.score
+score_phq9_batch = PHQ9.score_batch
+cohort_summary = PHQ9.cohort_summary
@@ -0,0 +1,114 @@
+# bench_breathing_sessions.py - Server threads held by concurrent breathing exercises
+#
+# Models the server as a fixed pool of script-run workers. Each of N users
+# starts a breathing exercise:
+#   sleep   - the previous loop: one script run sleeps through every count
+#             (durations scaled by --time-scale so the run stays short)
+#   client  - the current timer: one script run renders the component and a
+#             second one records the completion event sent by the browser
+# While the exercises are running, another user clicks a widget; its wait
+# for a free worker is reported as "probe wait".
+#
+# Usage:
+#   python benchmarks/bench_breathing_sessions.py --sessions 200 --workers 32
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import breathing_timer
+from breathing_timer import BreathingLog, cycle_seconds
+
+# Streamlit is not needed to measure the server side: the component call is
+# replaced by one that returns "no event yet", as it does until the browser reports
+breathing_timer._component = lambda **kwargs: None
+
+
+class Pool:
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.busy = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def submit(self, fn):
+        def run():
+            with self.lock:
+                self.busy += 1
+                self.peak = max(self.peak, self.busy)
+            try:
+                return fn()
+            finally:
+                with self.lock:
+                    self.busy -= 1
+        return self.executor.submit(run)
+
+
+def sleep_run(cycles, time_scale):
+    """The previous breathing_exercise, minus the Streamlit calls"""
+    for _ in range(cycles):
+        for duration in (4, 7, 8):
+            for _ in range(duration):
+                time.sleep(1 * time_scale)
+        time.sleep(2 * time_scale)
+
+
+def client_runs(log, cycles):
+    run_id = log.start(cycles)
+    breathing_timer.breathing_timer(run_id, cycles)
+    return run_id
+
+
+def measure(mode, sessions, workers, cycles, time_scale):
+    pool = Pool(workers)
+    log = BreathingLog()
+    start = time.perf_counter()
+    if mode == "sleep":
+        futures = [pool.submit(lambda: sleep_run(cycles, time_scale)) for _ in range(sessions)]
+    else:
+        futures = [pool.submit(lambda: client_runs(log, cycles)) for _ in range(sessions)]
+
+    # Another user's widget click arrives just after the exercises started
+    time.sleep(0.01)
+    probe_submitted = time.perf_counter()
+    probe = pool.submit(time.perf_counter)
+    probe_wait = probe.result() - probe_submitted
+
+    run_ids = [future.result() for future in futures]
+    if mode == "client":
+        # The browsers report completion once their countdown ends
+        events = [{'run_id': run_id, 'event': 'completed', 'cycles_completed': cycles} for run_id in run_ids]
+        for future in [pool.submit(lambda event=event: log.record(event)) for event in events]:
+            future.result()
+        assert log.completed == sessions
+    elapsed = time.perf_counter() - start
+    pool.executor.shutdown()
+    return pool.peak, probe_wait, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Breathing timer load test")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--cycles", type=int, default=4)
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="fraction of real time the sleep mode sleeps for")
+    args = parser.parse_args()
+
+    exercise = args.cycles * cycle_seconds()
+    print(f"{args.sessions} sessions, {args.workers} workers, {args.cycles} cycles "
+          f"({exercise}s of exercise each, sleep mode scaled x{args.time_scale})")
+    print("(times below are converted back to real time)")
+    print(f"{'mode':<8} {'peak busy workers':>18} {'probe wait s':>13} {'pool busy for s':>16}")
+    for mode in ("sleep", "client"):
+        peak, probe_wait, elapsed = measure(mode, args.sessions, args.workers, args.cycles, args.time_scale)
+        scale = args.time_scale if mode == "sleep" else 1.0
+        print(f"{mode:<8} {peak:>18} {probe_wait / scale:>13.3f} {elapsed / scale:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
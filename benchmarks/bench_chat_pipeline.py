@@ -0,0 +1,129 @@
+# bench_chat_pipeline.py - Time to first reply chunk: sequential handler vs async chat pipeline
+#
+# Sentiment uses the stand-in pipeline from bench_sentiment_batching (fixed
+# per-call cost), so no model is downloaded. Every message is unique, so the
+# sentiment cache never hits.
+#
+# Usage:
+#   python benchmarks/bench_chat_pipeline.py --sessions 16 --messages 10
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_sentiment_batching import SAMPLE_TEXTS, FakeSentimentPipeline
+from chat_pipeline import ChatPipeline
+from inference_server import get_sentiment_server
+from keyword_matcher import CRISIS_CATEGORY, get_default_matcher
+from model_registry import ModelRegistry
+
+
+class BenchChatbot:
+    """The parts of MentalHealthChatbot the pipeline uses, without Streamlit"""
+
+    first_token_deadline = 2.0
+    generation_deadline = 10.0
+
+    def __init__(self):
+        self.keyword_matcher = get_default_matcher()
+
+    def analyze_message(self, text):
+        hits = self.keyword_matcher.match(text)
+        crisis = hits.pop(CRISIS_CATEGORY, 0) > 0
+        return crisis, max(hits, key=hits.get) if hits else 'general'
+
+    def template_response(self, emotion):
+        return f"I hear you. It sounds like {emotion} is weighing on you."
+
+    def technique_suggestion(self, emotion):
+        return "\n\n💡 **Technique Suggestion**: Try the 4-7-8 Breathing Exercise."
+
+    def get_crisis_response(self):
+        return "Please reach out for help right now."
+
+
+def run(sessions, messages, handler):
+    first_chunk, lock = [], threading.Lock()
+    barrier = threading.Barrier(sessions)
+
+    def session(idx):
+        rng = random.Random(idx)
+        barrier.wait()
+        for i in range(messages):
+            text = f"{rng.choice(SAMPLE_TEXTS)} ({idx}-{i})"
+            elapsed = handler(idx, text)
+            with lock:
+                first_chunk.append(elapsed)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return first_chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat reply latency: sequential vs pipeline")
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--messages", type=int, default=10)
+    args = parser.parse_args()
+
+    chatbot = BenchChatbot()
+    registry = ModelRegistry()
+    registry.register('sentiment_analyzer', lambda _: FakeSentimentPipeline())
+    server = get_sentiment_server(registry.get('sentiment_analyzer'))
+
+    def sequential(idx, text):
+        # The previous chat_interface: sentiment first, then the template
+        start = time.perf_counter()
+        server.infer(text)
+        _, emotion = chatbot.analyze_message(text)
+        chatbot.template_response(emotion) + chatbot.technique_suggestion(emotion)
+        return time.perf_counter() - start
+
+    pipelines = [ChatPipeline(chatbot, registry=registry) for _ in range(args.sessions)]
+
+    def pipelined(idx, text):
+        start = time.perf_counter()
+        turn = pipelines[idx].submit(text)
+        chunks = iter(turn)
+        next(chunks)
+        elapsed = time.perf_counter() - start
+        # The user reads the reply before sending again, so nothing is cancelled here
+        for _ in chunks:
+            pass
+        turn.future.result()
+        return elapsed
+
+    print(f"{'handler':<11} {'p50 first chunk ms':>19} {'p95 first chunk ms':>19}")
+    for name, handler in (("sequential", sequential), ("pipeline", pipelined)):
+        latencies = sorted(run(args.sessions, args.messages, handler))
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        print(f"{name:<11} {p50:>19.2f} {p95:>19.2f}")
+
+    stages = {}
+    for pipeline in pipelines:
+        for trace in pipeline.traces:
+            for stage, record in trace['stages'].items():
+                stages.setdefault(stage, []).append(record['ms'])
+    print("pipeline stage p50 ms: " + ", ".join(
+        f"{stage} {statistics.median(values):.2f}" for stage, values in stages.items()))
+
+    # A second message right behind the first cancels the first one's pending work
+    pipeline = ChatPipeline(chatbot, registry=registry)
+    older = pipeline.submit("I feel anxious about tomorrow (burst 1)")
+    newer = pipeline.submit("Actually I feel a bit calmer now (burst 2)")
+    newer.future.result()
+    time.sleep(0.05)
+    print(f"burst: older cancelled={older.cancelled}, newer reply {len(newer.reply)} chars")
+
+
+if __name__ == "__main__":
+    main()
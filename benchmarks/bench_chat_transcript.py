@@ -0,0 +1,125 @@
+# bench_chat_transcript.py - Bytes sent to the browser and script time per chat turn on a long conversation
+#
+# Runs two minimal Streamlit apps through AppTest on the same seeded
+# conversation: the old transcript (one st.markdown HTML block for every
+# message, every rerun) and chat_transcript.render_transcript (the last
+# MINDCARE_CHAT_VISIBLE messages of a ConversationMemory, in
+# st.chat_message). Each run appends one user/assistant turn, like a real
+# send. Bytes are the serialized size of the script run's delta messages.
+#
+# Usage:
+#   python benchmarks/bench_chat_transcript.py --messages 2000 --turns 10
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+import chat_transcript
+
+USER_LINES = [
+    "I've been feeling really anxious about work lately and can't switch off in the evenings.",
+    "Today was a bit better, I went for a walk and talked to a friend.",
+    "I keep overthinking every conversation I have and it's exhausting.",
+]
+BOT_LINES = [
+    "It sounds like work has been weighing on you. What usually helps you unwind, even a little?",
+    "That's great to hear. Connecting with a friend and moving your body can both make a real difference.",
+    "Overthinking can be draining. Would you like to try a short grounding exercise together?",
+]
+
+
+def conversation(n):
+    return [{"role": "user" if i % 2 == 0 else "assistant",
+             "content": (USER_LINES if i % 2 == 0 else BOT_LINES)[i // 2 % 3]} for i in range(n)]
+
+
+def legacy_app(root):
+    """The transcript as chat_interface rendered it before chat_transcript"""
+    import streamlit as st
+    for message in st.session_state.messages:
+        if message["role"] == "user":
+            st.markdown(f"""
+            <div class="chat-message user-message">
+                <strong>You:</strong> {message["content"]}
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown(f"""
+            <div class="chat-message bot-message">
+                <strong>MindCare:</strong> {message["content"]}
+            </div>
+            """, unsafe_allow_html=True)
+    turn = len(st.session_state.messages)
+    st.session_state.messages.append({"role": "user", "content": f"Message {turn}"})
+    st.session_state.messages.append({"role": "assistant", "content": f"Reply {turn}"})
+
+
+def windowed_app(root):
+    import sys
+    sys.path.insert(0, root)
+    import streamlit as st
+    from chat_transcript import render_transcript
+    from conversation_memory import ConversationMemory
+    if 'conversation' not in st.session_state:
+        st.session_state.conversation = ConversationMemory()
+        for message in st.session_state.messages:
+            st.session_state.conversation.append(message["role"], message["content"])
+    render_transcript(st.session_state.conversation)
+    turn = len(st.session_state.conversation)
+    st.session_state.conversation.append("user", f"Message {turn}")
+    st.session_state.conversation.append("assistant", f"Reply {turn}")
+
+
+_run_bytes = []
+
+
+def _record_bytes():
+    forward_msgs = LocalScriptRunner.forward_msgs
+
+    def recording(self):
+        msgs = forward_msgs(self)
+        _run_bytes.append(sum(msg.ByteSize() for msg in msgs if msg.HasField("delta")))
+        return msgs
+
+    LocalScriptRunner.forward_msgs = recording
+
+
+def measure(app, messages, turns):
+    at = AppTest.from_function(app, args=(ROOT,), default_timeout=120)
+    at.session_state["messages"] = conversation(messages)
+    at.run()  # first render, not a turn
+    seconds, sent = [], []
+    for _ in range(turns):
+        start = time.perf_counter()
+        at.run()
+        seconds.append(time.perf_counter() - start)
+        assert not at.exception, at.exception
+        sent.append(_run_bytes[-1])
+    return statistics.median(seconds), statistics.median(sent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat transcript bytes and time per turn")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    _record_bytes()
+    legacy_s, legacy_bytes = measure(legacy_app, args.messages, args.turns)
+    windowed_s, windowed_bytes = measure(windowed_app, args.messages, args.turns)
+
+    print(f"{args.messages:,}-message conversation, median of {args.turns} turns")
+    print(f"  every message        {legacy_bytes / 1024:9.1f} KB/turn   {legacy_s * 1000:7.1f} ms/turn")
+    print(f"  last {chat_transcript.VISIBLE_MESSAGES:<4} (windowed)  {windowed_bytes / 1024:9.1f} KB/turn"
+          f"   {windowed_s * 1000:7.1f} ms/turn   ({legacy_bytes / windowed_bytes:.0f}x fewer bytes)")
+
+
+if __name__ == "__main__":
+    main()
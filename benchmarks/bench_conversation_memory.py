@@ -0,0 +1,98 @@
+# bench_conversation_memory.py - Memory held per chat session: unbounded message list vs ConversationMemory
+#
+# Grows one conversation to each size and reports the Python heap it holds
+# (tracemalloc) as the old list of message dicts, as a ConversationMemory
+# under the default byte budget, and with older turns spilled to disk,
+# plus the per-append cost including compaction and the time window()
+# takes to read 100 spilled messages back (it should not grow with the
+# conversation).
+#
+# Usage:
+#   python benchmarks/bench_conversation_memory.py --sizes 1000 10000 50000
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_memory import DEFAULT_BUDGET_BYTES, ConversationMemory
+from keyword_matcher import get_default_matcher
+
+USER_LINES = [
+    "I've been feeling really anxious about my exams and I can't sleep before them.",
+    "Work has been stressful this week, my manager keeps adding deadlines.",
+    "I felt lonely over the weekend because my friends were all away.",
+    "Today was better. I went running in the park and cooked dinner with my sister.",
+    "I keep overthinking conversations with my partner and it makes me tense.",
+    "I'm worried about money and whether I can pay rent next month.",
+]
+REPLY = "Thank you for sharing that with me. What usually helps you when you feel this way?"
+
+
+def messages(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        if i % 2 == 0:
+            yield "user", f"{rng.choice(USER_LINES)} ({i})"
+        else:
+            yield "assistant", REPLY
+
+
+def held_bytes(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    held = build()
+    seconds = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held, size, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-session conversation memory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET_BYTES)
+    args = parser.parse_args()
+
+    get_default_matcher()  # process-wide, not per session
+    spill_dir = tempfile.mkdtemp(prefix="mindcare-chat-")
+    print(f"budget {args.budget / 1024:.0f} KB of message text")
+    print(f"  {'messages':>9}  {'list of dicts':>14}  {'memory':>10}  {'memory+spill':>12}  {'us/append':>9}"
+          f"  {'100 spilled us':>14}")
+    for n in args.sizes:
+        _, list_bytes, _ = held_bytes(lambda: [{"role": role, "content": content}
+                                              for role, content in messages(n)])
+
+        def build(spill):
+            memory = ConversationMemory(args.budget, spill_dir=spill_dir if spill else "")
+            for role, content in messages(n):
+                memory.append(role, content)
+            return memory
+
+        memory, memory_bytes, seconds = held_bytes(lambda: build(False))
+        spilled, spill_bytes, _ = held_bytes(lambda: build(True))
+        assert len(memory) == n and memory.user_turns == (n + 1) // 2
+        assert len(spilled.window(n)) == n
+        reach = min(len(spilled.recent) + 100, n)
+        start = time.perf_counter()
+        for _ in range(100):
+            window = spilled.window(reach)
+        window_us = (time.perf_counter() - start) / 100 * 1e6
+        assert len(window) == reach and window[-1] == spilled.recent[-1]
+        print(f"  {n:>9,}  {list_bytes / 1024:11.0f} KB  {memory_bytes / 1024:7.0f} KB  {spill_bytes / 1024:9.0f} KB"
+              f"  {seconds / n * 1e6:9.1f}  {window_us:14.1f}")
+        spilled.clear()
+
+    print(f"\nsummary after {args.sizes[-1]:,} messages: {memory.summary}")
+    print(f"emotions: {dict(memory.emotion_tags)}  topics: {memory.topics}")
+    print(f"stats: {memory.stats()}")
+    os.rmdir(spill_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# bench_figure_cache.py - Mood-trend chart cost: full series vs LTTB-downsampled vs cache hit
+#
+# Builds a multi-year synthetic mood history, then times building the
+# "All time" trend figure from every daily point and from the LTTB point
+# budget, compares the figures' JSON payloads (what Streamlit ships to the
+# browser on every rerun), and times a rerun that hits the figure cache.
+#
+# Usage:
+#   python benchmarks/bench_figure_cache.py --years 5 --entries-per-day 3 --points 500
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import figure_cache
+from figure_cache import FigureCache, lttb
+from mood_aggregates import MoodAggregates
+
+EMOTIONS = ["happy", "sad", "anxious", "calm", "stressed", "grateful"]
+
+
+def synthetic_aggregates(years, per_day, seed):
+    rng = random.Random(seed)
+    aggregates = MoodAggregates()
+    start = datetime.now() - timedelta(days=int(365 * years))
+    for day in range(int(365 * years) + 1):
+        # A slow seasonal swing plus noise, with the odd bad week
+        base = 6 + 1.5 * math.sin(day / 58) - (2.5 if day % 97 < 7 else 0)
+        for entry in range(per_day):
+            score = min(10, max(1, round(rng.gauss(base, 1.2))))
+            aggregates.add(start + timedelta(days=day, hours=9 + 4 * entry), score, rng.choice(EMOTIONS))
+    return aggregates
+
+
+def build(x, y):
+    import plotly.express as px
+    fig = px.line(x=x, y=y, labels={'y': 'Mood Score (1-10)', 'x': 'Date'}, line_shape='spline')
+    fig.add_hline(y=5, line_dash="dash", line_color="gray", annotation_text="Neutral")
+    return fig
+
+
+def best_of(func, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Figure cache and LTTB benchmark")
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--entries-per-day", type=int, default=3)
+    parser.add_argument("--points", type=int, default=figure_cache.DEFAULT_POINT_BUDGET)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    aggregates = synthetic_aggregates(args.years, args.entries_per_day, args.seed)
+    days = (datetime.now().date() - min(aggregates.by_day)).days
+
+    def full():
+        daily = aggregates.window(days).daily()
+        return build([d for d, _, _ in daily], [m for _, m, _ in daily])
+
+    def downsampled():
+        daily = aggregates.window(days).daily()
+        return build(*lttb([d for d, _, _ in daily], [m for _, m, _ in daily], args.points))
+
+    full_s, full_fig = best_of(full, args.runs)
+    lttb_s, lttb_fig = best_of(downsampled, args.runs)
+    full_bytes = len(full_fig.to_json())
+    lttb_bytes = len(lttb_fig.to_json())
+
+    cache = FigureCache()
+    key = ("bench-user", "store", 1, "mood_trend", days)
+    cache.get_or_build(key, downsampled)
+    hit_s, _ = best_of(lambda: cache.get_or_build(key, downsampled), args.runs * 100)
+
+    daily = aggregates.window(days).daily()
+    _, kept = lttb([d for d, _, _ in daily], [m for _, m, _ in daily], args.points)
+    assert len(kept) == min(args.points, len(daily))
+
+    print(f"{len(daily):,} daily points over {days:,} days ({args.entries_per_day} entries/day)")
+    print(f"  full series build   {full_s * 1000:8.1f} ms   {full_bytes / 1024:8.1f} KB JSON")
+    print(f"  LTTB {args.points:<5} build    {lttb_s * 1000:8.1f} ms   {lttb_bytes / 1024:8.1f} KB JSON"
+          f"   ({full_bytes / lttb_bytes:.1f}x smaller)")
+    print(f"  cache hit           {hit_s * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# bench_generation_ttft.py - Time-to-first-token: KV-cached turns vs full re-encoding
+#
+# The cached side is a real chat turn through ChatPipeline (generation on,
+# with deadlines long enough that the model always answers); the full side
+# encodes the whole history in one forward pass.
+#
+# Usage:
+#   python benchmarks/bench_generation_ttft.py --turns 12
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from bench_chat_pipeline import BenchChatbot
+from chat_pipeline import ChatPipeline
+from dialogue_generator import DialogueSession, get_dialogue_generator
+from model_registry import ModelRegistry
+
+USER_TURNS = [
+    "I've been feeling really anxious about work lately.",
+    "My manager keeps adding deadlines and I can't keep up.",
+    "I barely sleep, I just lie awake thinking about everything I have to do.",
+    "Sometimes I feel like nobody notices how hard I'm trying.",
+    "I tried going for a walk yesterday and it helped a little.",
+    "But today the anxiety came back as soon as I opened my email.",
+    "Do you think I should talk to someone about this?",
+    "My friends are busy and I don't want to bother them.",
+]
+
+
+def first_token_full_reencode(generator, session, user_text):
+    """Time to first token when the whole history is encoded every turn"""
+    history = [token for turn in session.turns for token in turn]
+    ids = history + generator.tokenizer.encode(user_text + generator.tokenizer.eos_token)
+    ids = ids[-(generator.max_context_tokens - generator.max_new_tokens):]
+    start = time.perf_counter()
+    with torch.no_grad():
+        outputs = generator.model(torch.tensor([ids]), use_cache=True)
+        generator._sample(outputs.logits[0, -1, :])
+    return time.perf_counter() - start, len(ids)
+
+
+def first_token_cached(pipeline, session, user_text):
+    """Time to first token of a chat turn, which encodes only the new turn against the cache"""
+    turn = pipeline.submit(user_text, session, use_generation=True)
+    turn.future.result()
+    assert turn.trace.stages["generation"]["status"] == "ok", turn.trace.summary()
+    return turn.trace.first_chunk_ms / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-to-first-token with and without the KV cache")
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--max-context", type=int, default=512)
+    parser.add_argument("--model", default="microsoft/DialoGPT-medium")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForCausalLM.from_pretrained(args.model).eval()
+    # The pipeline asks for the process-wide generator; create it with these settings first
+    generator = get_dialogue_generator(tokenizer, model, max_context_tokens=args.max_context, max_new_tokens=32)
+    registry = ModelRegistry()
+    registry.register("tokenizer", lambda _: tokenizer)
+    registry.register("model", lambda _: model)
+    registry.warm_up()
+    chatbot = BenchChatbot()
+    chatbot.first_token_deadline = chatbot.generation_deadline = 600.0
+    pipeline = ChatPipeline(chatbot, registry=registry)
+    session = DialogueSession()
+
+    print(f"{'turn':>4} {'history':>8} {'full ms':>9} {'cached ms':>10}")
+    full_times, cached_times = [], []
+    for turn in range(args.turns):
+        text = USER_TURNS[turn % len(USER_TURNS)]
+        full, history_len = first_token_full_reencode(generator, session, text)
+        cached = first_token_cached(pipeline, session, text)
+        full_times.append(full)
+        cached_times.append(cached)
+        print(f"{turn + 1:>4} {history_len:>8} {full * 1000:>9.1f} {cached * 1000:>10.1f}")
+
+    print(f"median full re-encode: {statistics.median(full_times) * 1000:.1f} ms, "
+          f"median cached: {statistics.median(cached_times) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
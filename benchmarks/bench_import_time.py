@@ -0,0 +1,108 @@
+# bench_import_time.py - Cold-start import cost of the login page, from python -X importtime
+#
+# Imports app.py in a fresh interpreter and fails (exit code 1) if any heavy
+# library is on the login path or if MindCare's own imports, not counting
+# Streamlit itself, take longer than --max-ms. Modules a bare
+# ``import streamlit`` already loads (recent Streamlit pulls in plotly to
+# register its chart theme) are not ours to remove and don't count.
+#
+# Usage:
+#   python benchmarks/bench_import_time.py --runs 5 --max-ms 250
+#   python benchmarks/bench_import_time.py --module mental_health_bot --no-check   # the full app, for comparison
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded behind the first feature that needs them, never by the login page
+HEAVY_MODULES = ("torch", "transformers", "pandas", "plotly", "numpy", "sentence_transformers", "pyarrow")
+
+
+def import_times(module: str) -> List[Tuple[int, str, int]]:
+    """(depth, module name, cumulative us) for every import of a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(cumulative)))
+    return rows
+
+
+def summarize(rows: List[Tuple[int, str, int]], module: str, baseline: Set[str] = frozenset()) -> Dict:
+    cumulative = {name: us for _, name, us in rows}
+    heavy = sorted({name for _, name, _ in rows
+                    if name.split(".")[0] in HEAVY_MODULES and name not in baseline})
+    total_ms = cumulative.get(module, 0) / 1000
+    streamlit_ms = cumulative.get("streamlit", 0) / 1000
+    # importtime lists a module's imports before the module itself
+    children, pending = [], []
+    for depth, name, us in rows:
+        if depth == 1:
+            pending.append((us, name))
+        elif depth == 0:
+            if name == module:
+                children = sorted(pending, reverse=True)
+            pending = []
+    return {
+        "total_ms": total_ms,
+        "streamlit_ms": streamlit_ms,
+        "own_ms": total_ms - streamlit_ms,
+        "heavy": heavy,
+        "slowest": [(name, us / 1000) for us, name in children[:8]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login page cold-start import time")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=250.0,
+                        help="budget for imports other than Streamlit (best of --runs)")
+    parser.add_argument("--no-check", action="store_true", help="report only")
+    args = parser.parse_args()
+
+    baseline = {name for _, name, _ in import_times("streamlit")}
+    runs = [summarize(import_times(args.module), args.module, baseline) for _ in range(args.runs)]
+    best = min(runs, key=lambda run: run["own_ms"])
+
+    print(f"import {args.module}, best of {args.runs} fresh interpreters")
+    print(f"  total      {best['total_ms']:8.1f} ms")
+    print(f"  streamlit  {best['streamlit_ms']:8.1f} ms")
+    print(f"  own        {best['own_ms']:8.1f} ms   (budget {args.max_ms:.0f} ms)")
+    streamlit_heavy = sorted(name for name in baseline if name.split(".")[0] in HEAVY_MODULES)
+    if streamlit_heavy:
+        print(f"  already loaded by streamlit itself: {', '.join(sorted({n.split('.')[0] for n in streamlit_heavy}))}")
+    print("  slowest direct imports:")
+    for name, ms in best["slowest"]:
+        print(f"    {name:<28} {ms:8.1f} ms")
+    if best["heavy"]:
+        print(f"  heavy modules imported: {', '.join(best['heavy'][:10])}"
+              f"{' ...' if len(best['heavy']) > 10 else ''}")
+
+    if args.no_check:
+        return
+    failures = []
+    if best["heavy"]:
+        failures.append("heavy modules on the login path")
+    if best["own_ms"] > args.max_ms:
+        failures.append(f"own import time {best['own_ms']:.0f} ms over the {args.max_ms:.0f} ms budget")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# bench_journal_pages.py - Recent-entries view: sort-and-slice vs the ordered journal store
+#
+# Usage:
+#   python benchmarks/bench_journal_pages.py --entries 1000 100000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_journal_search import generate
+from journal_store import JournalStore
+
+
+def sorted_slice(entries, limit):
+    """The previous JournalManager.get_entries"""
+    return sorted(entries, key=lambda x: x['timestamp'], reverse=True)[:limit]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Journal list view cost")
+    parser.add_argument("--entries", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'entries':>9} {'sort ms':>8} {'page us':>8} {'5th page us':>12}")
+    for n in args.entries:
+        entries = generate(n)
+        store = JournalStore()
+        for entry in entries:
+            store.add(entry)
+
+        def fifth_page():
+            cursor = None
+            for _ in range(5):
+                _, cursor = store.page(args.limit, before=cursor)
+
+        sort_ms = timed(lambda: sorted_slice(entries, args.limit), args.repeat) * 1000
+        page_us = timed(lambda: store.page(args.limit), args.repeat * 100) * 1e6
+        fifth_us = timed(fifth_page, args.repeat * 100) * 1e6
+        print(f"{n:>9,} {sort_ms:>8.2f} {page_us:>8.1f} {fifth_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench_journal_search.py - Journal search latency: substring scan vs inverted index
+#
+# Usage:
+#   python benchmarks/bench_journal_search.py --entries 100000
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal_index import JournalIndex
+
+VOCABULARY = (
+    "today work meeting deadline family friend walk sleep tired anxious calm grateful coffee rain "
+    "sun therapy session exercise gym run dinner lunch book movie music worried happy sad angry "
+    "lonely stressed relaxed morning evening night weekend project manager email phone call mother "
+    "father sister brother partner dog cat garden cooking reading writing breathing meditation"
+).split()
+TAGS = ["work", "family", "gratitude", "health", "sleep", "anxiety", "weekend", "daily practice"]
+
+QUERIES = [
+    "deadline",
+    "anxious work",
+    '"therapy session"',
+    "tag:gratitude walk",
+    "medit",
+    "worried sleep tired",
+]
+
+
+def generate(n, seed=0):
+    """Entries drawn from a Zipf-like vocabulary: a few common words, a long tail"""
+    rng = random.Random(seed)
+    vocabulary = VOCABULARY + [f"word{i}" for i in range(20_000)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    start = datetime.now() - timedelta(days=n // 3)
+    entries = []
+    for i in range(n):
+        words = rng.choices(vocabulary, weights=weights, k=rng.randint(40, 200))
+        entries.append({
+            'id': i,
+            'timestamp': start + timedelta(hours=8 * i),
+            'title': " ".join(rng.sample(VOCABULARY, 3)),
+            'content': " ".join(words),
+            'mood_score': rng.randint(1, 10),
+            'tags': rng.sample(TAGS, rng.randint(0, 2)),
+            'word_count': len(words),
+        })
+    return entries
+
+
+def substring_search(entries, query):
+    """The previous JournalManager.search_entries"""
+    query_lower = query.lower()
+    results = [
+        entry for entry in entries
+        if query_lower in entry['title'].lower()
+        or query_lower in entry['content'].lower()
+        or any(query_lower in tag.lower() for tag in entry['tags'])
+    ]
+    return sorted(results, key=lambda x: x['timestamp'], reverse=True)
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Journal search latency on large journals")
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    entries = generate(args.entries)
+    index = JournalIndex()
+    start = time.perf_counter()
+    index.add_all(entries)
+    build = time.perf_counter() - start
+    print(f"{args.entries:,} entries indexed in {build:.1f}s ({build / args.entries * 1e6:.0f} us per add_entry)")
+
+    date_from = entries[len(entries) // 2]['timestamp']
+    print(f"{'query':<24} {'substring ms':>13} {'index ms':>9} {'+date range ms':>15}")
+    for query in QUERIES:
+        legacy = timed(lambda: substring_search(entries, query), args.repeat)
+        indexed = timed(lambda: index.search(query, limit=args.top_k), args.repeat)
+        ranged = timed(lambda: index.search(query, limit=args.top_k, start=date_from), args.repeat)
+        print(f"{query:<24} {legacy:>13.1f} {indexed:>9.1f} {ranged:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
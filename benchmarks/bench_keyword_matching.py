@@ -0,0 +1,79 @@
+# bench_keyword_matching.py - Per-turn keyword analysis: first-hit substring scans vs one matcher pass
+#
+# The baseline is the old chat handler: a substring scan for any crisis
+# keyword, then the first emotion category with any substring hit. The
+# matcher path is MentalHealthChatbot.analyze_message: one match() giving
+# the crisis flag and the emotion with the most whole-word hits. Texts go
+# from a chat message to a journal entry; "disagree" counts the texts where
+# the baseline's substring hits (e.g. "mad" inside "made") change the answer.
+#
+# Usage:
+#   python benchmarks/bench_keyword_matching.py --words 20 50 200 5000
+import argparse
+import os
+import random
+import statistics
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_matcher import CRISIS_CATEGORY, get_default_matcher
+
+FILLER = (
+    "today I went to work and had a long meeting about the deadline then I walked home "
+    "made dinner called my sister and watched a film before bed the weather was grey"
+).split()
+
+
+def journal_text(words, matcher, seed=0):
+    """A text of ``words`` words with keywords sprinkled through filler words"""
+    rng = random.Random(seed)
+    keywords = [word for words_ in matcher.keywords.values() for word in words_]
+    return " ".join(rng.choice(keywords) if rng.random() < 0.02 else rng.choice(FILLER) for _ in range(words))
+
+
+def legacy_scan(text, matcher):
+    """The previous approach: one substring search per keyword, first emotion wins"""
+    text_lower = text.lower()
+    crisis = any(keyword in text_lower for keyword in matcher.keywords[CRISIS_CATEGORY])
+    detected_emotion = 'general'
+    for emotion, keywords in matcher.keywords.items():
+        if emotion == CRISIS_CATEGORY:
+            continue
+        if any(keyword in text_lower for keyword in keywords):
+            detected_emotion = emotion
+            break
+    return crisis, detected_emotion
+
+
+def analyze(text, matcher):
+    """MentalHealthChatbot.analyze_message"""
+    hits = matcher.match(text)
+    crisis = hits.pop(CRISIS_CATEGORY, 0) > 0
+    return crisis, max(hits, key=hits.get) if hits else 'general'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword analysis per chat turn")
+    parser.add_argument("--words", type=int, nargs="+", default=[20, 50, 200, 5000])
+    parser.add_argument("--texts", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    matcher = get_default_matcher()
+    print(f"median over {args.texts} texts per size")
+    print(f"  {'words':>6} {'first-hit us':>13} {'matcher us':>11} {'crisis disagree':>16} {'emotion disagree':>17}")
+    for words in args.words:
+        texts = [journal_text(words, matcher, seed) for seed in range(args.texts)]
+        legacy = [timeit.timeit(lambda: legacy_scan(text, matcher), number=args.repeat) / args.repeat for text in texts]
+        ours = [timeit.timeit(lambda: analyze(text, matcher), number=args.repeat) / args.repeat for text in texts]
+        answers = [(legacy_scan(text, matcher), analyze(text, matcher)) for text in texts]
+        crisis_diff = sum(old[0] != new[0] for old, new in answers)
+        emotion_diff = sum(old[1] != new[1] for old, new in answers)
+        print(f"  {words:>6} {statistics.median(legacy) * 1e6:>13.1f} {statistics.median(ours) * 1e6:>11.1f}"
+              f" {crisis_diff:>13}/{len(texts)} {emotion_diff:>14}/{len(texts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bench_metrics_overhead.py - Cost of the metrics layer on the hottest instrumented call
+#
+# Times KeywordMatcher.match (microseconds per message) undecorated, with
+# the timed() decorator recording, and with metrics disabled, plus the
+# bare cost of a timed() block in both modes. match itself is not
+# instrumented in the app; it is wrapped here as a short, hot call.
+#
+# Usage:
+#   python benchmarks/bench_metrics_overhead.py --calls 200000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+from keyword_matcher import KeywordMatcher, get_default_matcher
+
+TEXT = "I have been so anxious and stressed about my deadline, I can't sleep"
+
+
+def per_call_ns(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics instrumentation overhead")
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    matcher = get_default_matcher()
+    plain = KeywordMatcher.match
+    recorded = metrics.timed("bench_keyword_match_seconds")(plain)
+
+    def empty_block():
+        with metrics.timed("bench_block_seconds"):
+            pass
+
+    metrics.set_enabled(True)
+    results = {
+        "match, undecorated": per_call_ns(lambda: plain(matcher, TEXT), args.calls),
+        "match, recording": per_call_ns(lambda: recorded(matcher, TEXT), args.calls),
+        "timed() block, recording": per_call_ns(empty_block, args.calls),
+    }
+    metrics.set_enabled(False)
+    results["match, disabled at runtime"] = per_call_ns(lambda: recorded(matcher, TEXT), args.calls)
+    results["timed() block, disabled"] = per_call_ns(empty_block, args.calls)
+    # MINDCARE_METRICS=0 at import: the decorator hands back the function itself
+    undecorated = metrics.timed("bench_decorated_seconds")(plain)
+    assert undecorated is plain
+    metrics.set_enabled(True)
+
+    base = results["match, undecorated"]
+    print(f"{args.calls:,} calls each")
+    for name, ns in results.items():
+        overhead = f"+{ns - base:,.0f} ns" if name.startswith("match") and ns is not base else ""
+        print(f"  {name:<28} {ns:9,.0f} ns/call  {overhead}")
+    print(f"  recorded matches: p50 {metrics.registry.histogram('bench_keyword_match_seconds').quantile(0.5) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# bench_mood_insights.py - Rerun cost of mood insights: pandas rescans vs running aggregates
+#
+# One "rerun" reads everything the mood and insights tabs need: the 7-day
+# insights, the 14-day chart series, the 30-day average, emotion
+# distribution and daily summary, and the 7-day mean/std for recommendations.
+#
+# Usage:
+#   python benchmarks/bench_mood_insights.py --entries 10000 1000000
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from mood_aggregates import MoodAggregates
+from mood_store import MoodStore
+
+EMOTIONS = ["happy", "sad", "anxious", "angry", "excited", "calm", "stressed", "lonely", "grateful", "frustrated"]
+
+
+def generate(n, now, seed=0):
+    """n entries spread evenly over the two years before ``now``"""
+    rng = random.Random(seed)
+    span = timedelta(days=730).total_seconds()
+    return [
+        {
+            'timestamp': now - timedelta(seconds=span * (n - i) / n),
+            'mood_score': rng.randint(1, 10),
+            'emotion': rng.choice(EMOTIONS),
+            'notes': ""
+        }
+        for i in range(n)
+    ]
+
+
+def pandas_history(mood_data, days):
+    """The previous MoodTracker.get_mood_history"""
+    df = pd.DataFrame(mood_data)
+    df['date'] = df['timestamp'].dt.date
+    cutoff_date = datetime.now().date() - timedelta(days=days)
+    return df[df['date'] >= cutoff_date]
+
+
+def pandas_rerun(mood_data):
+    df7 = pandas_history(mood_data, 7)
+    df7['mood_score'].mean()
+    df7.tail(3)['mood_score'].mean()
+    df7.head(3)['mood_score'].mean()
+    df7['emotion'].mode().iloc[0]
+    pandas_history(mood_data, 14).groupby('date')['mood_score'].mean().reset_index()
+    df30 = pandas_history(mood_data, 30)
+    df30['mood_score'].mean()
+    df30['emotion'].value_counts()
+    df30.groupby(df30['timestamp'].dt.date).agg({
+        'mood_score': 'mean',
+        'emotion': lambda x: x.mode().iloc[0]
+    }).tail(7)
+    recs = pandas_history(mood_data, 7)
+    recs['mood_score'].mean()
+    recs['mood_score'].std()
+
+
+def aggregate_rerun(store, aggregates):
+    cutoff = datetime.combine(datetime.now().date() - timedelta(days=7), datetime.min.time())
+    week = aggregates.window(7)
+    week.mean, week.most_common_emotion
+    entries = store.since(cutoff)
+    entries.tail(3).scores(), entries.head(3).scores()
+    aggregates.window(14).daily()
+    month = aggregates.window(30)
+    month.mean, month.emotions.most_common(), month.daily()[-7:]
+    week = aggregates.window(7)
+    week.mean, week.std
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mood insights rerun cost")
+    parser.add_argument("--entries", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    now = datetime.now()
+    print(f"{'entries':>10} {'pandas ms':>11} {'aggregates ms':>14} {'log_mood us':>12}")
+    for n in args.entries:
+        mood_data = generate(n, now)
+        store = MoodStore()
+        for entry in mood_data:
+            store.append(entry['timestamp'], entry['mood_score'], entry['emotion'], entry['notes'])
+        aggregates = MoodAggregates.from_store(store)
+
+        pandas_ms = timed(lambda: pandas_rerun(mood_data), args.repeat) * 1000
+        aggregate_ms = timed(lambda: aggregate_rerun(store, aggregates), args.repeat * 20) * 1000
+
+        def log_one():
+            ts = datetime.now()
+            store.append(ts, 5, "calm")
+            aggregates.add(ts, 5, "calm")
+        log_us = timed(log_one, 1000) * 1e6
+
+        print(f"{n:>10,} {pandas_ms:>11.1f} {aggregate_ms:>14.3f} {log_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# bench_phq9_scoring.py - PHQ-9 scoring throughput: per-object path vs one vectorized batch
+#
+# The per-object path is what every submission used to do: build a
+# DepressionAssessment, walk its severity dict and rebuild the
+# recommendations dict. It runs on a sample and is extrapolated.
+#
+# Usage:
+#   python benchmarks/bench_phq9_scoring.py --rows 5000000 --sample 200000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assessments import (GAD7, SEVERITY_NAMES, UNKNOWN_SEVERITY, cohort_summary, recommendations, score_phq9,
+                         score_phq9_batch, severity_info)
+
+
+class PerObjectAssessment:
+    """Scoring as DepressionAssessment did it before the module-level tables"""
+
+    def __init__(self):
+        self.severity_levels = {
+            (0, 4): {"level": "Minimal", "color": "#28a745", "description": "Minimal depression symptoms"},
+            (5, 9): {"level": "Mild", "color": "#ffc107", "description": "Mild depression symptoms"},
+            (10, 14): {"level": "Moderate", "color": "#fd7e14", "description": "Moderate depression symptoms"},
+            (15, 19): {"level": "Moderately Severe", "color": "#dc3545", "description": "Moderately severe depression symptoms"},
+            (20, 27): {"level": "Severe", "color": "#721c24", "description": "Severe depression symptoms"}
+        }
+
+    def get_severity_info(self, score):
+        for (min_score, max_score), info in self.severity_levels.items():
+            if min_score <= score <= max_score:
+                return {**info, "score": score}
+        return {"level": "Unknown", "color": "#6c757d", "description": "Score out of range", "score": score}
+
+    def get_recommendations(self, score):
+        severity = self.get_severity_info(score)
+        table = {name: [f"{name} recommendation {i}" for i in range(5)] for name in SEVERITY_NAMES}
+        return table.get(severity["level"], ["Please consult with a mental health professional"])
+
+
+def per_object(rows):
+    results = []
+    for responses in rows:
+        total = sum(responses)
+        assessment = PerObjectAssessment()
+        results.append((total, assessment.get_severity_info(total)["level"],
+                        assessment.get_recommendations(total), responses[8] > 0))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PHQ-9 batch scoring benchmark")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--sample", type=int, default=200_000, help="rows scored by the per-object paths")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    # Skewed toward low answers, like a screening population
+    responses = rng.choice(4, size=(args.rows, 9), p=[0.5, 0.25, 0.15, 0.1]).astype(np.uint8)
+    sample = responses[:args.sample].tolist()
+
+    start = time.perf_counter()
+    legacy = per_object(sample)
+    legacy_s = (time.perf_counter() - start) / len(sample) * args.rows
+
+    start = time.perf_counter()
+    scalar = [score_phq9(row) for row in sample]
+    scalar_s = (time.perf_counter() - start) / len(sample) * args.rows
+
+    start = time.perf_counter()
+    batch = score_phq9_batch(responses)
+    batch_s = time.perf_counter() - start
+    start = time.perf_counter()
+    summary = cohort_summary(batch)
+    summary_s = time.perf_counter() - start
+
+    # Same totals, levels and flags on the sample
+    for i, (total, level, _, risk) in enumerate(legacy):
+        assert batch.totals[i] == total == scalar[i]["total_score"]
+        assert SEVERITY_NAMES[batch.severity[i]] == level == scalar[i]["severity"]
+        assert bool(batch.risk[i]) == risk == scalar[i]["risk"]
+    assert severity_info(30)["level"] == "Unknown" and recommendations(12) == recommendations(14)
+    bad = np.array([[0, 1, 2, 3, 4, 0, 0, 0, 0]], dtype=np.int64)
+    assert score_phq9_batch(bad).severity[0] == UNKNOWN_SEVERITY
+    gad7 = GAD7.score_batch(responses[:1000, :7])
+    assert [GAD7.band_code(int(total)) for total in gad7.totals] == gad7.severity.tolist()
+
+    print(f"{args.rows:,} assessments ({responses.nbytes / 1e6:.0f} MB as uint8)")
+    print(f"  per-object (old)  {legacy_s:8.2f} s   (extrapolated from {len(sample):,})")
+    print(f"  score_phq9        {scalar_s:8.2f} s   (extrapolated)")
+    print(f"  score_phq9_batch  {batch_s:8.3f} s   {legacy_s / batch_s:,.0f}x faster than per-object")
+    print(f"  cohort_summary    {summary_s:8.3f} s")
+    print(f"  mean score {summary['mean_score']:.2f}, item-9 flagged {summary['risk_rate']:.1%}")
+    for name, count in summary["severity_counts"].items():
+        print(f"    {name:<18} {count:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# bench_semantic_search.py - Semantic journal search: embedding cost and exact dot-product latency
+#
+# Uses the deterministic hashing embedder so it runs without downloading a
+# model; pass --model to embed with sentence-transformers instead.
+#
+# Usage:
+#   python benchmarks/bench_semantic_search.py --entries 1000 10000 100000
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_journal_search import generate
+from semantic_search import HashingEmbedder, SentenceTransformerEmbedder, VectorIndex
+
+QUERIES = ["burnout at work", "could not sleep", "walk with my dog", "argument with my sister", "felt calm today"]
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic search embedding cost and latency")
+    parser.add_argument("--entries", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--model", action="store_true", help="use sentence-transformers instead of hashing")
+    args = parser.parse_args()
+
+    embedder = SentenceTransformerEmbedder() if args.model else HashingEmbedder()
+    print(f"{'entries':>9} {'embed us/entry':>15} {'search ms':>10}")
+    for n in args.entries:
+        entries = generate(n)
+        start = time.perf_counter()
+        index = VectorIndex(embedder)
+        index.add_all(entries).result()
+        embed_us = (time.perf_counter() - start) / n * 1e6
+        search_ms = [timed(lambda: index.search(query, limit=args.top_k), args.repeat) for query in QUERIES]
+        print(f"{n:>9,} {embed_us:>15.1f} {statistics.median(search_ms):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# bench_sentiment_backends.py - Latency, RSS and parity of the sentiment backends
+#
+# Every backend runs in its own process so RSS numbers are not mixed up.
+#
+# Usage:
+#   python benchmarks/bench_sentiment_backends.py --backends torch torch-int8 onnx
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_backends import BACKENDS, check_parity, load_sentiment_pipeline
+
+TEXTS = [
+    "I feel anxious about my exam tomorrow",
+    "Today was a really good day, I went for a walk",
+    "I can't sleep and I'm exhausted all the time",
+    "Nobody ever listens to me and I feel so alone",
+    "I'm frustrated with work, my manager keeps piling things on",
+    "Thank you, talking about it helped a little",
+    "I don't know how I feel, everything is just grey",
+    "My therapist said I'm making progress and I believe her",
+]
+
+
+def run_worker(backend, iterations):
+    """Load one backend, time single-message calls and print a JSON report"""
+    start = time.perf_counter()
+    analyzer = load_sentiment_pipeline(backend)
+    load_seconds = time.perf_counter() - start
+
+    outputs = [analyzer(text) for text in TEXTS]
+
+    latencies = []
+    for i in range(iterations):
+        text = TEXTS[i % len(TEXTS)]
+        start = time.perf_counter()
+        analyzer(text)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    print(json.dumps({
+        'backend': backend,
+        'load_seconds': load_seconds,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'outputs': outputs,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sentiment inference backends")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.iterations)
+        return
+
+    reports = {}
+    for backend in args.backends:
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", backend, "--iterations", str(args.iterations)],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"{backend}: failed\n{result.stderr.strip().splitlines()[-1] if result.stderr else ''}")
+            continue
+        reports[backend] = json.loads(result.stdout.strip().splitlines()[-1])
+
+    reference = reports.get("torch")
+    print(f"{'backend':<12} {'load s':>7} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8}  parity")
+    for backend, report in reports.items():
+        if reference is None or backend == "torch":
+            parity = "reference" if backend == "torch" else "n/a (no torch reference)"
+        else:
+            check = check_parity(reference['outputs'], report['outputs'], args.tolerance)
+            parity = (f"{'ok' if check['passed'] else 'FAIL'} "
+                      f"(max diff {check['max_abs_diff']:.3f}, top-label agreement {check['top_label_agreement']:.0%})")
+        print(f"{backend:<12} {report['load_seconds']:>7.1f} {report['p50_ms']:>8.1f} "
+              f"{report['p99_ms']:>8.1f} {report['peak_rss_mb']:>8.0f}  {parity}")
+
+
+if __name__ == "__main__":
+    main()
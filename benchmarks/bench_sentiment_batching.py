@@ -0,0 +1,120 @@
+# bench_sentiment_batching.py - Per-call vs micro-batched sentiment inference
+#
+# Usage:
+#   python benchmarks/bench_sentiment_batching.py --sessions 32 --requests 8
+#   python benchmarks/bench_sentiment_batching.py --fake   # no model download
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference_server import MicroBatchInferenceServer, pipeline_batch_fn
+
+SAMPLE_TEXTS = [
+    "I feel anxious about my exam tomorrow",
+    "Today was a really good day, I went for a walk",
+    "I can't sleep and I'm exhausted all the time",
+    "Nobody ever listens to me and I feel so alone",
+    "I'm frustrated with work, my manager keeps piling things on",
+    "Thank you, talking about it helped a little",
+]
+
+
+class FakeSentimentPipeline:
+    """Stand-in pipeline with a fixed per-call cost plus a per-item cost"""
+
+    def __init__(self, call_overhead_ms=20.0, per_item_ms=2.0):
+        self.call_overhead = call_overhead_ms / 1000.0
+        self.per_item = per_item_ms / 1000.0
+        self._lock = threading.Lock()
+
+    def __call__(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else texts
+        # A CPU model serves one forward pass at a time
+        with self._lock:
+            time.sleep(self.call_overhead + self.per_item * len(batch))
+        scores = [[{'label': 'neutral', 'score': 0.9}, {'label': 'negative', 'score': 0.1}] for _ in batch]
+        return scores[0] if single else scores
+
+
+def load_pipeline(fake):
+    if fake:
+        return FakeSentimentPipeline()
+    from transformers import pipeline
+    return pipeline(
+        "sentiment-analysis",
+        model="cardiffnlp/twitter-roberta-base-sentiment-latest",
+        top_k=None
+    )
+
+
+def run_sessions(call, sessions, requests_per_session):
+    """Fire requests from concurrent sessions and collect per-request latency"""
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(sessions)
+
+    def session(idx):
+        barrier.wait()
+        for i in range(requests_per_session):
+            text = SAMPLE_TEXTS[(idx + i) % len(SAMPLE_TEXTS)]
+            start = time.perf_counter()
+            call(text)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    return wall, latencies
+
+
+def report(name, wall, latencies):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{name:<12} {len(latencies) / wall:>10.1f} req/s   p50 {p50:>8.1f} ms   p99 {p99:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call vs micro-batched sentiment inference")
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--batch-window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--fake", action="store_true", help="use a simulated model instead of roberta")
+    args = parser.parse_args()
+
+    analyzer = load_pipeline(args.fake)
+    analyzer(SAMPLE_TEXTS[0])  # warm-up
+
+    print(f"{args.sessions} sessions x {args.requests} requests")
+
+    wall, latencies = run_sessions(analyzer, args.sessions, args.requests)
+    report("per-call", wall, latencies)
+
+    server = MicroBatchInferenceServer(
+        pipeline_batch_fn(analyzer),
+        batch_window_ms=args.batch_window_ms,
+        max_batch_size=args.max_batch_size,
+    ).start()
+    wall, latencies = run_sessions(server.infer, args.sessions, args.requests)
+    server.stop()
+    report("batched", wall, latencies)
+    print(f"batches: {server.stats['batches']}, "
+          f"mean size: {server.stats['items'] / max(1, server.stats['batches']):.1f}, "
+          f"largest: {server.stats['largest_batch']}")
+
+
+if __name__ == "__main__":
+    main()
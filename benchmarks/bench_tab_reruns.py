@@ -0,0 +1,181 @@
+# bench_tab_reruns.py - Work done per UI interaction: full-script reruns vs per-tab fragments
+#
+# Drives mental_health_bot.main() with Streamlit's AppTest, once with
+# MINDCARE_TAB_FRAGMENTS=0 (every interaction reruns all five tabs) and
+# once with tab fragments. For each interaction it reports wall time and
+# how often each tab and a few expensive helpers ran. Each mode runs in
+# its own process, as the flag is read at import.
+#
+# AppTest always reruns the whole script, so in fragment mode the
+# interaction is replayed as the browser would send it: a rerun of the
+# fragment holding the widget (fragments register in tab order). This
+# uses AppTest internals and was written against Streamlit 1.66.
+#
+# Usage:
+#   python benchmarks/bench_tab_reruns.py --repeats 10 --history-days 365
+import argparse
+import functools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TAB_NAMES = ["chat", "mood", "journal", "techniques", "insights"]
+# Helpers whose calls are counted, as (module attribute, method or None)
+COUNTED = [
+    ("MoodTracker", "get_mood_window"),
+    ("MoodTracker", "create_mood_chart"),
+    ("MoodTracker", "get_mood_insights"),
+    ("JournalManager", "get_entries"),
+    ("generate_recommendations", None),
+    ("model_status_badge", None),
+]
+
+
+def app(root):
+    import sys
+    sys.path.insert(0, root)
+    from mental_health_bot import main
+    main()
+
+
+def _primary_button(label):
+    def find(at):
+        return next(b for b in at.button if b.label == label and b.proto.type == "primary")
+    return find
+
+
+# (interaction, tab holding the widget, action on the AppTest for repeat i)
+INTERACTIONS = [
+    ("mood slider", "mood", lambda at, i: at.slider(key="mood_slider").set_value(3 + i % 5)),
+    ("journal title typed", "journal", lambda at, i: at.text_input(key="journal_title").input(f"Entry {i}")),
+    ("insights range", "insights",
+     lambda at, i: at.radio(key="insights_chart_range").set_value(["3 months", "1 year"][i % 2])),
+    ("generation toggle", "chat", lambda at, i: at.checkbox(key="use_generation").set_value(i % 2 == 0)),
+    ("log mood (writes)", "mood", lambda at, i: _primary_button("Log Mood")(at).click()),
+]
+
+
+def install_counters(calls):
+    import mental_health_bot
+
+    def counting(name, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    for attr, method in COUNTED:
+        if method is None:
+            setattr(mental_health_bot, attr, counting(attr, getattr(mental_health_bot, attr)))
+        else:
+            cls = getattr(mental_health_bot, attr)
+            setattr(cls, method, counting(f"{attr}.{method}", getattr(cls, method)))
+
+
+def seed_history(at, days):
+    tracker = at.session_state["chatbot"].mood_tracker
+    start = datetime.now() - timedelta(days=days)
+    for day in range(days):
+        for hour in (9, 21):
+            timestamp = start + timedelta(days=day, hours=hour)
+            score = 4 + (day * 7 + hour) % 6
+            tracker.store.append(timestamp, score, "calm")
+            tracker.aggregates.add(timestamp, score, "calm")
+
+
+def run_mode(repeats, history_days):
+    from streamlit.testing.v1 import AppTest
+    import streamlit.testing.v1.local_script_runner as local_script_runner
+
+    import metrics
+    calls = Counter()
+    install_counters(calls)
+    tab_seconds = metrics.registry.histogram("mindcare_tab_render_seconds")
+
+    def tab_counts():
+        return {key[0]: count for key, (_, _, count) in tab_seconds.samples().items()}
+
+    def run(at, fragment_id=None):
+        if fragment_id is None:
+            return at.run()
+        rerun_data = local_script_runner.RerunData
+        local_script_runner.RerunData = functools.partial(rerun_data, fragment_id_queue=[fragment_id])
+        try:
+            return at.run()
+        finally:
+            local_script_runner.RerunData = rerun_data
+
+    fragments = os.environ.get("MINDCARE_TAB_FRAGMENTS", "1") != "0"
+    at = AppTest.from_function(app, args=(ROOT,), default_timeout=120).run()
+    seed_history(at, history_days)
+    at = at.run()
+    fragment_ids = list(at._fragment_storage._fragments)
+    if fragments:
+        assert len(fragment_ids) == len(TAB_NAMES), fragment_ids
+
+    results = {}
+    for name, tab, action in INTERACTIONS:
+        seconds, tabs, helpers = [], Counter(), Counter()
+        for i in range(repeats):
+            # A full run first so every widget is in the element tree
+            at = at.run()
+            before_tabs, before_calls = tab_counts(), Counter(calls)
+            action(at, i)
+            fragment_id = fragment_ids[TAB_NAMES.index(tab)] if fragments else None
+            start = time.perf_counter()
+            at = run(at, fragment_id)
+            seconds.append(time.perf_counter() - start)
+            assert not at.exception, at.exception
+            after = tab_counts()
+            tabs.update({key: after[key] - before_tabs.get(key, 0) for key in after})
+            helpers.update(calls - before_calls)
+        results[name] = {
+            "ms": statistics.median(seconds) * 1000,
+            "tabs": {key: value / repeats for key, value in tabs.items() if value},
+            "helpers": {key: value / repeats for key, value in helpers.items() if value},
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-interaction rerun cost, full script vs tab fragments")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--history-days", type=int, default=365)
+    parser.add_argument("--mode", choices=["full", "fragments"], help="run one mode and print JSON")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.repeats, args.history_days)))
+        return
+
+    modes = {}
+    for mode, flag in (("full", "0"), ("fragments", "1")):
+        env = dict(os.environ, MINDCARE_TAB_FRAGMENTS=flag, MINDCARE_WARMUP="lazy")
+        out = subprocess.run([sys.executable, __file__, "--mode", mode, "--repeats", str(args.repeats),
+                              "--history-days", str(args.history_days)],
+                             env=env, capture_output=True, text=True, check=True).stdout
+        modes[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{args.repeats} repeats per interaction, {args.history_days} days of mood history")
+    for name, _, _ in INTERACTIONS:
+        full, frag = modes["full"][name], modes["fragments"][name]
+        print(f"\n  {name}")
+        print(f"    wall time       full {full['ms']:7.1f} ms   fragments {frag['ms']:7.1f} ms"
+              f"   ({full['ms'] / frag['ms']:.1f}x)")
+        print(f"    tab renders     full {sum(full['tabs'].values()):7.1f}      fragments {sum(frag['tabs'].values()):7.1f}"
+              f"      ({', '.join(f'{k} {v:g}' for k, v in frag['tabs'].items())})")
+        for helper in sorted(set(full["helpers"]) | set(frag["helpers"])):
+            print(f"    {helper:<30} {full['helpers'].get(helper, 0):5.1f} -> {frag['helpers'].get(helper, 0):5.1f} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# bench_user_store.py - Load test: 100k accounts in SQLite, then login latency
+#
+# Each login is UserManager.authenticate_user on a fresh session: the auth
+# lookup, the profile read and the last_login save.
+#
+# Usage:
+#   python benchmarks/bench_user_store.py --users 100000 --logins 2000 --threads 4
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state_backend import SessionState
+from user_integrated import UserManager, UserProfile
+from user_store import SQLiteUserRepository
+
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def login(repository, username, password):
+    """Log in on a new session; returns the logged-in profile or None"""
+    manager = UserManager(repository=repository, state=SessionState())
+    if not manager.authenticate_user(username, password):
+        return None
+    return manager.get_current_user_profile()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite user repository load test")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--db", help="database path (defaults to a temporary file)")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "users.db")
+    repository = SQLiteUserRepository(path, pool_size=args.threads)
+
+    start = time.perf_counter()
+    for i in range(args.users):
+        username = f"user{i}"
+        profile = UserProfile(str(uuid.uuid4()), username, f"{username}@example.com")
+        repository.create_user(username, profile.email, hash_password(f"pw{i}"), profile)
+    created = time.perf_counter() - start
+    print(f"created {args.users:,} users in {created:.1f}s ({args.users / created:,.0f}/s) -> {path}")
+
+    latencies = []
+    lock = threading.Lock()
+    per_thread = args.logins // args.threads
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(per_thread):
+            i = rng.randrange(args.users)
+            begin = time.perf_counter()
+            profile = login(repository, f"user{i}", f"pw{i}")
+            elapsed = time.perf_counter() - begin
+            assert profile is not None and profile.username == f"user{i}"
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies):,} logins on {args.threads} threads: {len(latencies) / wall:,.0f}/s, "
+          f"p50 {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# load_api.py - Local load generator for the headless API (api.py)
+#
+# Each virtual user creates a session, logs moods, writes and searches
+# journal entries, takes a PHQ-9 and chats over the WebSocket. With several
+# --url values, sessions are created round-robin and every later request is
+# routed by the worker id at the start of the session id, as the load
+# balancer would.
+#
+# Needs httpx and websockets. Usage:
+#   MINDCARE_WORKER_ID=w1 uvicorn api:app --port 8001 &
+#   MINDCARE_WORKER_ID=w2 uvicorn api:app --port 8002 &
+#   python benchmarks/load_api.py --url http://127.0.0.1:8001 http://127.0.0.1:8002 --users 50
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+import websockets
+
+MESSAGES = [
+    "I feel anxious about my exam tomorrow",
+    "Work has been so stressful this week",
+    "I can't sleep and I'm exhausted",
+    "Nobody listens to me and I feel alone",
+    "Today was actually a good day",
+]
+
+
+async def worker_urls(urls):
+    """Map each worker id to its URL"""
+    async with httpx.AsyncClient(timeout=30) as client:
+        return {(await client.get(f"{url}/health")).json()["worker_id"]: url for url in urls}
+
+
+def route(workers, session_id):
+    return workers[session_id.split("-", 1)[0] if "-" in session_id else ""]
+
+
+async def user(idx, urls, workers, rounds, latencies, errors):
+    rng = random.Random(idx)
+
+    async def timed(name, call):
+        start = time.perf_counter()
+        try:
+            response = await call
+            response.raise_for_status()
+            return response
+        except Exception:
+            errors[name] = errors.get(name, 0) + 1
+        finally:
+            latencies.setdefault(name, []).append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        created = await client.post(f"{urls[idx % len(urls)]}/sessions")
+        session_id = created.json()["session_id"]
+        prefix = f"{route(workers, session_id)}/sessions/{session_id}"
+
+        await timed("demo", client.post(f"{prefix}/demo"))
+        for i in range(rounds):
+            await timed("mood", client.post(f"{prefix}/mood", json={"score": rng.randint(1, 10), "emotion": "calm"}))
+            await timed("mood_summary", client.get(f"{prefix}/mood"))
+            await timed("journal_add", client.post(f"{prefix}/journal", json={
+                "title": f"Entry {i}", "content": rng.choice(MESSAGES), "mood_score": 5, "tags": ["daily"]}))
+            await timed("journal_list", client.get(f"{prefix}/journal"))
+            await timed("journal_search", client.get(f"{prefix}/journal/search", params={"q": "work stress"}))
+        await timed("phq9", client.post(f"{prefix}/assessments/phq9",
+                                        json={"responses": [rng.randint(0, 3) for _ in range(9)]}))
+
+    ws_url = prefix.replace("http://", "ws://").replace("https://", "wss://") + "/chat/ws"
+    async with websockets.connect(ws_url) as ws:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await ws.send(json.dumps({"message": rng.choice(MESSAGES)}))
+            first = None
+            while True:
+                message = json.loads(await ws.recv())
+                if message["type"] == "chunk" and first is None:
+                    first = time.perf_counter() - start
+                if message["type"] in ("done", "error"):
+                    break
+            latencies.setdefault("chat_first_chunk", []).append(first if first is not None else time.perf_counter() - start)
+            latencies.setdefault("chat_done", []).append(time.perf_counter() - start)
+
+
+async def run(args):
+    latencies, errors = {}, {}
+    workers = await worker_urls(args.url)
+    if len(workers) < len(args.url):
+        raise SystemExit("Give every worker its own MINDCARE_WORKER_ID")
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i, args.url, workers, args.rounds, latencies, errors) for i in range(args.users)))
+    elapsed = time.perf_counter() - start
+
+    requests = sum(len(values) for values in latencies.values())
+    print(f"{args.users} users x {args.rounds} rounds on {len(args.url)} worker(s): "
+          f"{requests} calls in {elapsed:.1f}s ({requests / elapsed:.0f}/s)")
+    print(f"{'call':<18} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for name, values in latencies.items():
+        values = sorted(values)
+        p95 = values[max(int(len(values) * 0.95) - 1, 0)]
+        print(f"{name:<18} {len(values):>6} {statistics.median(values) * 1000:>8.1f} "
+              f"{p95 * 1000:>8.1f} {errors.get(name, 0):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the MindCare API")
+    parser.add_argument("--url", nargs="+", default=["http://127.0.0.1:8000"])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# breathing_timer.py - Client-side guided breathing timer and its server-side event log
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# 4-7-8 breathing: (phase, seconds)
+PHASES: List[Tuple[str, int]] = [("Inhale", 4), ("Hold", 7), ("Exhale", 8)]
+REST_SECONDS = 2
+
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "breathing_timer")
+_component = None
+_component_lock = threading.Lock()
+
+
+def _get_component():
+    global _component
+    with _component_lock:
+        if _component is None:
+            import streamlit.components.v1 as components
+            _component = components.declare_component("breathing_timer", path=_FRONTEND_DIR)
+    return _component
+
+
+def cycle_seconds(phases: List[Tuple[str, int]] = PHASES, rest_seconds: int = REST_SECONDS) -> int:
+    return sum(seconds for _, seconds in phases) + rest_seconds
+
+
+def breathing_timer(run_id: str, cycles: int, phases: List[Tuple[str, int]] = PHASES,
+                    rest_seconds: int = REST_SECONDS, key: Optional[str] = None) -> Optional[Dict]:
+    """Render the timer and return its event once the browser reports one
+
+    The countdown and animation run in the browser, so the script run
+    returns immediately instead of sleeping through the exercise. The
+    component sends back a single ``{"run_id", "event", "cycles_completed"}``
+    dict when the user finishes or stops; until then this returns None.
+    """
+    component = _get_component()
+    return component(
+        run_id=run_id,
+        cycles=cycles,
+        phases=[[name, seconds] for name, seconds in phases],
+        rest_seconds=rest_seconds,
+        key=key or f"breathing_timer_{run_id}",
+        default=None,
+    )
+
+
+class BreathingLog:
+    """Start and completion events of guided breathing runs for one user"""
+
+    def __init__(self):
+        self.runs: Dict[str, Dict] = {}
+
+    def start(self, cycles: int) -> str:
+        run_id = uuid.uuid4().hex
+        self.runs[run_id] = {
+            'started_at': datetime.now(),
+            'cycles': cycles,
+            'ended_at': None,
+            'event': None,
+            'cycles_completed': 0,
+        }
+        return run_id
+
+    def record(self, event: Optional[Dict]) -> bool:
+        """Record an event from the timer; returns True the first time it is seen
+
+        The component keeps returning its last value on every rerun, so
+        repeats for a run that already ended are ignored.
+        """
+        if not event:
+            return False
+        run = self.runs.get(event.get('run_id'))
+        if run is None or run['event'] is not None:
+            return False
+        run['event'] = event.get('event', 'completed')
+        run['cycles_completed'] = int(event.get('cycles_completed', 0))
+        run['ended_at'] = datetime.now()
+        return True
+
+    def stop(self, run_id: str):
+        """Stopped from the server side (the page's Stop button)"""
+        run = self.runs.get(run_id)
+        if run is not None and run['event'] is None:
+            run['event'] = 'stopped'
+            run['ended_at'] = datetime.now()
+
+    @property
+    def completed(self) -> int:
+        return sum(1 for run in self.runs.values() if run['event'] == 'completed')
+
+    @property
+    def started(self) -> int:
+        return len(self.runs)
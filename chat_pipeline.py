@@ -0,0 +1,325 @@
+# chat_pipeline.py - Concurrent, cancellable chat reply pipeline on a shared asyncio loop
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+import metrics
+from dialogue_generator import get_dialogue_generator
+from inference_server import get_sentiment_server
+from model_registry import COLD, DEGRADED, registry as model_registry
+from sentiment_cache import get_sentiment_cache
+
+_DONE = object()
+
+STAGE_SECONDS = metrics.registry.histogram(
+    "mindcare_chat_stage_seconds", "Duration of each chat pipeline stage", ("stage", "status"))
+FIRST_CHUNK_SECONDS = metrics.registry.histogram(
+    "mindcare_chat_first_chunk_seconds", "From message to the first reply chunk")
+TURNS = metrics.registry.counter("mindcare_chat_turns_total", "Chat turns by outcome", ("outcome",))
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide pipeline event loop, running on its own thread"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="chat-pipeline", daemon=True).start()
+    return _loop
+
+
+class ChatTrace:
+    """Per-stage timings of one chat turn, in ms since the message arrived"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict] = {}
+        self.first_chunk_ms: Optional[float] = None
+        self.reply_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        self.cancelled = False
+        # Registry state when the message arrived (model_registry.COLD ... DEGRADED)
+        self.model_state: Optional[str] = None
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @contextmanager
+    def stage(self, name: str):
+        record = self.stages[name] = {'start_ms': self._now_ms(), 'end_ms': None, 'status': 'running'}
+        try:
+            yield record
+            record['status'] = 'ok'
+        except asyncio.CancelledError:
+            record['status'] = 'cancelled'
+            raise
+        except Exception as e:
+            record['status'] = f"error: {e}"
+            raise
+        finally:
+            record['end_ms'] = self._now_ms()
+            STAGE_SECONDS.observe((record['end_ms'] - record['start_ms']) / 1000, stage=name,
+                                  status=record['status'] if record['status'] in ('ok', 'cancelled') else 'error')
+
+    def summary(self) -> Dict:
+        return {
+            'first_chunk_ms': self.first_chunk_ms,
+            'reply_ms': self.reply_ms,
+            'total_ms': self.total_ms,
+            'cancelled': self.cancelled,
+            'model_state': self.model_state,
+            'stages': {
+                name: {'ms': round(record['end_ms'] - record['start_ms'], 2) if record['end_ms'] is not None else None,
+                       'status': record['status']}
+                for name, record in self.stages.items()
+            },
+        }
+
+
+class ChatTurn:
+    """One user message going through the pipeline; iterate it for reply chunks
+
+    Threads iterate the turn itself; coroutines on another event loop use
+    ``async for chunk in turn.stream()``.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.trace = ChatTrace()
+        self.chunks: List[str] = []
+        self.emotion: Optional[str] = None
+        self.confidence: Optional[float] = None
+        self.stop_event = threading.Event()
+        self.future: Optional[Future] = None
+        self._queue = queue.Queue()
+        self._reply_done = False
+        # (loop, asyncio.Queue) of each stream() reader
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def _publish(self, item):
+        self._queue.put(item)
+        for loop, chunks in self._listeners:
+            loop.call_soon_threadsafe(chunks.put_nowait, item)
+
+    def emit(self, chunk: str):
+        if self.trace.first_chunk_ms is None:
+            self.trace.first_chunk_ms = self.trace._now_ms()
+            FIRST_CHUNK_SECONDS.observe(self.trace.first_chunk_ms / 1000)
+        with self._lock:
+            self.chunks.append(chunk)
+            self._publish(chunk)
+
+    def end_reply(self):
+        """The reply is complete; readers stop even if background stages still run"""
+        with self._lock:
+            if self._reply_done:
+                return
+            self._reply_done = True
+            self.trace.reply_ms = self.trace._now_ms()
+            self._publish(_DONE)
+
+    def finish(self):
+        self.end_reply()
+        if self.trace.total_ms is None:
+            self.trace.total_ms = self.trace._now_ms()
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is _DONE:
+                return
+            yield chunk
+
+    async def stream(self) -> AsyncIterator[str]:
+        """The reply chunks, delivered to the running loop without tying up a thread"""
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+        listener = (loop, chunks)
+        with self._lock:
+            # Chunks emitted so far, then the rest as the pipeline emits them
+            for chunk in self.chunks:
+                chunks.put_nowait(chunk)
+            if self._reply_done:
+                chunks.put_nowait(_DONE)
+            else:
+                self._listeners.append(listener)
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is _DONE:
+                    return
+                yield chunk
+        finally:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+    @property
+    def reply(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.trace.cancelled
+
+    def cancel(self):
+        """Stop the turn; generation stops at its next token"""
+        self.stop_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class ChatPipeline:
+    """Runs the reply stages of one chat session on the shared event loop
+
+    Crisis detection, emotion keywords and the technique suggestion are
+    instant, so a template reply (or the crisis response) is emitted right
+    away. Sentiment scoring runs concurrently and never holds up the reply.
+    With generation on, model tokens stream as they arrive and the template
+    is used if the first token misses its deadline. Models that are not
+    warm yet are skipped rather than waited for. Submitting a new message
+    cancels the turn still running for the previous one.
+    """
+
+    def __init__(self, chatbot, registry=model_registry, max_traces: int = 50):
+        self.chatbot = chatbot
+        self.registry = registry
+        self.traces = deque(maxlen=max_traces)
+        self._current: Optional[ChatTurn] = None
+        # Only one generation may use the dialogue session at a time
+        self._generation_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def submit(self, text: str, dialogue_session=None, use_generation: bool = False) -> ChatTurn:
+        turn = ChatTurn(text)
+        with self._lock:
+            previous, self._current = self._current, turn
+        if previous is not None:
+            previous.cancel()
+        loop = get_event_loop()
+        turn.future = asyncio.run_coroutine_threadsafe(self._run(turn, dialogue_session, use_generation), loop)
+        # A turn cancelled before it started never reaches its own cleanup
+        turn.future.add_done_callback(lambda future: self._on_done(turn, future))
+        return turn
+
+    def _on_done(self, turn: ChatTurn, future: Future):
+        if future.cancelled():
+            turn.trace.cancelled = True
+            turn.finish()
+        TURNS.inc(outcome='cancelled' if turn.cancelled else 'completed')
+        self.traces.append(turn.trace.summary())
+
+    async def _run(self, turn: ChatTurn, dialogue_session, use_generation: bool):
+        chatbot = self.chatbot
+        sentiment_task = None
+        turn.trace.model_state = self.registry.state()
+        if turn.trace.model_state in (COLD, DEGRADED):
+            # MINDCARE_WARMUP=lazy, or a failed load due a retry: this turn
+            # uses templates, later ones the models
+            self.registry.start_warm_up()
+        try:
+            with turn.trace.stage("keywords"):
+                crisis, turn.emotion = chatbot.analyze_message(turn.text)
+            if crisis:
+                turn.emit(chatbot.get_crisis_response())
+                return
+
+            with turn.trace.stage("technique"):
+                suggestion = chatbot.technique_suggestion(turn.emotion)
+
+            sentiment_task = asyncio.ensure_future(self._sentiment(turn))
+
+            generated = False
+            if use_generation and dialogue_session is not None:
+                generated = await self._generate(turn, dialogue_session)
+            if not generated:
+                turn.emit(chatbot.template_response(turn.emotion))
+            turn.emit(suggestion)
+            turn.end_reply()
+
+            await sentiment_task
+        except asyncio.CancelledError:
+            turn.trace.cancelled = True
+            turn.stop_event.set()
+            if sentiment_task is not None:
+                sentiment_task.cancel()
+            raise
+        finally:
+            turn.finish()
+
+    async def _sentiment(self, turn: ChatTurn):
+        """Sentiment confidence for the turn; failures leave the keyword default"""
+        turn.confidence = 0.7
+        try:
+            with turn.trace.stage("sentiment"):
+                cache = get_sentiment_cache()
+                scores = cache.get(turn.text)
+                if scores is None:
+                    if not self.registry.is_loaded('sentiment_analyzer'):
+                        return
+                    loop = asyncio.get_running_loop()
+                    analyzer = await loop.run_in_executor(None, self.registry.get, 'sentiment_analyzer')
+                    # The batching server's future resolves without blocking the loop
+                    scores = await asyncio.wrap_future(get_sentiment_server(analyzer).submit(turn.text))
+                    # put() may commit to SQLite, which must not stall the shared loop
+                    await loop.run_in_executor(None, cache.put, turn.text, scores)
+                turn.confidence = max(score['score'] for score in scores)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+
+    async def _generate(self, turn: ChatTurn, dialogue_session) -> bool:
+        """Stream model tokens into the turn; False if nothing came in time"""
+        loop = asyncio.get_running_loop()
+        chatbot = self.chatbot
+        if not (self.registry.is_loaded('tokenizer') and self.registry.is_loaded('model')):
+            return False
+        try:
+            with turn.trace.stage("models"):
+                tokenizer = await loop.run_in_executor(None, self.registry.get, 'tokenizer')
+                model = await loop.run_in_executor(None, self.registry.get, 'model')
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return False
+
+        generator = get_dialogue_generator(tokenizer, model)
+        tokens = asyncio.Queue()
+
+        def worker():
+            try:
+                with self._generation_lock:
+                    if turn.stop_event.is_set():
+                        return
+                    for chunk in generator.generate(dialogue_session, turn.text, turn.stop_event):
+                        loop.call_soon_threadsafe(tokens.put_nowait, chunk)
+            except Exception as e:
+                loop.call_soon_threadsafe(tokens.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(tokens.put_nowait, _DONE)
+
+        generated = False
+        with turn.trace.stage("generation"):
+            loop.run_in_executor(None, worker)
+            deadline = loop.time() + chatbot.generation_deadline
+            try:
+                item = await asyncio.wait_for(tokens.get(), chatbot.first_token_deadline)
+                while item is not _DONE and not isinstance(item, Exception):
+                    generated = True
+                    turn.emit(item)
+                    item = await asyncio.wait_for(tokens.get(), max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                turn.stop_event.set()
+        return generated
@@ -0,0 +1,60 @@
+# chat_transcript.py - Chat history rendered as a window of the latest messages
+#
+# Only the last MINDCARE_CHAT_VISIBLE messages are sent to the browser on
+# a rerun; "Load earlier" widens the window a page at a time.
+import os
+
+import streamlit as st
+
+from metrics import timed
+from tab_fragments import rerun_dependents
+
+VISIBLE_MESSAGES = int(os.environ.get("MINDCARE_CHAT_VISIBLE", "40"))
+PAGE_SIZE = VISIBLE_MESSAGES
+
+AVATARS = {"user": "🙂", "assistant": "🧠"}
+_BUBBLES = {"user": ("user-message", "You"), "assistant": ("bot-message", "MindCare")}
+
+
+def bubble_html(role, content):
+    """The styled chat bubble (see ui_styles) for one message"""
+    css_class, label = _BUBBLES.get(role, _BUBBLES["assistant"])
+    return f'<div class="chat-message {css_class}"><strong>{label}:</strong> {content}</div>'
+
+
+def show_message(role, content):
+    with st.chat_message(role, avatar=AVATARS.get(role)):
+        st.markdown(bubble_html(role, content), unsafe_allow_html=True)
+
+
+def streaming_bubble(role="assistant"):
+    """An empty chat message to stream a reply into with ``.markdown(bubble_html(...))``"""
+    with st.chat_message(role, avatar=AVATARS.get(role)):
+        return st.empty()
+
+
+def reset_window():
+    """Back to the latest messages only, e.g. after clearing the chat"""
+    st.session_state.pop('chat_visible', None)
+
+
+@timed("mindcare_chat_transcript_seconds", "Rendering the visible part of the chat transcript")
+def render_transcript(memory):
+    """Render the last ``chat_visible`` messages of a ConversationMemory
+
+    Earlier messages are a "load earlier" click away while they can be
+    read back; once only their summary is left, the summary is shown.
+    """
+    visible = st.session_state.get('chat_visible', VISIBLE_MESSAGES)
+    available = memory.available()
+    shown = min(visible, available)
+    if shown < available:
+        if st.button(f"⬆️ Load earlier messages ({available - shown} more)", key="chat_load_earlier"):
+            st.session_state.chat_visible = visible + PAGE_SIZE
+            rerun_dependents()
+    elif memory.compacted and memory.summary:
+        tags = list(memory.emotion_tags) + memory.topics
+        st.caption(f"🗂️ Earlier in this conversation ({len(memory) - shown} messages, summarized): "
+                   f"{memory.summary}" + (f"  \nTopics: {', '.join(tags)}" if tags else ""))
+    for message in memory.window(shown):
+        show_message(message["role"], message["content"])
@@ -0,0 +1,251 @@
+# conversation_memory.py - Chat history with a byte budget: recent turns verbatim, older turns compacted
+#
+# Once the kept messages exceed MINDCARE_CHAT_MEMORY_BYTES, the oldest are
+# folded into a rolling extractive summary plus emotion and topic tags.
+# With MINDCARE_CHAT_SPILL_DIR set they are also appended to a per-session
+# JSONL file, so "load earlier" can still show them. The file is removed
+# when the session's memory is cleared or garbage collected, and files
+# left behind by a crashed process are swept once MINDCARE_CHAT_SPILL_TTL
+# seconds old.
+import json
+import os
+import re
+import sys
+import time
+import uuid
+import weakref
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from journal_index import TOKEN_RE
+from keyword_matcher import get_default_matcher
+
+DEFAULT_BUDGET_BYTES = int(os.environ.get("MINDCARE_CHAT_MEMORY_BYTES", str(64 * 1024)))
+SUMMARY_SENTENCES = 5
+TOPIC_TAGS = 5
+_MAX_SENTENCE_CHARS = 200
+# Summary sentences sharing more than this fraction of their words count as repeats
+_MAX_OVERLAP = 0.5
+# Word counts kept for topic tags and sentence scoring
+_MAX_TOPIC_WORDS = 200
+# Compaction stops at this fraction of the budget, so it doesn't run on every turn
+_LOW_WATER = 0.75
+# The newest messages always stay verbatim
+_MIN_RECENT = 2
+# Spill files untouched for this long belong to sessions that are gone
+SPILL_TTL_SECONDS = float(os.environ.get("MINDCARE_CHAT_SPILL_TTL", str(24 * 3600)))
+_SPILL_PREFIX = "chat-"
+# Bytes read per step when reading a spill file backwards
+_READ_BLOCK = 64 * 1024
+
+_SENTENCE_RE = re.compile(r"[^.!?\n]+[.!?]*")
+_STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by can can't could did
+didn't do does doesn't doing don't even feel feeling felt for from get got had has have having he her
+here him his how i i'd i'll i'm i've if in into is it it's its just know like me more most much my
+myself no not now of off on one only or other our out over really said same she should so some still
+such than that that's the their them then there these they thing things think this those through time
+to today too up us very was wasn't way we well were what when where which while who why will with
+would you your yourself
+""".split())
+
+
+def message_bytes(message: Dict) -> int:
+    return len(message["content"].encode("utf-8"))
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def sweep_spill_dir(spill_dir: str, ttl_seconds: float = SPILL_TTL_SECONDS, now: Optional[float] = None) -> int:
+    """Remove spill files not written to for ``ttl_seconds``; returns how many"""
+    now = now if now is not None else time.time()
+    removed = 0
+    try:
+        names = os.listdir(spill_dir)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        if not (name.startswith(_SPILL_PREFIX) and name.endswith(".jsonl")):
+            continue
+        path = os.path.join(spill_dir, name)
+        try:
+            if now - os.path.getmtime(path) > ttl_seconds:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _read_last_lines(path: str, count: int) -> List[bytes]:
+    """The last ``count`` lines of a file, reading backwards from its end"""
+    if count <= 0:
+        return []
+    blocks, newlines = [], 0
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        # Every line ends with a newline, so count + 1 of them mark count whole lines
+        while position > 0 and newlines <= count:
+            step = min(_READ_BLOCK, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step)
+            newlines += block.count(b"\n")
+            blocks.append(block)
+    return b"".join(reversed(blocks)).splitlines()[-count:]
+
+
+class ConversationMemory:
+    """A session's chat messages, bounded by ``budget_bytes`` of message text
+
+    Iterating yields the messages still held verbatim; ``len()`` counts
+    every message of the conversation, compacted ones included.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES, spill_dir: Optional[str] = None):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir if spill_dir is not None else os.environ.get("MINDCARE_CHAT_SPILL_DIR")
+        self.session_id = uuid.uuid4().hex
+        self.clear()
+        if self.spill_path:
+            sweep_spill_dir(self.spill_dir)
+            # The session ends when its state, and with it this object, is dropped
+            weakref.finalize(self, _remove_file, self.spill_path)
+
+    def clear(self):
+        """Forget the conversation, including its spill file"""
+        spill_path = getattr(self, 'spill_path', None)
+        if spill_path:
+            _remove_file(spill_path)
+        self.recent: List[Dict] = []
+        self.recent_bytes = 0
+        self.compacted = 0
+        self.user_turns = 0
+        self.emotion_tags = Counter()
+        self.topic_counts = Counter()
+        # (message index, sentence) of the best sentences seen so far
+        self._summary: List[Tuple[int, str, int]] = []
+        self.spill_path = (os.path.join(self.spill_dir, f"{_SPILL_PREFIX}{self.session_id}.jsonl")
+                           if self.spill_dir else None)
+
+    def __len__(self):
+        return self.compacted + len(self.recent)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.recent)
+
+    def append(self, role: str, content: str):
+        message = {"role": role, "content": content}
+        self.recent.append(message)
+        self.recent_bytes += message_bytes(message)
+        if role == "user":
+            self.user_turns += 1
+        if self.recent_bytes > self.budget_bytes:
+            self.compact()
+
+    def compact(self):
+        """Fold the oldest verbatim messages into the summary until under the low-water mark"""
+        target = self.budget_bytes * _LOW_WATER
+        count, freed = 0, 0
+        while self.recent_bytes - freed > target and len(self.recent) - count > _MIN_RECENT:
+            freed += message_bytes(self.recent[count])
+            count += 1
+        if not count:
+            return
+        old, self.recent = self.recent[:count], self.recent[count:]
+        self.recent_bytes -= freed
+        if self.spill_path:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for message in old:
+                    f.write(json.dumps(message) + "\n")
+        self._summarize(old, self.compacted)
+        self.compacted += count
+
+    def _summarize(self, messages: List[Dict], first_index: int):
+        # Only the user's words: the replies are mostly templates
+        matcher = get_default_matcher()
+        candidates = list(self._summary)
+        for offset, message in enumerate(messages):
+            if message["role"] != "user":
+                continue
+            text = message["content"]
+            self.emotion_tags.update(matcher.match(text))
+            self.topic_counts.update(word for word in TOKEN_RE.findall(text.lower())
+                                     if word not in _STOPWORDS and len(word) > 2)
+            for sentence in _SENTENCE_RE.findall(text):
+                sentence = sentence.strip()
+                if len(TOKEN_RE.findall(sentence.lower())) >= 3:
+                    sentence = sentence[:_MAX_SENTENCE_CHARS]
+                    # Emotion hits are fixed per sentence, so they are counted once here
+                    emotional = sum(matcher.match(sentence).values())
+                    candidates.append((first_index + offset, sentence, emotional))
+        if len(self.topic_counts) > _MAX_TOPIC_WORDS:
+            self.topic_counts = Counter(dict(self.topic_counts.most_common(_MAX_TOPIC_WORDS)))
+        # Keep the sentences richest in the conversation's recurring words and
+        # emotions, skipping any that mostly repeat one already kept
+        best, kept_words = [], []
+        for candidate in sorted(candidates, key=self._sentence_score, reverse=True):
+            words = set(TOKEN_RE.findall(candidate[1].lower())) - _STOPWORDS
+            if any(len(words & other) > _MAX_OVERLAP * len(words | other) for other in kept_words):
+                continue
+            best.append(candidate)
+            kept_words.append(words)
+            if len(best) == SUMMARY_SENTENCES:
+                break
+        self._summary = sorted(best)
+
+    def _sentence_score(self, candidate: Tuple[int, str, int]) -> float:
+        _, sentence, emotional = candidate
+        words = [word for word in TOKEN_RE.findall(sentence.lower()) if word not in _STOPWORDS]
+        if not words:
+            return 0.0
+        return sum(self.topic_counts[word] for word in words) / len(words) + 2 * emotional
+
+    @property
+    def summary(self) -> str:
+        """Extractive summary of the compacted part of the conversation, oldest first"""
+        return " … ".join(sentence for _, sentence, _ in self._summary)
+
+    @property
+    def topics(self) -> List[str]:
+        return [word for word, _ in self.topic_counts.most_common(TOPIC_TAGS)]
+
+    def window(self, n: int) -> List[Dict]:
+        """The last ``n`` messages, reading compacted ones back from the end of the spill file"""
+        if n <= len(self.recent) or not self.spill_path or not self.compacted:
+            return self.recent[-n:] if n else []
+        count = min(n - len(self.recent), self.compacted)
+        try:
+            lines = _read_last_lines(self.spill_path, count)
+        except FileNotFoundError:
+            lines = []
+        return [json.loads(line) for line in lines] + self.recent
+
+    def available(self) -> int:
+        """How many messages ``window`` can return"""
+        return len(self) if self.spill_path else len(self.recent)
+
+    def nbytes(self) -> int:
+        """Approximate memory held for this conversation, in bytes"""
+        size = sys.getsizeof(self.recent) + sys.getsizeof(self.topic_counts) + sys.getsizeof(self.emotion_tags)
+        for message in self.recent:
+            size += sys.getsizeof(message) + sys.getsizeof(message["content"]) + sys.getsizeof(message["role"])
+        size += sum(sys.getsizeof(word) for word in self.topic_counts)
+        size += sum(sys.getsizeof(sentence) for _, sentence, _ in self._summary)
+        return size
+
+    def stats(self) -> Dict:
+        return {
+            "messages": len(self),
+            "in_memory": len(self.recent),
+            "compacted": self.compacted,
+            "spilled": bool(self.spill_path and self.compacted),
+            "text_bytes": self.recent_bytes,
+            "memory_bytes": self.nbytes(),
+        }
@@ -0,0 +1,153 @@
+# dialogue_generator.py - KV-cached, streaming DialoGPT response generation
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+
+class DialogueSession:
+    """Per-session generation state kept between chat turns
+
+    ``turns`` holds the token ids of every turn the model has seen (each
+    ending with the EOS separator DialoGPT uses between turns), and
+    ``past_key_values`` is the model's attention cache for exactly those
+    tokens, so a new turn only needs to encode its own tokens.
+    """
+
+    def __init__(self):
+        self.turns: List[List[int]] = []
+        self.past_key_values = None
+        self.cached_length = 0
+        # Tail of ``turns`` not fed to the model yet (at least the reply's EOS)
+        self.pending_ids: List[int] = []
+
+    def reset_cache(self):
+        """Drop the attention cache; the next turn re-encodes the kept turns"""
+        self.past_key_values = None
+        self.cached_length = 0
+        self.pending_ids = []
+
+    def clear(self):
+        """Forget the whole conversation"""
+        self.turns = []
+        self.reset_cache()
+
+
+class DialogueGenerator:
+    """Generates replies token by token, reusing each session's KV cache"""
+
+    def __init__(self, tokenizer, model, max_context_tokens=512, max_new_tokens=64,
+                 temperature=0.8, top_k=50):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.max_context_tokens = max_context_tokens
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.top_k = top_k
+        self.eos_id = tokenizer.eos_token_id
+        # The model weights are shared by every session, one forward pass at a time
+        self._lock = threading.Lock()
+
+    def _prepare_input(self, session: DialogueSession, new_ids: List[int]) -> Tuple[List[int], List[int]]:
+        """Return the ids to feed this turn and the turn's own ids as kept
+
+        The turn is cut to the context budget, and old turns that no longer
+        fit are dropped from ``session.turns``.
+        """
+        budget = self.max_context_tokens - self.max_new_tokens
+        if len(new_ids) > budget:
+            new_ids = new_ids[-budget:]
+
+        needed = session.cached_length + len(session.pending_ids) + len(new_ids)
+        if needed <= budget and (session.past_key_values is not None or not session.turns):
+            return session.pending_ids + new_ids, new_ids
+
+        # Over budget (or cache lost): keep the most recent turns that fit and
+        # rebuild the cache from them in a single forward pass
+        kept = []
+        total = len(new_ids)
+        for turn in reversed(session.turns):
+            if total + len(turn) > budget:
+                break
+            kept.insert(0, turn)
+            total += len(turn)
+        session.turns = kept
+        session.reset_cache()
+        return [token for turn in kept for token in turn] + new_ids, new_ids
+
+    def _sample(self, logits):
+        import torch
+        logits = logits / max(self.temperature, 1e-5)
+        if self.top_k:
+            values, indices = torch.topk(logits, min(self.top_k, logits.size(-1)))
+            probs = torch.softmax(values, dim=-1)
+            return int(indices[torch.multinomial(probs, 1)])
+        return int(torch.argmax(logits))
+
+    def generate(self, session: DialogueSession, user_text: str,
+                 stop_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """Yield the reply to ``user_text`` as text chunks while it is generated
+
+        Turns of one session must not overlap (ChatPipeline runs them one at
+        a time). The model lock is only held for each forward pass, never
+        across a yield. However the reply ends (EOS, max_new_tokens,
+        ``stop_event`` or an error), the tokens generated so far are kept in
+        the session together with the cache that matches them.
+        """
+        # torch is already loaded with the model; importing it here keeps it
+        # off the app's import path
+        import torch
+        new_ids = self.tokenizer.encode(user_text + self.tokenizer.eos_token)
+        with self._lock:
+            input_ids, new_ids = self._prepare_input(session, new_ids)
+            past = session.past_key_values
+            length = session.cached_length
+
+        reply_ids: List[int] = []
+        emitted = ""
+        # Ids that ``turns`` will record but ``past`` has not seen yet
+        unfed = input_ids
+        ended_on_eos = False
+        try:
+            for _ in range(self.max_new_tokens):
+                if stop_event is not None and stop_event.is_set():
+                    break
+                with self._lock, torch.no_grad():
+                    outputs = self.model(torch.tensor([unfed], dtype=torch.long), past_key_values=past, use_cache=True)
+                past = outputs.past_key_values
+                length += len(unfed)
+                unfed = []
+
+                token = self._sample(outputs.logits[0, -1, :])
+                if token == self.eos_id:
+                    ended_on_eos = True
+                    break
+                reply_ids.append(token)
+                unfed = [token]
+
+                text = self.tokenizer.decode(reply_ids, skip_special_tokens=True)
+                if len(text) > len(emitted):
+                    yield text[len(emitted):]
+                    emitted = text
+        finally:
+            # The unfed ids, plus the reply's EOS, go in at the start of the next turn
+            with self._lock:
+                session.turns.append(new_ids)
+                if reply_ids or ended_on_eos:
+                    session.turns.append(reply_ids + [self.eos_id])
+                    unfed = unfed + [self.eos_id]
+                session.past_key_values = past
+                session.cached_length = length
+                session.pending_ids = unfed
+
+_generators = {}
+_generators_lock = threading.Lock()
+
+
+def get_dialogue_generator(tokenizer, model, **kwargs) -> DialogueGenerator:
+    """Return the process-wide generator for a tokenizer/model pair"""
+    key = (id(tokenizer), id(model))
+    with _generators_lock:
+        generator = _generators.get(key)
+        if generator is None:
+            generator = DialogueGenerator(tokenizer, model, **kwargs)
+            _generators[key] = generator
+    return generator
@@ -0,0 +1,114 @@
+# figure_cache.py - Process-wide cache of built Plotly figures, and LTTB downsampling for long series
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, Hashable, List, Sequence, Tuple
+
+import metrics
+
+DEFAULT_MAX_FIGURES = 256
+# Points per plotted series; longer series are downsampled with LTTB
+DEFAULT_POINT_BUDGET = int(os.environ.get("MINDCARE_CHART_POINTS", "500"))
+
+FIGURE_CACHE = metrics.registry.counter(
+    "mindcare_figure_cache_total", "Figure cache lookups by result", ("result",))
+
+
+def _as_number(x) -> float:
+    if isinstance(x, datetime):
+        return x.timestamp()
+    if isinstance(x, date):
+        return float(x.toordinal())
+    return float(x)
+
+
+def lttb(xs: Sequence, ys: Sequence[float], threshold: int = DEFAULT_POINT_BUDGET) -> Tuple[List, List]:
+    """Largest-Triangle-Three-Buckets downsampling to ``threshold`` points
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the next bucket's average, which preserves peaks and dips. ``xs`` may
+    be numbers, dates or datetimes and must be sorted.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(xs), list(ys)
+
+    nx = [_as_number(x) for x in xs]
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket (the last point for the final bucket)
+        start = int((i + 1) * every) + 1
+        end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(nx[start:end]) / (end - start)
+        avg_y = sum(ys[start:end]) / (end - start)
+
+        ax, ay = nx[a], ys[a]
+        best, best_area = start - 1, -1.0
+        for j in range(int(i * every) + 1, start):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - nx[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return [xs[i] for i in kept], [ys[i] for i in kept]
+
+
+class FigureCache:
+    """LRU cache of built figures
+
+    Keys carry everything a figure depends on, e.g. (user, data version,
+    chart type, window, day), so a changed input is a new key and stale
+    figures simply age out. Cached figures are shared: render them, don't
+    modify them.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_FIGURES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figures)
+
+    def get_or_build(self, key: Hashable, build: Callable[[], object]):
+        """The cached figure for ``key``, building it on a miss"""
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                FIGURE_CACHE.inc(result="hit")
+                return self._figures[key]
+        # Built outside the lock; two sessions missing at once both build
+        figure = build()
+        with self._lock:
+            self.misses += 1
+            FIGURE_CACHE.inc(result="miss")
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_figure_cache() -> FigureCache:
+    """Return the process-wide figure cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FigureCache(int(os.environ.get("MINDCARE_FIGURE_CACHE_SIZE", DEFAULT_MAX_FIGURES)))
+    return _cache
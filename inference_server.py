@@ -0,0 +1,150 @@
+# inference_server.py - Shared micro-batching worker for sentiment inference
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import metrics
+
+DEFAULT_BATCH_WINDOW_MS = float(os.environ.get("MINDCARE_BATCH_WINDOW_MS", "5"))
+DEFAULT_MAX_BATCH_SIZE = int(os.environ.get("MINDCARE_MAX_BATCH_SIZE", "16"))
+
+_STOP = object()
+
+INFERENCE_SECONDS = metrics.registry.histogram(
+    "mindcare_inference_batch_seconds", "Time of one batched sentiment inference call")
+BATCH_SIZE = metrics.registry.histogram(
+    "mindcare_inference_batch_size", "Requests served per inference batch", buckets=(1, 2, 4, 8, 16, 32, 64))
+
+
+class MicroBatchInferenceServer:
+    """Collects inference requests from all sessions and runs them as one batch
+
+    Requests are queued by ``submit`` and picked up by a single worker thread.
+    The worker waits at most ``batch_window_ms`` after the first request (or
+    until ``max_batch_size`` requests arrived), runs ``infer_batch`` once on
+    the whole list and resolves each caller's future with its own result.
+    """
+
+    def __init__(self, infer_batch: Callable[[List[str]], List],
+                 batch_window_ms: float = DEFAULT_BATCH_WINDOW_MS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.infer_batch = infer_batch
+        self.batch_window = max(0.0, batch_window_ms) / 1000.0
+        self.max_batch_size = max_batch_size
+        self.stats = {'batches': 0, 'items': 0, 'largest_batch': 0}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="sentiment-batcher", daemon=True
+                )
+                self._worker.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker once the requests already queued are served"""
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is not None:
+            self._queue.put(_STOP)
+            worker.join(timeout)
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for inference and return a future for its result"""
+        future = Future()
+        self.start()
+        self._queue.put((text, future))
+        return future
+
+    def infer(self, text: str, timeout: Optional[float] = None):
+        """Submit a text and block until its result is available"""
+        return self.submit(text).result(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            stopping = False
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._process(batch)
+            if stopping:
+                return
+
+    def _process(self, batch):
+        # Drop requests whose callers already gave up on them
+        live = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        self.stats['batches'] += 1
+        self.stats['items'] += len(live)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(live))
+
+        BATCH_SIZE.observe(len(live))
+        try:
+            with INFERENCE_SECONDS.time():
+                results = self.infer_batch([text for text, _ in live])
+            if len(results) != len(live):
+                raise RuntimeError(f"Batch inference returned {len(results)} results for {len(live)} inputs")
+        except Exception as e:
+            for _, future in live:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(live, results):
+            future.set_result(result)
+
+
+def pipeline_batch_fn(sentiment_analyzer) -> Callable[[List[str]], List]:
+    """Wrap a transformers text-classification pipeline as a padded batch call"""
+    def infer_batch(texts):
+        return sentiment_analyzer(texts, batch_size=len(texts), truncation=True)
+    return infer_batch
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def get_sentiment_server(sentiment_analyzer,
+                         batch_window_ms: float = DEFAULT_BATCH_WINDOW_MS,
+                         max_batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> MicroBatchInferenceServer:
+    """Return the process-wide batching server for a sentiment pipeline"""
+    key = id(sentiment_analyzer)
+    with _servers_lock:
+        entry = _servers.get(key)
+        if entry is None:
+            server = MicroBatchInferenceServer(
+                pipeline_batch_fn(sentiment_analyzer),
+                batch_window_ms=batch_window_ms,
+                max_batch_size=max_batch_size,
+            )
+            # Keep the pipeline referenced so its id cannot be reused
+            entry = (sentiment_analyzer, server)
+            _servers[key] = entry
+    return entry[1].start()
@@ -0,0 +1,234 @@
+# journal_index.py - Incremental inverted index with BM25 ranking for journal search
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+QUERY_RE = re.compile(r'"([^"]+)"|(?:tag:|#)(\S+)|(\S+)', re.IGNORECASE)
+
+# (suffix, replacement), longest first; a stem keeps at least three characters
+_SUFFIXES = (
+    ("ingly", ""), ("edly", ""), ("sses", "ss"), ("ness", ""), ("ing", ""),
+    ("ies", "y"), ("ied", "y"), ("ful", ""), ("ly", ""), ("ed", ""), ("s", ""),
+)
+
+
+def stem(token: str) -> str:
+    """Very light suffix stripping so "worrying", "worried" and "worries" meet"""
+    for suffix, replacement in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) + len(replacement) >= 3:
+            # Keep the s of "stress", "anxious", "this"
+            if suffix == "s" and token[-2] in "sui":
+                continue
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.strip("'") for token in TOKEN_RE.findall(text.lower()) if token.strip("'")]
+
+
+class ParsedQuery:
+    """Free terms, quoted phrases and tag filters taken from a search box query"""
+
+    def __init__(self, query: str):
+        self.terms: List[str] = []
+        self.phrases: List[List[str]] = []
+        self.tags: List[str] = []
+        for phrase, tag, word in QUERY_RE.findall(query):
+            if phrase:
+                tokens = tokenize(phrase)
+                if tokens:
+                    self.phrases.append(tokens)
+            elif tag:
+                self.tags.append(tag.lower())
+            else:
+                self.terms.extend(tokenize(word))
+        # The last free term may still be being typed
+        typing = query[-1:].isalnum()
+        self.prefix = self.terms[-1] if self.terms and typing and not query.rstrip().endswith('"') else None
+
+
+class JournalIndex:
+    """Inverted index over journal titles, contents and tags
+
+    Every entry is indexed once by ``add``; queries only touch the posting
+    lists of their own terms. Results are ranked with BM25 and the top k are
+    taken with a heap instead of sorting every match. Term positions are kept
+    so quoted phrases can be checked without reading entry text.
+    """
+
+    def __init__(self, use_stemming: bool = True, k1: float = 1.5, b: float = 0.75):
+        self.use_stemming = use_stemming
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, List[int]]] = {}  # term -> doc id -> positions
+        self.tag_index: Dict[str, Set[int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.timestamps: Dict[int, datetime] = {}
+        self.total_length = 0
+        self._terms_sorted: List[str] = []
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def _normalize(self, token: str) -> str:
+        return stem(token) if self.use_stemming else token
+
+    def add(self, entry: Dict):
+        """Index a journal entry dict (id, timestamp, title, content, tags)"""
+        doc_id = entry['id']
+        tokens = tokenize(entry['title']) + tokenize(entry['content'])
+        for tag in entry.get('tags', []):
+            tokens.extend(tokenize(tag))
+            self.tag_index.setdefault(tag.lower(), set()).add(doc_id)
+
+        for position, token in enumerate(tokens):
+            term = self._normalize(token)
+            docs = self.postings.get(term)
+            if docs is None:
+                docs = self.postings[term] = {}
+                insort(self._terms_sorted, term)
+            docs.setdefault(doc_id, []).append(position)
+
+        self.doc_lengths[doc_id] = len(tokens)
+        self.timestamps[doc_id] = entry['timestamp']
+        self.total_length += len(tokens)
+
+    def add_all(self, entries: Iterable[Dict]):
+        for entry in entries:
+            self.add(entry)
+
+    def remove(self, entry: Dict):
+        """Drop an indexed entry; takes the same dict that was added"""
+        doc_id = entry['id']
+        if doc_id not in self.doc_lengths:
+            return
+        tokens = tokenize(entry['title']) + tokenize(entry['content'])
+        for tag in entry.get('tags', []):
+            tokens.extend(tokenize(tag))
+            docs = self.tag_index.get(tag.lower())
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self.tag_index[tag.lower()]
+
+        for term in {self._normalize(token) for token in tokens}:
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[term]
+                del self._terms_sorted[bisect_left(self._terms_sorted, term)]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        del self.timestamps[doc_id]
+
+    def _expand_prefix(self, prefix: str, limit: int = 50) -> List[str]:
+        i = bisect_left(self._terms_sorted, prefix)
+        matches = []
+        while i < len(self._terms_sorted) and self._terms_sorted[i].startswith(prefix) and len(matches) < limit:
+            matches.append(self._terms_sorted[i])
+            i += 1
+        return matches
+
+    def _has_phrase(self, doc_id: int, phrase: List[str]) -> bool:
+        position_lists = []
+        for token in phrase:
+            positions = self.postings.get(self._normalize(token), {}).get(doc_id)
+            if not positions:
+                return False
+            position_lists.append(positions)
+        following = [set(positions) for positions in position_lists[1:]]
+        return any(
+            all(start + offset + 1 in positions for offset, positions in enumerate(following))
+            for start in position_lists[0]
+        )
+
+    def _idf(self, term: str) -> float:
+        n = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.doc_lengths) - n + 0.5) / (n + 0.5))
+
+    def search(self, query: str, limit: Optional[int] = 20,
+               start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Tuple[int, float]]:
+        """Return (doc id, score) pairs, best first
+
+        Supports free terms, "quoted phrases", ``tag:name`` / ``#name``
+        filters and an optional [start, end) date range. The last free term
+        also matches as a prefix, so results keep up while typing. Queries
+        with only filters are ordered newest first.
+        """
+        parsed = ParsedQuery(query)
+        if not (parsed.terms or parsed.phrases or parsed.tags):
+            return []
+
+        # Candidate set from the filters: tags, then docs holding every phrase term
+        candidates: Optional[Set[int]] = None
+        for tag in parsed.tags:
+            docs = self.tag_index.get(tag, set())
+            candidates = set(docs) if candidates is None else candidates & docs
+        for phrase in parsed.phrases:
+            for token in phrase:
+                docs = self.postings.get(self._normalize(token), {}).keys()
+                candidates = set(docs) if candidates is None else candidates & docs
+
+        # Query terms with their weight; the prefix term expands to matching terms
+        weighted_terms: Dict[str, float] = {}
+        for token in parsed.terms:
+            term = self._normalize(token)
+            if token == parsed.prefix and term not in self.postings:
+                for expanded in self._expand_prefix(token):
+                    weighted_terms[expanded] = max(weighted_terms.get(expanded, 0.0), 1.0)
+            else:
+                weighted_terms[term] = weighted_terms.get(term, 0.0) + 1.0
+        for phrase in parsed.phrases:
+            for token in phrase:
+                term = self._normalize(token)
+                weighted_terms[term] = weighted_terms.get(term, 0.0) + 1.0
+
+        scores: Dict[int, float] = {}
+        if weighted_terms:
+            k1, b = self.k1, self.b
+            doc_lengths = self.doc_lengths
+            avg_length = (self.total_length / len(doc_lengths)) if doc_lengths else 1.0
+            for term, weight in weighted_terms.items():
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                boost = weight * self._idf(term) * (k1 + 1)
+                if candidates is not None:
+                    docs = {doc_id: docs[doc_id] for doc_id in candidates if doc_id in docs}
+                for doc_id, positions in docs.items():
+                    tf = len(positions)
+                    norm = k1 * (1 - b + b * doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + boost * tf / (tf + norm)
+        elif candidates is not None:
+            # Filters only: rank by recency
+            scores = {doc_id: self.timestamps[doc_id].timestamp() for doc_id in candidates}
+
+        if start is not None or end is not None:
+            timestamps = self.timestamps
+            scores = {
+                doc_id: score for doc_id, score in scores.items()
+                if (start is None or timestamps[doc_id] >= start) and (end is None or timestamps[doc_id] < end)
+            }
+
+        if not parsed.phrases:
+            if limit is None:
+                return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+            return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+        # Phrase positions are only verified for the best candidates until
+        # enough results are found
+        heap = [(-score, -doc_id) for doc_id, score in scores.items()]
+        heapq.heapify(heap)
+        results = []
+        while heap and (limit is None or len(results) < limit):
+            neg_score, neg_id = heapq.heappop(heap)
+            if all(self._has_phrase(-neg_id, phrase) for phrase in parsed.phrases):
+                results.append((-neg_id, -neg_score))
+        return results
@@ -0,0 +1,179 @@
+# journal_store.py - Time-ordered journal storage with summaries kept apart from bodies
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PREVIEW_CHARS = 200
+
+Cursor = Tuple[float, int]
+
+
+def summarize(entry: Dict) -> Dict:
+    """The fields list views need; the full content stays out of it"""
+    content = entry['content']
+    return {
+        'id': entry['id'],
+        'timestamp': entry['timestamp'],
+        'title': entry['title'],
+        'preview': content[:PREVIEW_CHARS] + ('...' if len(content) > PREVIEW_CHARS else ''),
+        'mood_score': entry['mood_score'],
+        'word_count': entry['word_count'],
+        'tags': list(entry.get('tags', [])),
+    }
+
+
+def _decrement(counts: Counter, key):
+    # Zero counts are dropped so they do not show up as tags or days
+    counts[key] -= 1
+    if counts[key] <= 0:
+        del counts[key]
+
+
+class JournalStats:
+    """Running journal totals, updated as entries are added and deleted"""
+
+    def __init__(self):
+        self.entry_count = 0
+        self.total_words = 0
+        self.mood_sum = 0.0
+        self.first_entry_at: Optional[datetime] = None
+        self.last_entry_at: Optional[datetime] = None
+        self.tag_counts: Counter = Counter()
+        self.day_counts: Counter = Counter()
+
+    def add(self, summary: Dict):
+        self.entry_count += 1
+        self.total_words += summary['word_count']
+        self.mood_sum += summary['mood_score']
+        self.tag_counts.update(tag.lower() for tag in summary['tags'])
+        self.day_counts[summary['timestamp'].date()] += 1
+        timestamp = summary['timestamp']
+        if self.first_entry_at is None or timestamp < self.first_entry_at:
+            self.first_entry_at = timestamp
+        if self.last_entry_at is None or timestamp > self.last_entry_at:
+            self.last_entry_at = timestamp
+
+    def remove(self, summary: Dict, first_entry_at: Optional[datetime], last_entry_at: Optional[datetime]):
+        """Take an entry out; the store passes the new first and last timestamps"""
+        self.entry_count -= 1
+        self.total_words -= summary['word_count']
+        self.mood_sum -= summary['mood_score']
+        for tag in summary['tags']:
+            _decrement(self.tag_counts, tag.lower())
+        _decrement(self.day_counts, summary['timestamp'].date())
+        self.first_entry_at, self.last_entry_at = first_entry_at, last_entry_at
+
+    @property
+    def avg_words(self) -> int:
+        return self.total_words // self.entry_count if self.entry_count else 0
+
+    @property
+    def avg_mood(self) -> float:
+        return self.mood_sum / self.entry_count if self.entry_count else 0.0
+
+    @property
+    def days_journaling(self) -> int:
+        """Calendar days from the first entry to the last, inclusive"""
+        if self.first_entry_at is None:
+            return 0
+        return (self.last_entry_at.date() - self.first_entry_at.date()).days + 1
+
+    def journaled_within(self, days: int, now: Optional[datetime] = None) -> bool:
+        """True if some entry is at most ``days`` whole days old"""
+        if self.last_entry_at is None:
+            return False
+        return ((now or datetime.now()) - self.last_entry_at).days <= days
+
+    def entries_on(self, day: date) -> int:
+        return self.day_counts.get(day, 0)
+
+
+class JournalStore:
+    """Journal entries ordered by (timestamp, id)
+
+    Entries arrive in time order, so adding one is an append. Pages are read
+    newest first from a cursor, costing O(log n + limit) however long the
+    journal is, and return summaries only; the body of an entry is read
+    with ``get`` when it is actually opened.
+    """
+
+    def __init__(self):
+        self._keys: List[Cursor] = []
+        self._summaries: Dict[int, Dict] = {}
+        self._bodies: Dict[int, str] = {}
+        self._next_id = 0
+        self.stats = JournalStats()
+        # Increases on every change; lets views know to refresh
+        self.version = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def next_id(self) -> int:
+        return self._next_id
+
+    def add(self, entry: Dict):
+        key = (entry['timestamp'].timestamp(), entry['id'])
+        if not self._keys or self._keys[-1] <= key:
+            self._keys.append(key)
+        else:
+            insort(self._keys, key)
+        summary = self._summaries[entry['id']] = summarize(entry)
+        self._bodies[entry['id']] = entry['content']
+        self._next_id = max(self._next_id, entry['id'] + 1)
+        self.stats.add(summary)
+        self.version += 1
+
+    def delete(self, entry_id: int) -> Dict:
+        """Remove an entry and return it in full"""
+        entry = self.get(entry_id)
+        key = (entry['timestamp'].timestamp(), entry_id)
+        del self._keys[bisect_left(self._keys, key)]
+        summary = self._summaries.pop(entry_id)
+        del self._bodies[entry_id]
+        first = self._summaries[self._keys[0][1]]['timestamp'] if self._keys else None
+        last = self._summaries[self._keys[-1][1]]['timestamp'] if self._keys else None
+        self.stats.remove(summary, first, last)
+        self.version += 1
+        return entry
+
+    def summary(self, entry_id: int) -> Dict:
+        return self._summaries[entry_id]
+
+    def get(self, entry_id: int) -> Dict:
+        """The full entry, content included"""
+        entry = dict(self._summaries[entry_id])
+        del entry['preview']
+        entry['content'] = self._bodies[entry_id]
+        return entry
+
+    def page(self, limit: int = 10, before: Optional[Cursor] = None) -> Tuple[List[Dict], Optional[Cursor]]:
+        """Up to ``limit`` summaries older than the cursor, newest first
+
+        Returns the summaries and the cursor for the next page, or None when
+        there is nothing older.
+        """
+        end = len(self._keys) if before is None else bisect_left(self._keys, before)
+        start = max(0, end - limit)
+        keys = self._keys[start:end]
+        summaries = [self._summaries[entry_id] for _, entry_id in reversed(keys)]
+        return summaries, (keys[0] if start > 0 else None)
+
+    def latest(self, limit: int = 5) -> List[Dict]:
+        return self.page(limit)[0]
+
+    def summaries(self) -> Iterator[Dict]:
+        """All summaries, oldest first"""
+        for _, entry_id in self._keys:
+            yield self._summaries[entry_id]
+
+    def __iter__(self) -> Iterator[Dict]:
+        """All full entries, oldest first"""
+        for _, entry_id in self._keys:
+            yield self.get(entry_id)
+
+    def since(self, start: datetime) -> List[Dict]:
+        """Summaries written at or after ``start``, oldest first"""
+        i = bisect_left(self._keys, (start.timestamp(), -1))
+        return [self._summaries[entry_id] for _, entry_id in self._keys[i:]]
@@ -0,0 +1,114 @@
+# keyword_matcher.py - Single-pass crisis and emotion keyword detection
+import json
+import os
+import string
+import threading
+from collections import Counter
+from typing import Dict, List, Tuple
+
+DEFAULT_KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "keywords.json")
+
+CRISIS_CATEGORY = "crisis"
+
+
+# Punctuation ends a word, as a regex \b would: ASCII and the General Punctuation block
+_PUNCTUATION_TO_SPACE = str.maketrans({char: " " for char in (
+    string.punctuation + "«»¡¿" + "".join(map(chr, range(0x2010, 0x205F))))})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of ``text``, split on whitespace and punctuation"""
+    return text.lower().translate(_PUNCTUATION_TO_SPACE).split()
+
+
+class KeywordMatcher:
+    """Finds every keyword category in a text with one pass over its words
+
+    The text is tokenized once and each word is looked up in a dict of
+    the keywords (and multi-word phrases) it can start, so "dead" does not
+    match "deadline" and the cost does not grow with the number of
+    categories. Matches don't overlap, and at a given word the longest
+    phrase wins over any shorter keyword it starts with. A keyword may
+    belong to several categories.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.keywords = {category: list(words) for category, words in keywords.items()}
+        self.categories = list(self.keywords)
+
+        self._categories_by_phrase: Dict[str, List[str]] = {}
+        for category, words in self.keywords.items():
+            for word in words:
+                phrase = self._normalize(word)
+                if not phrase:
+                    continue
+                self._categories_by_phrase.setdefault(phrase, [])
+                if category not in self._categories_by_phrase[phrase]:
+                    self._categories_by_phrase[phrase].append(category)
+
+        # First word -> (phrase words, phrase) of every keyword starting with it, longest first
+        self._phrases_by_first: Dict[str, List[Tuple[List[str], str]]] = {}
+        for phrase in self._categories_by_phrase:
+            words = phrase.split()
+            self._phrases_by_first.setdefault(words[0], []).append((words, phrase))
+        for candidates in self._phrases_by_first.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+
+    @staticmethod
+    def _normalize(phrase: str) -> str:
+        return " ".join(tokenize(phrase))
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_KEYWORDS_PATH) -> "KeywordMatcher":
+        """Build a matcher from a JSON file mapping category -> keyword list"""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _find(self, text: str) -> List[str]:
+        """The keyword phrases found in ``text``, in order, one per occurrence"""
+        words = tokenize(text)
+        phrases_by_first = self._phrases_by_first
+        found = []
+        next_free = 0
+        for i in [i for i, word in enumerate(words) if word in phrases_by_first]:
+            if i < next_free:
+                continue
+            for phrase_words, phrase in phrases_by_first[words[i]]:
+                end = i + len(phrase_words)
+                if words[i:end] == phrase_words:
+                    found.append(phrase)
+                    next_free = end
+                    break
+        return found
+
+    def match(self, text: str) -> Dict[str, int]:
+        """Return the hit count of every matched category, in category order"""
+        counts = Counter()
+        for phrase in self._find(text):
+            for category in self._categories_by_phrase[phrase]:
+                counts[category] += 1
+        return {category: counts[category] for category in self.categories if category in counts}
+
+    def matched_keywords(self, text: str) -> Dict[str, List[str]]:
+        """Return the distinct keywords found per category"""
+        found_by_category: Dict[str, List[str]] = {}
+        for phrase in self._find(text):
+            for category in self._categories_by_phrase[phrase]:
+                words = found_by_category.setdefault(category, [])
+                if phrase not in words:
+                    words.append(phrase)
+        return found_by_category
+
+
+_default_matcher = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_default_matcher() -> KeywordMatcher:
+    """Return the process-wide matcher built from data/keywords.json"""
+    global _default_matcher
+    if _default_matcher is None:
+        with _default_matcher_lock:
+            if _default_matcher is None:
+                _default_matcher = KeywordMatcher.from_file(DEFAULT_KEYWORDS_PATH)
+    return _default_matcher
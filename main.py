@@ -145,8 +145,8 @@ class MentalHealthApp:
     
     def show_depression_test(self):
         """Show the depression test interface"""
-        depression_test = DepressionTest()
-        result = depression_test.run_test()
+        # Definitions are compiled once in assessments; this costs nothing per rerun
+        result = DepressionTest().run_test()
         
         if result:
             # Store the result
@@ -1,15 +1,43 @@
 import streamlit as st
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+import os
 import re
 import random
 from datetime import datetime, timedelta
 import json
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from collections import defaultdict
 import time
+from model_registry import COLD, DEGRADED, LOADING, WARM, registry as model_registry
+from keyword_matcher import CRISIS_CATEGORY, get_default_matcher
+from mood_store import MoodStore
+from mood_aggregates import MoodAggregates
+from journal_index import JournalIndex
+from breathing_timer import BreathingLog, breathing_timer
+from journal_store import JournalStore
+from semantic_search import VectorIndex
+from dialogue_generator import DialogueSession
+from chat_pipeline import ChatPipeline
+from state_backend import resolve_state
+from ui_styles import inject_css
+import metrics
+from metrics import timed
+from figure_cache import get_figure_cache, lttb
+from tab_fragments import rerun_dependents, tab_fragment
+from conversation_memory import ConversationMemory
+from chat_transcript import bubble_html, render_transcript, reset_window, show_message, streaming_bubble
+
+# Chart ranges offered on the insights page; None means since the first entry
+CHART_WINDOWS = {"2 weeks": 14, "3 months": 90, "1 year": 365, "All time": None}
+
+
+def window_label(days):
+    """Chart title suffix for a window of N days"""
+    if days == 14:
+        return "Past 2 Weeks"
+    return f"Past {days} Days"
+
+
+RERUN_SECONDS = metrics.registry.histogram(
+    "mindcare_rerun_seconds", "From st.rerun() after a chat reply to the next script run starting")
 
 # # Configure Streamlit page
 # st.set_page_config(
@@ -19,114 +47,112 @@ import time
 #     initial_sidebar_state="expanded"
 # )
 
-# Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        text-align: center;
-        padding: 2rem 0;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border-radius: 10px;
-        margin-bottom: 2rem;
-    }
-    
-    .chat-message {
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-        border-left: 4px solid #667eea;
-    }
-    
-    .user-message {
-        background-color: #f0f2f6;
-        border-left-color: #4CAF50;
-    }
-    
-    .bot-message {
-        background-color: #e8f4fd;
-        border-left-color: #2196F3;
-    }
-    
-    .therapy-exercise {
-        background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%);
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-        border-left: 4px solid #ff6b6b;
-    }
-    
-    .mood-card {
-        background: white;
-        padding: 1rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        margin: 0.5rem 0;
-        text-align: center;
-    }
-    
-    .journal-entry {
-        background: #f8f9fa;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 3px solid #6c757d;
-        margin: 0.5rem 0;
-    }
-    
-    .emergency-notice {
-        background-color: #fff3cd;
-        border: 1px solid #ffeaa7;
-        border-radius: 5px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    
-    .technique-card {
-        background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 0.5rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
 
 class MoodTracker:
-    def __init__(self):
-        if 'mood_data' not in st.session_state:
-            st.session_state.mood_data = []
+    def __init__(self, state=None):
+        # Streamlit's session state in the UI; a SessionState in the API
+        self.state = resolve_state(state)
+        self._load_for_current_user()
+    
+    def _load_for_current_user(self):
+        """Hold the logged-in user's mood data, reloading it when the user changes
+
+        The session outlives a login, so after a logout or a switch of
+        account the previous user's logs must not stay in the store.
+        """
+        user_id = self.state.get('current_user')
+        if 'mood_store' in self.state and self.state.get('mood_store_user') == user_id:
+            return
+        self.state.mood_store_user = user_id
+        self.state.mood_store = self.load_store()
+        self.state.mood_aggregates = MoodAggregates.from_store(self.state.mood_store)
+    
+    @property
+    def store(self):
+        self._load_for_current_user()
+        return self.state.mood_store
+    
+    @property
+    def aggregates(self):
+        self._load_for_current_user()
+        return self.state.mood_aggregates
+    
+    def _data_dir(self):
+        """Per-user Parquet directory when MINDCARE_MOOD_DATA_DIR is set"""
+        base_dir = os.environ.get("MINDCARE_MOOD_DATA_DIR")
+        user_id = self.state.get('current_user')
+        if not base_dir or not user_id:
+            return None
+        return os.path.join(base_dir, str(user_id))
+    
+    def load_store(self):
+        """Load the user's saved mood partitions, or start an empty store"""
+        data_dir = self._data_dir()
+        if data_dir:
+            try:
+                return MoodStore.load_parquet(data_dir)
+            except Exception as e:
+                st.warning(f"Could not load saved mood data: {e}")
+        return MoodStore()
     
     def log_mood(self, mood_score, emotion, notes=""):
         """Log a mood entry"""
-        entry = {
-            'timestamp': datetime.now(),
-            'mood_score': mood_score,
-            'emotion': emotion,
-            'notes': notes
-        }
-        st.session_state.mood_data.append(entry)
+        timestamp = datetime.now()
+        self.store.append(timestamp, mood_score, emotion, notes)
+        self.aggregates.add(timestamp, mood_score, emotion)
+        
+        data_dir = self._data_dir()
+        if data_dir:
+            try:
+                self.store.save_parquet(data_dir)
+            except Exception as e:
+                st.warning(f"Could not save mood data: {e}")
     
     def get_mood_history(self, days=7):
         """Get mood history for the last N days"""
-        if not st.session_state.mood_data:
-            return pd.DataFrame()
-        
-        df = pd.DataFrame(st.session_state.mood_data)
-        df['date'] = df['timestamp'].dt.date
-        cutoff_date = datetime.now().date() - timedelta(days=days)
-        return df[df['date'] >= cutoff_date]
+        return self._since(days).to_dataframe()
     
-    def create_mood_chart(self):
-        """Create mood visualization"""
-        df = self.get_mood_history(14)  # 2 weeks
-        if df.empty:
+    def _since(self, days):
+        cutoff_date = datetime.now().date() - timedelta(days=days)
+        return self.store.since(datetime.combine(cutoff_date, datetime.min.time()))
+    
+    def get_recent_entries(self, days=7, limit=5):
+        """Latest entries (oldest first) from the last N days"""
+        return list(self._since(days).tail(limit))
+    
+    def get_mood_window(self, days=7):
+        """Running aggregates (mean, std, emotions, per-day) for the last N days"""
+        return self.aggregates.window(days)
+    
+    def _chart_key(self, chart, days):
+        # The figure changes only with new data, a different window, or a new day
+        return (self.state.get('current_user'), self.store.store_id, self.store.version,
+                chart, days, datetime.now().date())
+    
+    def all_time_days(self):
+        """Days since the first logged mood, for an "All time" chart window"""
+        if not self.aggregates.by_day:
+            return 0
+        return (datetime.now().date() - min(self.aggregates.by_day)).days
+    
+    def create_mood_chart(self, days=14):
+        """Create mood visualization, cached until new mood data arrives"""
+        window = self.get_mood_window(days)
+        if window.empty:
             return None
+        return get_figure_cache().get_or_build(self._chart_key('mood_trend', days),
+                                               lambda: self._build_mood_chart(window, days))
+    
+    @timed("mindcare_figure_build_seconds", "Plotly figure construction", figure="mood_trend")
+    def _build_mood_chart(self, window, days):
+        # Average mood per day, downsampled for long windows
+        daily_mood = window.daily()
+        x, y = lttb([day for day, _, _ in daily_mood], [mean for _, mean, _ in daily_mood])
         
-        # Group by date and get average mood
-        daily_mood = df.groupby('date')['mood_score'].mean().reset_index()
-        
-        fig = px.line(daily_mood, x='date', y='mood_score', 
-                     title='Mood Trend (Past 2 Weeks)',
-                     labels={'mood_score': 'Mood Score (1-10)', 'date': 'Date'},
+        import plotly.express as px
+        fig = px.line(x=x, y=y,
+                     title=f'Mood Trend ({window_label(days)})',
+                     labels={'y': 'Mood Score (1-10)', 'x': 'Date'},
                      line_shape='spline')
         
         fig.update_layout(
@@ -141,43 +167,82 @@ class MoodTracker:
         
         return fig
     
+    def create_emotion_pie(self, days=30):
+        """Emotion distribution for the last N days, cached like the trend chart"""
+        window = self.get_mood_window(days)
+        if window.empty:
+            return None
+        return get_figure_cache().get_or_build(self._chart_key('emotion_pie', days),
+                                               lambda: self._build_emotion_pie(window, days))
+    
+    @timed("mindcare_figure_build_seconds", "Plotly figure construction", figure="emotion_pie")
+    def _build_emotion_pie(self, window, days):
+        emotion_counts = window.emotions.most_common()
+        import plotly.express as px
+        fig_pie = px.pie(
+            values=[count for _, count in emotion_counts], 
+            names=[emotion for emotion, _ in emotion_counts],
+            title=f"Emotion Distribution ({window_label(days)})"
+        )
+        fig_pie.update_layout(height=400)
+        return fig_pie
+    
+    def get_mood_trend(self, days=7):
+        """Compare the last three entries of the window with its first three"""
+        entries = self._since(days)
+        if len(entries) <= 3:
+            return "stable"
+        
+        recent = entries.tail(3).scores()
+        older = entries.head(3).scores()
+        recent_avg = sum(recent) / len(recent)
+        older_avg = sum(older) / len(older)
+        
+        if recent_avg > older_avg + 0.5:
+            return "improving"
+        elif recent_avg < older_avg - 0.5:
+            return "declining"
+        return "stable"
+    
     def get_mood_insights(self):
         """Generate insights from mood data"""
-        df = self.get_mood_history(7)
-        if df.empty:
+        window = self.get_mood_window(7)
+        if window.empty:
             return "Start logging your mood to see insights!"
         
-        avg_mood = df['mood_score'].mean()
-        mood_trend = "stable"
-        
-        if len(df) > 3:
-            recent_avg = df.tail(3)['mood_score'].mean()
-            older_avg = df.head(3)['mood_score'].mean()
-            
-            if recent_avg > older_avg + 0.5:
-                mood_trend = "improving"
-            elif recent_avg < older_avg - 0.5:
-                mood_trend = "declining"
-        
-        common_emotion = df['emotion'].mode().iloc[0] if not df['emotion'].empty else "mixed"
+        mood_trend = self.get_mood_trend(7)
+        common_emotion = window.most_common_emotion or "mixed"
         
         return f"""
         **Weekly Mood Insights:**
-        • Average mood: {avg_mood:.1f}/10
+        • Average mood: {window.mean:.1f}/10
         • Trend: {mood_trend}
         • Most common emotion: {common_emotion}
-        • Total entries: {len(df)}
+        • Total entries: {window.count}
         """
 
 class JournalManager:
-    def __init__(self):
-        if 'journal_entries' not in st.session_state:
-            st.session_state.journal_entries = []
+    def __init__(self, state=None):
+        self.state = resolve_state(state)
+        if 'journal_store' not in self.state:
+            store = JournalStore()
+            # Sessions started before the store kept a plain list
+            for entry in self.state.get('journal_entries', []):
+                store.add(entry)
+            self.state.journal_store = store
+        if 'journal_index' not in self.state:
+            index = JournalIndex()
+            index.add_all(self.state.journal_store)
+            self.state.journal_index = index
+        if 'journal_vectors' not in self.state:
+            vectors = VectorIndex()
+            vectors.add_all(list(self.state.journal_store))
+            self.state.journal_vectors = vectors
     
     def add_entry(self, title, content, mood_score, tags=[]):
         """Add a journal entry"""
         entry = {
-            'id': len(st.session_state.journal_entries),
+            'id': self.state.journal_store.next_id(),
             'timestamp': datetime.now(),
             'title': title,
             'content': content,
@@ -185,48 +250,67 @@ class JournalManager:
             'tags': tags,
             'word_count': len(content.split())
         }
-        st.session_state.journal_entries.append(entry)
+        self.state.journal_store.add(entry)
+        self.state.journal_index.add(entry)
+        # Embedded on a background worker; searchable a moment later
+        self.state.journal_vectors.add(entry)
         return entry['id']
     
-    def get_entries(self, limit=5):
-        """Get recent journal entries"""
-        entries = sorted(st.session_state.journal_entries, 
-                        key=lambda x: x['timestamp'], reverse=True)
-        return entries[:limit]
+    def get_entries(self, limit=5, before=None):
+        """Get summaries of recent journal entries, newest first
+        
+        Returns the summaries and a cursor to pass as ``before`` for the next
+        page (None when there are no older entries).
+        """
+        return self.state.journal_store.page(limit, before=before)
+    
+    def delete_entry(self, entry_id):
+        """Delete a journal entry and drop it from the search indexes"""
+        entry = self.state.journal_store.delete(entry_id)
+        self.state.journal_index.remove(entry)
+        self.state.journal_vectors.remove(entry_id)
+    
+    def get_entry(self, entry_id):
+        """Get a full journal entry, content included"""
+        return self.state.journal_store.get(entry_id)
     
-    def search_entries(self, query):
-        """Search journal entries"""
-        results = []
-        query_lower = query.lower()
+    def search_entries(self, query, limit=20, start_date=None, end_date=None, semantic=False):
+        """Search journal entries, best match first
         
-        for entry in st.session_state.journal_entries:
-            if (query_lower in entry['title'].lower() or 
-                query_lower in entry['content'].lower() or 
-                any(query_lower in tag.lower() for tag in entry['tags'])):
-                results.append(entry)
+        Keyword search ranks with BM25 and supports "quoted phrases" and
+        tag:name filters; semantic search ranks by embedding similarity.
+        Both take an inclusive date range.
+        """
+        start = datetime.combine(start_date, datetime.min.time()) if start_date else None
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time()) if end_date else None
         
-        return sorted(results, key=lambda x: x['timestamp'], reverse=True)
+        if semantic:
+            try:
+                hits = self.state.journal_vectors.search(query, limit=limit, start=start, end=end)
+            except Exception as e:
+                st.warning(f"Semantic search is unavailable right now: {e}")
+                hits = self.state.journal_index.search(query, limit=limit, start=start, end=end)
+        else:
+            hits = self.state.journal_index.search(query, limit=limit, start=start, end=end)
+        return [self.state.journal_store.summary(doc_id) for doc_id, _ in hits]
     
     def get_journal_stats(self):
         """Get journaling statistics"""
-        if not st.session_state.journal_entries:
+        # Running totals kept by the store, so this does not scan entries
+        stats = self.state.journal_store.stats
+        if not stats.entry_count:
             return "No journal entries yet. Start writing to see your stats!"
         
-        total_entries = len(st.session_state.journal_entries)
-        total_words = sum(entry['word_count'] for entry in st.session_state.journal_entries)
-        avg_mood = sum(entry['mood_score'] for entry in st.session_state.journal_entries) / total_entries
-        
-        # Get date range
-        dates = [entry['timestamp'].date() for entry in st.session_state.journal_entries]
-        date_range = (max(dates) - min(dates)).days + 1
+        top_tags = ", ".join(tag for tag, _ in stats.tag_counts.most_common(3)) or "None"
         
         return f"""
         **Journaling Statistics:**
-        • Total entries: {total_entries}
-        • Total words written: {total_words:,}
-        • Average words per entry: {total_words//total_entries if total_entries > 0 else 0}
-        • Average mood while journaling: {avg_mood:.1f}/10
-        • Days journaling: {date_range}
+        • Total entries: {stats.entry_count}
+        • Total words written: {stats.total_words:,}
+        • Average words per entry: {stats.avg_words}
+        • Average mood while journaling: {stats.avg_mood:.1f}/10
+        • Days journaling: {stats.days_journaling}
+        • Most used tags: {top_tags}
         """
 
 class TherapeuticTechniques:
@@ -311,41 +395,39 @@ class TherapeuticTechniques:
         return random.choice(recommended)
 
 class MentalHealthChatbot:
-    def __init__(self):
-        self.load_models()
+    def __init__(self, state=None):
+        self.state = resolve_state(state)
         self.empathetic_responses = self.load_empathetic_responses()
-        self.crisis_keywords = [
-            'suicide', 'kill myself', 'end it all', 'hurt myself', 'self harm',
-            'want to die', 'better off dead', 'no point living', 'worthless'
-        ]
-        self.mood_tracker = MoodTracker()
-        self.journal_manager = JournalManager()
+        # Crisis and emotion keywords live in data/keywords.json
+        self.keyword_matcher = get_default_matcher()
+        self.crisis_keywords = self.keyword_matcher.keywords[CRISIS_CATEGORY]
+        self.mood_tracker = MoodTracker(self.state)
+        self.journal_manager = JournalManager(self.state)
         self.techniques = TherapeuticTechniques()
-    
-    @st.cache_resource
-    def load_models(_self):
-        """Load pre-trained models with caching"""
-        try:
-            # Use DialoGPT for conversational responses
-            tokenizer = AutoTokenizer.from_pretrained("microsoft/DialoGPT-medium")
-            model = AutoModelForCausalLM.from_pretrained("microsoft/DialoGPT-medium")
-            
-            # Sentiment analysis for understanding emotional context
-            sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                return_all_scores=True
-            )
-            
-            return {
-                'tokenizer': tokenizer,
-                'model': model,
-                'sentiment_analyzer': sentiment_analyzer
-            }
-        except Exception as e:
-            st.warning(f"Could not load AI models: {e}")
+        # Seconds to wait for the first generated token / the whole reply
+        # before falling back to the template responses
+        self.first_token_deadline = 2.0
+        self.generation_deadline = 10.0
+        self._models_warning_shown = False
+    
+    def load_models(self, names=None):
+        """The shared models once they are warm, without waiting for them
+
+        Returns None while they are still loading (or failed to load), and
+        the caller answers from the keyword/template path instead.
+        """
+        names = names or model_registry.names()
+        if all(model_registry.is_loaded(name) for name in names):
+            return {name: model_registry.get(name) for name in names}
+        if any(model_registry.state(name) in (COLD, DEGRADED) for name in names):
+            # MINDCARE_WARMUP=lazy: start loading on first use; failed
+            # models are retried once their retry interval has passed
+            model_registry.start_warm_up()
+        if any(model_registry.state(name) == DEGRADED for name in names) and not self._models_warning_shown:
+            self._models_warning_shown = True
+            st.warning(f"Could not load AI models: {model_registry.last_error()}")
             st.info("Using simplified responses without AI models.")
-            return None
+        return None
     
     def load_empathetic_responses(self):
         """Load pre-defined empathetic responses for different emotional states"""
@@ -382,78 +464,26 @@ class MentalHealthChatbot:
             ]
         }
     
-    def detect_crisis(self, text):
-        """Detect potential crisis situations"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in self.crisis_keywords)
-    
-    def analyze_sentiment_and_emotion(self, text):
-        """Analyze sentiment and detect emotional context"""
-        models = self.load_models()
-        if not models:
-            # Fallback to simple keyword detection
-            text_lower = text.lower()
-            emotion_keywords = {
-                'anxiety': ['anxious', 'worried', 'nervous', 'panic', 'overwhelmed', 'scared'],
-                'depression': ['sad', 'depressed', 'hopeless', 'empty', 'numb', 'worthless'],
-                'stress': ['stressed', 'pressure', 'exhausted', 'tired', 'burned out'],
-                'loneliness': ['lonely', 'alone', 'isolated', 'disconnected', 'abandoned'],
-                'anger': ['angry', 'furious', 'mad', 'irritated', 'frustrated', 'annoyed']
-            }
-            
-            detected_emotion = 'general'
-            for emotion, keywords in emotion_keywords.items():
-                if any(keyword in text_lower for keyword in keywords):
-                    detected_emotion = emotion
-                    break
-            
-            return detected_emotion, 0.7
-        
-        try:
-            # Get sentiment scores
-            sentiment_results = models['sentiment_analyzer'](text)
-            
-            # Detect emotional keywords
-            text_lower = text.lower()
-            emotion_keywords = {
-                'anxiety': ['anxious', 'worried', 'nervous', 'panic', 'overwhelmed', 'scared'],
-                'depression': ['sad', 'depressed', 'hopeless', 'empty', 'numb', 'worthless'],
-                'stress': ['stressed', 'pressure', 'exhausted', 'tired', 'burned out'],
-                'loneliness': ['lonely', 'alone', 'isolated', 'disconnected', 'abandoned'],
-                'anger': ['angry', 'furious', 'mad', 'irritated', 'frustrated', 'annoyed']
-            }
-            
-            detected_emotion = 'general'
-            for emotion, keywords in emotion_keywords.items():
-                if any(keyword in text_lower for keyword in keywords):
-                    detected_emotion = emotion
-                    break
-            
-            # Get confidence from sentiment analysis
-            confidence = max([score['score'] for score in sentiment_results[0]])
-            
-            return detected_emotion, confidence
-            
-        except Exception as e:
-            st.warning(f"Error in sentiment analysis: {e}")
-            return 'general', 0.5
+    @timed("mindcare_chatbot_step_seconds", "Chatbot analysis and reply steps", step="analyze_message")
+    def analyze_message(self, text):
+        """Crisis flag and dominant emotion of a message, from one keyword scan
+
+        The emotion is the category with the most hits (ties go to the
+        earlier category), or 'general' when none matched.
+        """
+        hits = self.keyword_matcher.match(text)
+        crisis = hits.pop(CRISIS_CATEGORY, 0) > 0
+        return crisis, max(hits, key=hits.get) if hits else 'general'
     
-    def generate_empathetic_response(self, user_input, emotion, confidence):
-        """Generate empathetic response based on emotion and context"""
-        
-        # Check for crisis keywords first
-        if self.detect_crisis(user_input):
-            return self.get_crisis_response()
-        
-        # Get appropriate empathetic response
+    def template_response(self, emotion):
+        """Pick a pre-written empathetic response for an emotion"""
         responses = self.empathetic_responses.get(emotion, self.empathetic_responses['general'])
-        base_response = random.choice(responses)
-        
-        # Suggest a therapeutic technique
+        return random.choice(responses)
+    
+    def technique_suggestion(self, emotion):
+        """Suggest a therapeutic technique for an emotion"""
         suggested_technique = self.techniques.suggest_technique(emotion)
-        technique_suggestion = f"\n\n💡 **Technique Suggestion**: Try the {self.techniques.get_technique(suggested_technique)['name']} - it might help with what you're experiencing."
-        
-        return base_response + technique_suggestion
+        return f"\n\n💡 **Technique Suggestion**: Try the {self.techniques.get_technique(suggested_technique)['name']} - it might help with what you're experiencing."
     
     def get_crisis_response(self):
         """Provide crisis intervention response"""
@@ -470,8 +500,12 @@ class MentalHealthChatbot:
         """
 
 def main():
+    rerun_started = st.session_state.pop('rerun_started', None)
+    if rerun_started is not None:
+        RERUN_SECONDS.observe(time.perf_counter() - rerun_started)
     try:
-        # Initialize components safely
+        # Initialize components safely. The chatbot only holds per-session
+        # helpers; its models come from the process-wide model registry
         if 'chatbot' not in st.session_state:
             st.info("Initializing MindCare Pro...")
             try:
@@ -483,8 +517,14 @@ def main():
                 # Create a minimal chatbot without AI models
                 st.session_state.chatbot = None
         
-        if 'messages' not in st.session_state:
-            st.session_state.messages = []
+        if 'conversation' not in st.session_state:
+            st.session_state.conversation = ConversationMemory()
+        
+        if 'dialogue_session' not in st.session_state:
+            st.session_state.dialogue_session = DialogueSession()
+        
+        if st.session_state.chatbot and 'chat_pipeline' not in st.session_state:
+            st.session_state.chat_pipeline = ChatPipeline(st.session_state.chatbot)
         
         if 'current_page' not in st.session_state:
             st.session_state.current_page = 'chat'
@@ -497,31 +537,75 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
-        # Navigation
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["💬 Chat", "📊 Mood Tracker", "📝 Journal", "🧘 Techniques", "📈 Insights"])
-        
-        with tab1:
-            chat_interface()
-        
-        with tab2:
-            mood_tracker_interface()
+        chat_sidebar()
         
-        with tab3:
-            journal_interface()
+        # Navigation; each tab reruns on its own (tab_fragments.py)
+        tabs = st.tabs([label for label, _, _ in TABS])
+        for tab, (_, name, render) in zip(tabs, TABS):
+            with tab:
+                tab_fragment(name, render)()
         
-        with tab4:
-            techniques_interface()
-        
-        with tab5:
-            insights_interface()
+        if os.environ.get("MINDCARE_ADMIN") == "1":
+            metrics_admin_panel()
             
     except Exception as e:
         st.error(f"An error occurred in the main app: {e}")
         st.info("Please refresh the page or try again later.")
         st.exception(e)
 
-def chat_interface():
-    """Main chat interface"""
+# Chat badge per model_registry state
+MODEL_BADGES = {
+    WARM: "🟢 AI models ready",
+    LOADING: "🟡 AI models loading - replies use built-in responses until they are ready",
+    COLD: "⚪ AI models not loaded - they load with your first message",
+    DEGRADED: "🔴 Some AI models are unavailable - using built-in responses",
+}
+
+def model_status_badge():
+    """Show whether replies are model-backed yet, with the warm-up timings"""
+    state = model_registry.state()
+    st.caption(MODEL_BADGES[state])
+    info = model_registry.warm_up_info
+    if info.get('phases'):
+        with st.expander("🔥 Model warm-up"):
+            for name, phase in info['phases'].items():
+                st.write(f"**{name}**: {phase['state']} in {phase['seconds']:.1f}s")
+            if info.get('seconds') is not None:
+                st.write(f"Total: {info['seconds']:.1f}s")
+
+def metrics_admin_panel():
+    """Sidebar view of this process's metrics (MINDCARE_ADMIN=1)"""
+    with st.sidebar.expander("🛠️ Performance metrics"):
+        conversation = st.session_state.get('conversation')
+        if conversation is not None:
+            stats = conversation.stats()
+            st.caption(f"This session's chat: {stats['messages']} messages, {stats['in_memory']} held in "
+                       f"memory (~{stats['memory_bytes'] / 1024:.0f} KB), {stats['compacted']} compacted")
+        if not metrics.ENABLED:
+            st.info("Metrics are off (MINDCARE_METRICS=0).")
+            return
+        rows = metrics.registry.snapshot()
+        timings = [row for row in rows if row['type'] == 'histogram']
+        values = [row for row in rows if row['type'] != 'histogram']
+        if timings:
+            st.dataframe(
+                [{'metric': row['metric'], 'labels': row['labels'], 'count': row['count'],
+                  'mean ms': round(row['mean_ms'], 2), 'p50 ms': round(row['p50_ms'], 2),
+                  'p95 ms': round(row['p95_ms'], 2)} for row in timings],
+                use_container_width=True, hide_index=True
+            )
+        for row in values:
+            st.write(f"**{row['metric']}** {row['labels']}: {row['value']:g}")
+        port = os.environ.get("MINDCARE_METRICS_PORT")
+        if port:
+            st.caption(f"Prometheus endpoint: http://127.0.0.1:{port}/metrics")
+
+def chat_sidebar():
+    """Resources, quick mood check and chat controls in the sidebar
+
+    Rendered by main() rather than the chat tab: fragments can't write to
+    the sidebar.
+    """
     
     # Only use sidebar if not already being used by user dashboard
     if not st.session_state.get('user_authenticated', False):
@@ -550,8 +634,26 @@ def chat_interface():
                     st.success("Mood logged!")
             
             if st.button("Clear Chat", type="secondary"):
-                st.session_state.messages = []
+                st.session_state.conversation.clear()
+                st.session_state.dialogue_session.clear()
+                reset_window()
                 st.rerun()
+
+# Shown while the conversation is empty; never stored in it
+GREETING = """Hello! I'm MindCare Pro, your comprehensive mental health support companion. I'm here to listen, provide support, and help you with various tools for mental wellness.
+
+**What I can help you with:**
+• 💬 Supportive conversations and emotional support
+• 📊 Mood tracking and insights
+• 📝 Guided journaling
+• 🧘 Therapeutic techniques and exercises
+
+Remember, while I can offer support and coping strategies, I'm not a replacement for professional mental health care.
+
+How are you feeling today? What would you like to explore?"""
+
+def chat_interface():
+    """Main chat interface"""
     
     # Emergency notice
     st.markdown("""
@@ -561,73 +663,59 @@ def chat_interface():
     </div>
     """, unsafe_allow_html=True)
     
-    # Display chat history
-    for message in st.session_state.messages:
-        if message["role"] == "user":
-            st.markdown(f"""
-            <div class="chat-message user-message">
-                <strong>You:</strong> {message["content"]}
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-            <div class="chat-message bot-message">
-                <strong>MindCare:</strong> {message["content"]}
-            </div>
-            """, unsafe_allow_html=True)
+    # Chat history: the latest messages, with the new turn appended below them
+    transcript = st.container()
     
-    # Chat input
-    col1, col2 = st.columns([4, 1])
+    model_status_badge()
     
-    with col1:
-        user_input = st.text_area(
-            "How are you feeling today? What's on your mind?",
-            key="user_input",
-            height=100,
-            placeholder="Share your thoughts and feelings here..."
-        )
+    use_generation = st.checkbox(
+        "✨ Model-generated replies (experimental)",
+        key="use_generation",
+        help="Replies are written by the conversational model and stream in as they are generated."
+    )
     
-    with col2:
-        st.write("")
-        st.write("")
-        send_button = st.button("Send", type="primary", use_container_width=True)
+    pipeline = st.session_state.get('chat_pipeline')
+    if pipeline is not None and pipeline.traces:
+        with st.expander("⏱️ Last reply timing"):
+            st.json(pipeline.traces[-1])
+    
+    # Chat input
+    user_input = st.chat_input("How are you feeling today? What's on your mind?", key="user_input")
+    
+    with transcript:
+        # The greeting is shown, not stored in the conversation
+        if not len(st.session_state.conversation):
+            show_message("assistant", GREETING)
+        render_transcript(st.session_state.conversation)
     
     # Process user input
-    if send_button and user_input:
-        st.session_state.messages.append({"role": "user", "content": user_input})
+    if user_input:
+        st.session_state.conversation.append("user", user_input)
         
         # Generate response based on whether chatbot is available
         if st.session_state.chatbot:
-            with st.spinner("Thinking..."):
-                try:
-                    emotion, confidence = st.session_state.chatbot.analyze_sentiment_and_emotion(user_input)
-                    response = st.session_state.chatbot.generate_empathetic_response(user_input, emotion, confidence)
-                except Exception as e:
-                    response = "I'm here to listen and support you. Thank you for sharing your thoughts with me."
+            with transcript:
+                show_message("user", user_input)
+                
+                # The reply starts streaming as soon as its first part is ready;
+                # sending another message cancels this one
+                bubble = streaming_bubble()
+            turn = st.session_state.chat_pipeline.submit(
+                user_input, st.session_state.dialogue_session, use_generation
+            )
+            response = ""
+            for chunk in turn:
+                response += chunk
+                bubble.markdown(bubble_html("assistant", response), unsafe_allow_html=True)
+            if not response:
+                response = "I'm here to listen and support you. Thank you for sharing your thoughts with me."
         else:
             # Simple fallback response
             response = "Thank you for sharing that with me. I'm here to listen and support you. Remember, you're not alone in this journey."
         
-        st.session_state.messages.append({"role": "assistant", "content": response})
-        st.rerun()
-    
-    # Initial greeting
-    if len(st.session_state.messages) == 0:
-        initial_message = """
-        Hello! I'm MindCare Pro, your comprehensive mental health support companion. I'm here to listen, provide support, and help you with various tools for mental wellness.
-        
-        **What I can help you with:**
-        • 💬 Supportive conversations and emotional support
-        • 📊 Mood tracking and insights
-        • 📝 Guided journaling
-        • 🧘 Therapeutic techniques and exercises
-        
-        Remember, while I can offer support and coping strategies, I'm not a replacement for professional mental health care.
-        
-        How are you feeling today? What would you like to explore?
-        """
-        st.session_state.messages.append({"role": "assistant", "content": initial_message})
-        st.rerun()
+        st.session_state.conversation.append("assistant", response)
+        st.session_state.rerun_started = time.perf_counter()
+        rerun_dependents("conversation")
 
 def mood_tracker_interface():
     """Mood tracking interface"""
@@ -648,14 +736,14 @@ def mood_tracker_interface():
         if st.button("Log Mood", type="primary"):
             st.session_state.chatbot.mood_tracker.log_mood(mood_score, emotion, notes)
             st.success("Mood logged successfully!")
-            st.rerun()
+            rerun_dependents("mood")
     
     with col2:
         st.subheader("Mood Visualization")
         
         chart = st.session_state.chatbot.mood_tracker.create_mood_chart()
         if chart:
-            st.plotly_chart(chart, use_container_width=True)
+            st.plotly_chart(chart, use_container_width=True, key="mood_tab_chart")
         else:
             st.info("Start logging your mood to see trends!")
         
@@ -665,10 +753,10 @@ def mood_tracker_interface():
     
     # Recent mood entries
     st.subheader("Recent Mood Entries")
-    recent_data = st.session_state.chatbot.mood_tracker.get_mood_history(7)
+    recent_entries = st.session_state.chatbot.mood_tracker.get_recent_entries(7, limit=5)
     
-    if not recent_data.empty:
-        for _, entry in recent_data.tail(5).iterrows():
+    if recent_entries:
+        for entry in recent_entries:
             mood_emoji = "😢" if entry['mood_score'] <= 3 else "😐" if entry['mood_score'] <= 6 else "😊"
             st.markdown(f"""
             <div class="mood-card">
@@ -710,14 +798,21 @@ def journal_interface():
                     st.session_state.journal_title = ""
                     st.session_state.journal_content = ""
                     st.session_state.journal_tags = ""
-                    st.rerun()
+                    rerun_dependents("journal")
                 else:
                     st.error("Please fill in both title and content.")
     
     with tab2:
         st.subheader("Your Journal Entries")
         
-        entries = st.session_state.chatbot.journal_manager.get_entries(10)
+        # Pages are fetched from a cursor; "Load more" appends the next one
+        journal_manager = st.session_state.chatbot.journal_manager
+        view = st.session_state.get('journal_view')
+        if view is None or view['version'] != st.session_state.journal_store.version:
+            entries, cursor = journal_manager.get_entries(10)
+            view = {'entries': entries, 'cursor': cursor, 'version': st.session_state.journal_store.version}
+            st.session_state.journal_view = view
+        entries = view['entries']
         
         if entries:
             for entry in entries:
@@ -727,10 +822,18 @@ def journal_interface():
                 <div class="journal-entry">
                     <h4>{mood_emoji} {entry['title']}</h4>
                     <small>{entry['timestamp'].strftime('%Y-%m-%d %H:%M')} | Mood: {entry['mood_score']}/10 | Words: {entry['word_count']}</small>
-                    <p>{entry['content'][:200]}{'...' if len(entry['content']) > 200 else ''}</p>
+                    <p>{entry['preview']}</p>
                     <p><strong>Tags:</strong> {', '.join(entry['tags']) if entry['tags'] else 'None'}</p>
                 </div>
                 """, unsafe_allow_html=True)
+                if st.button("🗑️ Delete", key=f"journal_delete_{entry['id']}"):
+                    journal_manager.delete_entry(entry['id'])
+                    rerun_dependents("journal")
+            
+            if view['cursor'] is not None and st.button("Load more", key="journal_load_more"):
+                more, view['cursor'] = journal_manager.get_entries(10, before=view['cursor'])
+                view['entries'] = entries + more
+                rerun_dependents()
         else:
             st.info("No journal entries yet. Start writing your first entry!")
         
@@ -741,10 +844,20 @@ def journal_interface():
     with tab3:
         st.subheader("Search Journal Entries")
         
-        search_query = st.text_input("Search for:", key="journal_search")
+        search_mode = st.radio("Search by:", ["Keywords", "Meaning"], horizontal=True, key="journal_search_mode",
+                               help="Meaning finds entries about the same thing even when the words differ.")
+        search_query = st.text_input("Search for:", key="journal_search",
+                                     help='Use "quoted phrases" for exact matches and tag:name to filter by tag.')
+        
+        date_range = st.date_input("Written between (optional):", value=(), key="journal_search_dates")
+        start_date = date_range[0] if len(date_range) > 0 else None
+        end_date = date_range[1] if len(date_range) > 1 else start_date
         
         if search_query:
-            results = st.session_state.chatbot.journal_manager.search_entries(search_query)
+            results = st.session_state.chatbot.journal_manager.search_entries(
+                search_query, start_date=start_date, end_date=end_date,
+                semantic=(search_mode == "Meaning")
+            )
             
             if results:
                 st.success(f"Found {len(results)} entries:")
@@ -755,7 +868,7 @@ def journal_interface():
                     <div class="journal-entry">
                         <h4>{mood_emoji} {entry['title']}</h4>
                         <small>{entry['timestamp'].strftime('%Y-%m-%d %H:%M')}</small>
-                        <p>{entry['content'][:150]}{'...' if len(entry['content']) > 150 else ''}</p>
+                        <p>{entry['preview'][:150]}{'...' if len(entry['preview']) > 150 else ''}</p>
                     </div>
                     """, unsafe_allow_html=True)
             else:
@@ -802,18 +915,22 @@ def techniques_interface():
         if selected_technique == 'breathing':
             st.subheader("🕐 Guided Practice Timer")
             
+            if 'breathing_log' not in st.session_state:
+                st.session_state.breathing_log = BreathingLog()
+            
             col1, col2, col3 = st.columns(3)
-            with col1:
-                if st.button("Start 4-7-8 Breathing", type="primary"):
-                    st.session_state.breathing_active = True
             with col2:
                 cycles = st.number_input("Number of cycles:", min_value=1, max_value=10, value=4)
+            with col1:
+                if st.button("Start 4-7-8 Breathing", type="primary"):
+                    st.session_state.breathing_run = st.session_state.breathing_log.start(cycles)
             with col3:
-                if st.button("Stop"):
-                    st.session_state.breathing_active = False
+                if st.button("Stop") and st.session_state.get('breathing_run'):
+                    st.session_state.breathing_log.stop(st.session_state.breathing_run)
+                    st.session_state.breathing_run = None
             
-            if st.session_state.get('breathing_active', False):
-                breathing_exercise(cycles)
+            if st.session_state.get('breathing_run'):
+                breathing_exercise(st.session_state.breathing_run)
         
         elif selected_technique == 'grounding':
             st.subheader("🌍 Interactive Grounding Exercise")
@@ -823,29 +940,20 @@ def techniques_interface():
             st.subheader("🙏 Gratitude Journal")
             gratitude_exercise()
 
-def breathing_exercise(cycles):
-    """Interactive breathing exercise"""
+def breathing_exercise(run_id):
+    """Guided breathing exercise; the countdown runs in the browser"""
     st.markdown("### Follow the breathing pattern below:")
     
-    phases = ['Inhale (4 counts)', 'Hold (7 counts)', 'Exhale (8 counts)']
-    phase_durations = [4, 7, 8]
+    log = st.session_state.breathing_log
+    run = log.runs[run_id]
+    event = breathing_timer(run_id, run['cycles'])
     
-    placeholder = st.empty()
-    
-    for cycle in range(cycles):
-        st.write(f"**Cycle {cycle + 1} of {cycles}**")
-        
-        for phase, duration in zip(phases, phase_durations):
-            for count in range(duration, 0, -1):
-                placeholder.markdown(f"## {phase}: {count}")
-                time.sleep(1)
-        
-        placeholder.markdown("**Rest for 2 seconds...**")
-        time.sleep(2)
-    
-    placeholder.markdown("## ✅ Breathing exercise complete!")
-    st.success("Great job! How do you feel now?")
-    st.session_state.breathing_active = False
+    # The script only runs again when the timer reports the end of the run
+    if log.record(event) or run['event'] is not None:
+        if run['event'] == 'completed':
+            st.success("Great job! How do you feel now?")
+        else:
+            st.info(f"Stopped after {run['cycles_completed']} of {run['cycles']} cycles.")
 
 def grounding_exercise():
     """Interactive grounding exercise"""
@@ -868,12 +976,12 @@ def grounding_exercise():
         
         if st.button("Next Step", type="primary") and user_response:
             st.session_state.grounding_step += 1
-            st.rerun()
+            rerun_dependents()
     else:
         st.success("🎉 Grounding exercise complete! You've successfully connected with your present moment.")
         if st.button("Start Over"):
             st.session_state.grounding_step = 0
-            st.rerun()
+            rerun_dependents()
 
 def gratitude_exercise():
     """Interactive gratitude exercise"""
@@ -908,51 +1016,44 @@ def insights_interface():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        mood_data = st.session_state.chatbot.mood_tracker.get_mood_history(30)
-        avg_mood = mood_data['mood_score'].mean() if not mood_data.empty else 0
-        st.metric("30-Day Average Mood", f"{avg_mood:.1f}/10")
+        mood_window = st.session_state.chatbot.mood_tracker.get_mood_window(30)
+        st.metric("30-Day Average Mood", f"{mood_window.mean:.1f}/10")
     
     with col2:
-        journal_entries = len(st.session_state.journal_entries)
+        journal_entries = st.session_state.journal_store.stats.entry_count
         st.metric("Total Journal Entries", journal_entries)
     
     with col3:
-        chat_messages = len([msg for msg in st.session_state.messages if msg['role'] == 'user'])
-        st.metric("Chat Interactions", chat_messages)
+        st.metric("Chat Interactions", st.session_state.conversation.user_turns)
     
     # Mood trends
     st.subheader("📊 Detailed Mood Analysis")
     
-    mood_chart = st.session_state.chatbot.mood_tracker.create_mood_chart()
+    mood_tracker = st.session_state.chatbot.mood_tracker
+    chart_range = st.radio("Range:", list(CHART_WINDOWS), horizontal=True, key="insights_chart_range")
+    chart_days = CHART_WINDOWS[chart_range] or max(mood_tracker.all_time_days(), 14)
+    
+    mood_chart = mood_tracker.create_mood_chart(chart_days)
     if mood_chart:
-        st.plotly_chart(mood_chart, use_container_width=True)
+        st.plotly_chart(mood_chart, use_container_width=True, key="insights_mood_chart")
         
         # Emotion distribution
-        if not mood_data.empty:
-            emotion_counts = mood_data['emotion'].value_counts()
-            fig_pie = px.pie(
-                values=emotion_counts.values, 
-                names=emotion_counts.index,
-                title="Emotion Distribution (Past 30 Days)"
-            )
-            fig_pie.update_layout(height=400)
-            st.plotly_chart(fig_pie, use_container_width=True)
+        fig_pie = mood_tracker.create_emotion_pie(30)
+        if fig_pie:
+            st.plotly_chart(fig_pie, use_container_width=True, key="insights_emotion_pie")
     else:
         st.info("Start tracking your mood to see detailed insights!")
     
     # Weekly summary
     st.subheader("📅 Weekly Summary")
     
-    if not mood_data.empty:
-        weekly_data = mood_data.groupby(mood_data['timestamp'].dt.date).agg({
-            'mood_score': 'mean',
-            'emotion': lambda x: x.mode().iloc[0] if not x.empty else 'unknown'
-        }).tail(7)
+    if not mood_window.empty:
+        weekly_data = mood_window.daily()[-7:]
         
         st.markdown("**Past 7 Days:**")
-        for date, row in weekly_data.iterrows():
-            mood_emoji = "😢" if row['mood_score'] <= 3 else "😐" if row['mood_score'] <= 6 else "😊"
-            st.markdown(f"• {date}: {mood_emoji} {row['mood_score']:.1f}/10 - {row['emotion'].title()}")
+        for date, mood_score, emotion in weekly_data:
+            mood_emoji = "😢" if mood_score <= 3 else "😐" if mood_score <= 6 else "😊"
+            st.markdown(f"• {date}: {mood_emoji} {mood_score:.1f}/10 - {emotion.title()}")
     
     # Recommendations
     st.subheader("💡 Personalized Recommendations")
@@ -966,10 +1067,10 @@ def generate_recommendations():
     recommendations = []
     
     # Analyze mood data
-    mood_data = st.session_state.chatbot.mood_tracker.get_mood_history(7)
+    mood_window = st.session_state.chatbot.mood_tracker.get_mood_window(7)
     
-    if not mood_data.empty:
-        avg_mood = mood_data['mood_score'].mean()
+    if not mood_window.empty:
+        avg_mood = mood_window.mean
         
         if avg_mood < 4:
             recommendations.append("Your mood has been lower recently. Consider scheduling time for activities you enjoy.")
@@ -978,19 +1079,16 @@ def generate_recommendations():
             recommendations.append("Great job maintaining positive mood! Keep up the good habits.")
         
         # Check for mood variability
-        mood_std = mood_data['mood_score'].std()
+        mood_std = mood_window.std
         if mood_std > 2:
             recommendations.append("Your mood has been fluctuating. The 4-7-8 breathing technique might help with stability.")
     
     # Check journaling frequency
-    journal_entries = len(st.session_state.journal_entries)
-    if journal_entries == 0:
+    journal_stats = st.session_state.journal_store.stats
+    if journal_stats.entry_count == 0:
         recommendations.append("Consider starting a journal - it's a great way to process thoughts and emotions.")
-    elif journal_entries > 0:
-        recent_entries = [e for e in st.session_state.journal_entries 
-                         if (datetime.now() - e['timestamp']).days <= 7]
-        if len(recent_entries) == 0:
-            recommendations.append("You haven't journaled recently. Try writing about your week!")
+    elif not journal_stats.journaled_within(7):
+        recommendations.append("You haven't journaled recently. Try writing about your week!")
     
     # Default recommendations
     if not recommendations:
@@ -1002,5 +1100,15 @@ def generate_recommendations():
     
     return recommendations
 
+# (label, name in tab_fragments.TAB_READS, render function) per main tab
+TABS = [
+    ("💬 Chat", "chat", chat_interface),
+    ("📊 Mood Tracker", "mood", mood_tracker_interface),
+    ("📝 Journal", "journal", journal_interface),
+    ("🧘 Techniques", "techniques", techniques_interface),
+    ("📈 Insights", "insights", insights_interface),
+]
+
 if __name__ == "__main__":
+    inject_css()
     main()
\ No newline at end of file
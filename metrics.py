@@ -0,0 +1,329 @@
+# metrics.py - Lightweight counters, gauges and latency histograms with Prometheus text output
+#
+# MINDCARE_METRICS=0 turns instrumentation off: timed() decorators return
+# the function unchanged and timed() blocks become a shared no-op.
+# MINDCARE_METRICS_PORT serves /metrics from the Streamlit process.
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ENABLED = os.environ.get("MINDCARE_METRICS", "1") != "0"
+
+# Seconds; fine at the low end for keyword matching, up to model loads
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def set_enabled(enabled: bool):
+    """Turn recording on or off at runtime (decorators applied while off stay off)"""
+    global ENABLED
+    ENABLED = enabled
+
+
+def _label_key(labelnames: Sequence[str], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], key: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str = "", labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help or self.name}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help="", labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if not ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value:g}" for key, value in self.samples().items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        if not ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram, one series per label combination"""
+    kind = "histogram"
+
+    def __init__(self, name, help="", labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        if not ENABLED:
+            return
+        key = _label_key(self.labelnames, labels) if self.labelnames else ()
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        return _Timer(self, labels) if ENABLED else _NOOP
+
+    def samples(self):
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimate a quantile by interpolating inside its bucket"""
+        series = self.samples().get(_label_key(self.labelnames, labels))
+        return _bucket_quantile(self.buckets, series[0], series[2], q) if series else None
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, (counts, total, count) in self.samples().items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total:.6g}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def _bucket_quantile(buckets, counts, count, q) -> Optional[float]:
+    if not count:
+        return None
+    rank = q * count
+    cumulative = 0
+    for i, bucket_count in enumerate(counts):
+        if cumulative + bucket_count >= rank and bucket_count:
+            low = buckets[i - 1] if i > 0 else 0.0
+            high = buckets[i] if i < len(buckets) else buckets[-1]
+            return low + (high - low) * (rank - cumulative) / bucket_count
+        cumulative += bucket_count
+    return buckets[-1]
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NoOpTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoOpTimer()
+
+
+class MetricsRegistry:
+    """All metrics of this process, created on first use by name"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labelnames, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+        if type(metric) is not cls:
+            raise ValueError(f"Metric {name} is a {metric.kind}, not a {cls.kind}")
+        return metric
+
+    def counter(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str = "", labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> List[Dict]:
+        """One row per series, for the in-app admin panel"""
+        rows = []
+        for metric in list(self._metrics.values()):
+            for key, sample in metric.samples().items():
+                labels = ", ".join(f"{name}={value}" for name, value in zip(metric.labelnames, key) if value)
+                row = {"metric": metric.name, "labels": labels, "type": metric.kind}
+                if isinstance(metric, Histogram):
+                    counts, total, count = sample
+                    p50 = _bucket_quantile(metric.buckets, counts, count, 0.5)
+                    p95 = _bucket_quantile(metric.buckets, counts, count, 0.95)
+                    row.update(count=count, mean_ms=total / count * 1000 if count else None,
+                               p50_ms=p50 * 1000 if p50 is not None else None,
+                               p95_ms=p95 * 1000 if p95 is not None else None)
+                else:
+                    row.update(value=sample)
+                rows.append(row)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+registry = MetricsRegistry()
+
+
+def timed(name: str, help: str = "", **labels):
+    """Record the duration of a block or of every call into a latency histogram
+
+        @timed("mindcare_chat_transcript_seconds")
+        def render_transcript(...): ...
+
+        with timed("mindcare_tab_render_seconds", tab="chat"):
+            chat_interface()
+
+    Disabled, the decorator returns the function unchanged and the block
+    form costs one flag check.
+    """
+    if not ENABLED:
+        return _NOOP_DECORATOR
+    return _TimedBlock(registry.histogram(name, help, tuple(labels)), labels)
+
+
+class _TimedBlock(_Timer):
+    __slots__ = ()
+
+    def __call__(self, func):
+        histogram, labels = self.histogram, self.labels
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+        return wrapper
+
+
+class _NoOpDecorator(_NoOpTimer):
+    __slots__ = ()
+
+    def __call__(self, func):
+        return func
+
+
+_NOOP_DECORATOR = _NoOpDecorator()
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_http_server(port: int, addr: str = "127.0.0.1"):
+    """Serve /metrics on a background thread, once per process"""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((addr, port), Handler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
+
+
+def serve_from_env():
+    """Start the /metrics server if MINDCARE_METRICS_PORT is set"""
+    port = os.environ.get("MINDCARE_METRICS_PORT")
+    if port and ENABLED:
+        try:
+            start_http_server(int(port))
+        except OSError:
+            # Another process (or an earlier Streamlit run) already serves it
+            pass
@@ -0,0 +1,286 @@
+# model_registry.py - Process-wide registry of the shared ML models
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import metrics
+
+DIALOGUE_MODEL_NAME = "microsoft/DialoGPT-medium"
+SENTIMENT_MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+
+# Readiness of a model, and of the registry as a whole
+COLD = "cold"          # not loaded, no load started
+LOADING = "loading"    # queued for warm-up or being loaded
+WARM = "warm"          # loaded and ready
+DEGRADED = "degraded"  # loading failed; callers use the keyword/template path
+
+# A failed model is tried again once its last failure is this old
+RETRY_SECONDS = float(os.environ.get("MINDCARE_MODEL_RETRY_SECONDS", "60"))
+
+MODEL_LOAD_SECONDS = metrics.registry.histogram(
+    "mindcare_model_load_seconds", "Time to load each shared model", ("model",))
+MODEL_LOAD_FAILURES = metrics.registry.counter(
+    "mindcare_model_load_failures_total", "Model loads that raised", ("model",))
+MODELS_WARM = metrics.registry.gauge("mindcare_models_warm", "Models loaded in this process")
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _parameter_bytes(obj) -> Optional[int]:
+    """Bytes held by a torch module's parameters and buffers (pipelines included)"""
+    module = getattr(obj, "model", obj)
+    if not hasattr(module, "parameters"):
+        return None
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelRegistry:
+    """Loads each registered model at most once per process
+
+    Models are loaded lazily by ``get`` on first use, eagerly with
+    ``ensure_warm``, or on a background thread with ``start_warm_up``. Loading
+    is guarded by a per-model lock, so concurrent sessions asking for the
+    same model wait for a single load instead of each building their own
+    copy. Callers that must not block check ``is_loaded`` or ``state``
+    first and answer without the model until it is warm. A model that
+    failed to load is DEGRADED and is retried after RETRY_SECONDS.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable] = {}
+        self._models: Dict[str, object] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._info: Dict[str, Dict] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._states: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._warm_up_thread: Optional[threading.Thread] = None
+        # Serializes eager warm-ups, so concurrent reruns load each model once
+        self._warm_up_lock = threading.Lock()
+        # Timings of the last warm-up: total and per model (phase)
+        self.warm_up_info: Dict = {}
+
+    def register(self, name: str, loader: Callable[["ModelRegistry"], object]):
+        """Register a loader; it receives the registry to fetch its dependencies"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def names(self):
+        return list(self._loaders)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def state(self, name: Optional[str] = None) -> str:
+        """Readiness of one model, or of all of them
+
+        Overall, the registry is LOADING while any model is, DEGRADED once
+        any failed, WARM when all are loaded and COLD otherwise.
+        """
+        if name is not None:
+            return self._states.get(name, COLD)
+        states = [self.state(name) for name in self.names()]
+        if LOADING in states:
+            return LOADING
+        if DEGRADED in states:
+            return DEGRADED
+        if states and all(state == WARM for state in states):
+            return WARM
+        return COLD
+
+    def get(self, name: str):
+        """Return the model, loading it on first use"""
+        if name in self._models:
+            return self._models[name]
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+            if name in self._errors:
+                if time.monotonic() - self._failed_at[name] < RETRY_SECONDS:
+                    self._states[name] = DEGRADED
+                    raise self._errors[name]
+                del self._errors[name]
+
+            self._states[name] = LOADING
+            rss_before = _current_rss_bytes()
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name](self)
+            except Exception as e:
+                self._errors[name] = e
+                self._failed_at[name] = time.monotonic()
+                self._states[name] = DEGRADED
+                MODEL_LOAD_FAILURES.inc(model=name)
+                raise
+            load_seconds = time.perf_counter() - start
+            MODEL_LOAD_SECONDS.observe(load_seconds, model=name)
+            rss_after = _current_rss_bytes()
+
+            self._info[name] = {
+                "load_seconds": load_seconds,
+                "parameter_bytes": _parameter_bytes(model),
+                "rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+            }
+            self._models[name] = model
+            self._states[name] = WARM
+            MODELS_WARM.set(len(self._models))
+            return model
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[Exception]]:
+        """Load the given (or all) models now; returns the error per model, if any
+
+        Phases of models not in ``names`` keep their earlier timings.
+        """
+        names = list(names or self.names())
+        phases = dict(self.warm_up_info.get("phases", {}))
+        info = self.warm_up_info = {"started_at": time.time(), "seconds": None, "phases": phases}
+        start = time.perf_counter()
+        results = {}
+        for name in names:
+            phase_start = time.perf_counter()
+            try:
+                self.get(name)
+                results[name] = None
+            except Exception as e:
+                results[name] = e
+            info["phases"][name] = {
+                "seconds": time.perf_counter() - phase_start,
+                "state": self.state(name),
+            }
+        info["seconds"] = time.perf_counter() - start
+        return results
+
+    def _retry_due(self, names: Iterable[str]):
+        """The DEGRADED models among ``names`` whose retry interval has passed"""
+        now = time.monotonic()
+        return [name for name in names
+                if self._states.get(name) == DEGRADED and now - self._failed_at[name] >= RETRY_SECONDS]
+
+    def ensure_warm(self, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[Exception]]:
+        """Load the given (or all) models before returning, once per process
+
+        Later calls only load what is still COLD or is due a retry, so
+        reruns don't repeat the warm-up or overwrite its timings. Models
+        being loaded by the background thread are waited for.
+        """
+        names = list(names or self.names())
+        with self._warm_up_lock:
+            with self._lock:
+                pending = [name for name in names if self._states.get(name, COLD) == COLD]
+                pending += self._retry_due(names)
+                loading = [name for name in names if self._states.get(name) == LOADING]
+            results = self.warm_up(pending) if pending else {}
+            for name in loading:
+                try:
+                    self.get(name)
+                    results[name] = None
+                except Exception as e:
+                    results[name] = e
+            return results
+
+    def start_warm_up(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """Warm up on a background thread, once per process; returns that thread
+
+        DEGRADED models are only loaded again once they are due a retry;
+        after the first thread is done, a later call starts another one
+        for those.
+        """
+        with self._lock:
+            names = list(names or self.names())
+            thread = self._warm_up_thread
+            if thread is None:
+                # Models that failed (e.g. under ensure_warm) wait for their retry time here too
+                pending = [name for name in names if self._states.get(name) != DEGRADED]
+                pending += self._retry_due(names)
+            elif not thread.is_alive():
+                pending = self._retry_due(names)
+            else:
+                pending = []
+            if pending:
+                for name in pending:
+                    if self._states.get(name, COLD) in (COLD, DEGRADED):
+                        self._states[name] = LOADING
+                self._warm_up_thread = threading.Thread(
+                    target=self.warm_up, args=(pending,), name="model-warm-up", daemon=True)
+                self._warm_up_thread.start()
+            return self._warm_up_thread
+
+    def last_error(self, name: Optional[str] = None) -> Optional[Exception]:
+        if name is not None:
+            return self._errors.get(name)
+        return next(iter(self._errors.values()), None)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Load state, load time and memory footprint per model"""
+        return {
+            name: {
+                "state": self.state(name),
+                "loaded": name in self._models,
+                "error": repr(self._errors[name]) if name in self._errors else None,
+                **self._info.get(name, {}),
+            }
+            for name in self.names()
+        }
+
+
+def _load_tokenizer(registry):
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(DIALOGUE_MODEL_NAME)
+
+
+def _load_causal_lm(registry):
+    from transformers import AutoModelForCausalLM
+    return AutoModelForCausalLM.from_pretrained(DIALOGUE_MODEL_NAME).eval()
+
+
+def _load_sentiment_analyzer(registry):
+    # Backend is picked with MINDCARE_SENTIMENT_BACKEND (torch, torch-int8 or onnx)
+    from sentiment_backends import load_sentiment_pipeline
+    return load_sentiment_pipeline()
+
+
+registry = ModelRegistry()
+registry.register("tokenizer", _load_tokenizer)
+registry.register("model", _load_causal_lm)
+registry.register("sentiment_analyzer", _load_sentiment_analyzer)
+
+
+def get_models() -> Optional[Dict[str, object]]:
+    """Return all shared models, or None if any of them could not be loaded"""
+    try:
+        return {name: registry.get(name) for name in registry.names()}
+    except Exception:
+        return None
+
+
+def warm_up():
+    """Eagerly load every registered model (e.g. at server start), once per process"""
+    return registry.ensure_warm()
+
+
+def start_warm_up(mode: Optional[str] = None):
+    """Start loading the models as MINDCARE_WARMUP says
+
+    ``background`` (the default) loads them on a thread so pages and chat
+    replies do not wait, ``eager`` loads them before returning and
+    ``lazy`` leaves them until a feature first asks for them.
+    """
+    mode = mode or os.environ.get("MINDCARE_WARMUP", "background")
+    if mode == "eager":
+        registry.ensure_warm()
+    elif mode == "background":
+        registry.start_warm_up()
@@ -0,0 +1,108 @@
+# mood_aggregates.py - Per-day running aggregates for constant-time mood insights
+import math
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+class DayAggregate:
+    """Running sums for one calendar day"""
+
+    __slots__ = ("count", "total", "total_sq", "emotions")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.emotions = Counter()
+
+    def add(self, score: float, emotion: str):
+        self.count += 1
+        self.total += score
+        self.total_sq += score * score
+        self.emotions[emotion] += 1
+
+
+def most_common(counts: Counter) -> Optional[str]:
+    """Most frequent key; ties go to the alphabetically first, like pandas' mode()"""
+    if not counts:
+        return None
+    best = max(counts.values())
+    return min(key for key, value in counts.items() if value == best)
+
+
+class MoodWindow:
+    """Aggregates over a window of days, read from the per-day sums"""
+
+    def __init__(self, days: List[Tuple[date, DayAggregate]]):
+        self.days = days
+        self.count = sum(agg.count for _, agg in days)
+        self.total = sum(agg.total for _, agg in days)
+        self.total_sq = sum(agg.total_sq for _, agg in days)
+        self.emotions = Counter()
+        for _, agg in days:
+            self.emotions.update(agg.emotions)
+
+    @property
+    def empty(self) -> bool:
+        return self.count == 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, as pandas computes it)"""
+        if self.count < 2:
+            return float('nan')
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def most_common_emotion(self) -> Optional[str]:
+        return most_common(self.emotions)
+
+    def daily(self) -> List[Tuple[date, float, str]]:
+        """(date, average mood, most common emotion) for each day with entries"""
+        return [(day, agg.total / agg.count, most_common(agg.emotions)) for day, agg in self.days]
+
+
+class MoodAggregates:
+    """Per-day sums, counts, sums of squares and emotion histograms
+
+    ``add`` is O(1) per logged mood. Window queries only visit the days in
+    the window, so 7/14/30-day statistics cost the same no matter how long
+    the history is.
+    """
+
+    def __init__(self):
+        self.by_day: Dict[date, DayAggregate] = {}
+
+    @classmethod
+    def from_store(cls, store) -> "MoodAggregates":
+        """Build aggregates once from an existing MoodStore"""
+        aggregates = cls()
+        for part in store.partitions:
+            for ts, score, code in zip(part.timestamps, part.scores, part.emotion_codes):
+                aggregates.add(datetime.fromtimestamp(ts), score, store.emotions[code])
+        return aggregates
+
+    def add(self, timestamp: datetime, mood_score: float, emotion: str):
+        day = timestamp.date()
+        agg = self.by_day.get(day)
+        if agg is None:
+            agg = self.by_day[day] = DayAggregate()
+        agg.add(mood_score, emotion)
+
+    def window(self, days: int, today: Optional[date] = None) -> MoodWindow:
+        """Aggregates for the window [today - days, today], like get_mood_history(days)"""
+        today = today or datetime.now().date()
+        start = today - timedelta(days=days)
+        window_days = []
+        for offset in range(days + 1):
+            day = start + timedelta(days=offset)
+            agg = self.by_day.get(day)
+            if agg is not None:
+                window_days.append((day, agg))
+        return MoodWindow(window_days)
@@ -0,0 +1,223 @@
+# mood_store.py - Append-only, month-partitioned columnar store for mood logs
+import os
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from metrics import timed
+
+
+class MoodPartition:
+    """One calendar month of mood entries stored as typed columns"""
+
+    def __init__(self, key: Tuple[int, int]):
+        self.key = key
+        self.timestamps = array('d')     # POSIX seconds, non-decreasing
+        self.scores = array('b')         # mood score 1-10
+        self.emotion_codes = array('H')  # index into MoodStore.emotions
+        self.notes: List[str] = []
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def insert(self, ts: float, score: int, emotion_code: int, notes: str):
+        # Entries arrive in time order, so this is an append in practice
+        i = len(self.timestamps)
+        if i and self.timestamps[-1] > ts:
+            i = bisect_right(self.timestamps, ts)
+        self.timestamps.insert(i, ts)
+        self.scores.insert(i, score)
+        self.emotion_codes.insert(i, emotion_code)
+        self.notes.insert(i, notes)
+        self.dirty = True
+
+
+class MoodSlice:
+    """Read-only view over the entries of a time range; columns are copied lazily"""
+
+    def __init__(self, store: "MoodStore", spans: List[Tuple[MoodPartition, int, int]]):
+        self.store = store
+        self.spans = spans
+
+    def __len__(self):
+        return sum(hi - lo for _, lo, hi in self.spans)
+
+    def timestamps(self) -> List[float]:
+        return [ts for part, lo, hi in self.spans for ts in part.timestamps[lo:hi]]
+
+    def scores(self) -> List[int]:
+        return [score for part, lo, hi in self.spans for score in part.scores[lo:hi]]
+
+    def emotions(self) -> List[str]:
+        names = self.store.emotions
+        return [names[code] for part, lo, hi in self.spans for code in part.emotion_codes[lo:hi]]
+
+    def notes(self) -> List[str]:
+        return [note for part, lo, hi in self.spans for note in part.notes[lo:hi]]
+
+    def head(self, n: int) -> "MoodSlice":
+        """The first ``n`` entries of this slice"""
+        spans = []
+        for part, lo, hi in self.spans:
+            if n <= 0:
+                break
+            take = min(n, hi - lo)
+            spans.append((part, lo, lo + take))
+            n -= take
+        return MoodSlice(self.store, spans)
+
+    def tail(self, n: int) -> "MoodSlice":
+        """The last ``n`` entries of this slice"""
+        spans = []
+        for part, lo, hi in reversed(self.spans):
+            if n <= 0:
+                break
+            take = min(n, hi - lo)
+            spans.insert(0, (part, hi - take, hi))
+            n -= take
+        return MoodSlice(self.store, spans)
+
+    def __iter__(self) -> Iterator[Dict]:
+        names = self.store.emotions
+        for part, lo, hi in self.spans:
+            for i in range(lo, hi):
+                yield {
+                    'timestamp': datetime.fromtimestamp(part.timestamps[i]),
+                    'mood_score': part.scores[i],
+                    'emotion': names[part.emotion_codes[i]],
+                    'notes': part.notes[i]
+                }
+
+    @timed("mindcare_dataframe_build_seconds", "pandas DataFrame construction", frame="mood_log")
+    def to_dataframe(self):
+        """Build a DataFrame with the same columns the pandas-based code used"""
+        import pandas as pd
+
+        if len(self) == 0:
+            return pd.DataFrame()
+        # Stored seconds are POSIX time; present them as naive local datetimes
+        timestamps = pd.to_datetime([datetime.fromtimestamp(ts) for ts in self.timestamps()])
+        df = pd.DataFrame({
+            'timestamp': timestamps,
+            'mood_score': self.scores(),
+            'emotion': self.emotions(),
+            'notes': self.notes(),
+        })
+        df['date'] = df['timestamp'].dt.date
+        return df
+
+
+class MoodStore:
+    """Append-only mood log partitioned by month
+
+    Partitions are kept in chronological order, so a "last N days" query
+    finds its first partition and its first row with binary search and
+    never touches older data. Each partition can be written to and read
+    back from a Parquet file.
+    """
+
+    def __init__(self):
+        self.partitions: List[MoodPartition] = []
+        self._keys: List[Tuple[int, int]] = []
+        self.emotions: List[str] = []
+        self._emotion_codes: Dict[str, int] = {}
+        # Increases on every append; lets callers cache derived results.
+        # (store_id, version) identifies the data across stores and sessions.
+        self.store_id = uuid.uuid4().hex
+        self.version = 0
+
+    def __len__(self):
+        return sum(len(part) for part in self.partitions)
+
+    def _emotion_code(self, emotion: str) -> int:
+        code = self._emotion_codes.get(emotion)
+        if code is None:
+            code = len(self.emotions)
+            self.emotions.append(emotion)
+            self._emotion_codes[emotion] = code
+        return code
+
+    def _partition(self, key: Tuple[int, int]) -> MoodPartition:
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self.partitions[i]
+        part = MoodPartition(key)
+        self._keys.insert(i, key)
+        self.partitions.insert(i, part)
+        return part
+
+    def append(self, timestamp: datetime, mood_score: int, emotion: str, notes: str = ""):
+        """Add an entry"""
+        part = self._partition((timestamp.year, timestamp.month))
+        part.insert(timestamp.timestamp(), mood_score, self._emotion_code(emotion), notes or "")
+        self.version += 1
+
+    def since(self, start: datetime, end: Optional[datetime] = None) -> MoodSlice:
+        """Entries with start <= timestamp (< end), found by binary search"""
+        start_ts = start.timestamp()
+        end_ts = end.timestamp() if end is not None else None
+        first = bisect_left(self._keys, (start.year, start.month))
+        spans = []
+        for part in self.partitions[first:]:
+            if end is not None and part.key > (end.year, end.month):
+                break
+            lo = bisect_left(part.timestamps, start_ts)
+            hi = bisect_left(part.timestamps, end_ts) if end_ts is not None else len(part)
+            if hi > lo:
+                spans.append((part, lo, hi))
+        return MoodSlice(self, spans)
+
+    def tail(self, n: int) -> MoodSlice:
+        """The last ``n`` entries"""
+        spans = []
+        for part in reversed(self.partitions):
+            if n <= 0:
+                break
+            take = min(n, len(part))
+            spans.insert(0, (part, len(part) - take, len(part)))
+            n -= take
+        return MoodSlice(self, spans)
+
+    def save_parquet(self, directory: str, only_dirty: bool = True):
+        """Write each (changed) partition to ``mood-YYYY-MM.parquet``"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(directory, exist_ok=True)
+        for part in self.partitions:
+            if only_dirty and not part.dirty:
+                continue
+            table = pa.table({
+                'timestamp': pa.array(part.timestamps, type=pa.float64()),
+                'mood_score': pa.array(part.scores, type=pa.int8()),
+                'emotion': pa.DictionaryArray.from_arrays(
+                    pa.array(part.emotion_codes, type=pa.int16()), pa.array(self.emotions, type=pa.string())
+                ),
+                'notes': pa.array(part.notes, type=pa.string()),
+            })
+            pq.write_table(table, os.path.join(directory, "mood-%04d-%02d.parquet" % part.key))
+            part.dirty = False
+
+    @classmethod
+    def load_parquet(cls, directory: str) -> "MoodStore":
+        """Rebuild a store from the partition files written by ``save_parquet``"""
+        import pyarrow.parquet as pq
+
+        store = cls()
+        if not os.path.isdir(directory):
+            return store
+        for name in sorted(os.listdir(directory)):
+            if not (name.startswith("mood-") and name.endswith(".parquet")):
+                continue
+            year, month = int(name[5:9]), int(name[10:12])
+            columns = pq.read_table(os.path.join(directory, name)).to_pydict()
+            part = store._partition((year, month))
+            part.timestamps.extend(columns['timestamp'])
+            part.scores.extend(columns['mood_score'])
+            part.emotion_codes.extend(store._emotion_code(emotion) for emotion in columns['emotion'])
+            part.notes.extend(note or "" for note in columns['notes'])
+            store.version += len(part)
+        return store
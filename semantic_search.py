@@ -0,0 +1,235 @@
+# semantic_search.py - Sentence embeddings and a vector index for semantic journal search
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+EMBEDDING_MODEL_NAME = os.environ.get("MINDCARE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# "sentence-transformers" or "hashing" (deterministic, no model download)
+DEFAULT_EMBEDDER = os.environ.get("MINDCARE_EMBEDDER", "sentence-transformers")
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder for tests and offline use
+
+    Words and character trigrams are hashed into ``dim`` buckets with a
+    stable hash, so the same text always gives the same vector in every
+    process. It only captures surface overlap, not meaning.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, (1.0 if value >> 63 else -1.0)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD_RE.findall(text.lower()):
+                features = [word] + [word[i:i + 3] for i in range(max(len(word) - 2, 0))]
+                for feature in features:
+                    bucket, sign = self._bucket(feature)
+                    vectors[row, bucket] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model, loaded on first use"""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self._load().encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Return the process-wide embedder
+
+    Falls back to the hashing embedder when sentence-transformers is not
+    installed, so semantic search still works (as fuzzy keyword search).
+    """
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            if DEFAULT_EMBEDDER == "hashing" or importlib.util.find_spec("sentence_transformers") is None:
+                _embedder = HashingEmbedder()
+            else:
+                _embedder = SentenceTransformerEmbedder()
+    return _embedder
+
+
+# One background worker computes embeddings for every session
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal-embedder")
+
+
+def entry_text(entry: Dict) -> str:
+    return " ".join([entry['title'], entry['content']] + list(entry.get('tags', [])))
+
+
+class VectorIndex:
+    """Journal embeddings in one contiguous float32 matrix
+
+    ``add`` hands the embedding work to a background thread, so saving an
+    entry does not wait for the model. Rows live in a preallocated matrix
+    that doubles when full, and a query is one matrix-vector product over
+    all of them. Entries whose embedding failed are logged and embedded
+    again on the next search.
+    """
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or get_embedder()
+        self.matrix: Optional[np.ndarray] = None
+        self.doc_ids = np.zeros(0, dtype=np.int64)
+        self.timestamps = np.zeros(0, dtype=np.float64)
+        self.size = 0
+        # Deleted doc ids; their rows stay in the matrix but are never returned
+        self.deleted: Set[int] = set()
+        self._pending: List[Future] = []
+        # Batches whose embedding raised, as (doc ids, timestamps, texts)
+        self._failed: List[Tuple[List[int], List[float], List[str]]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, dim: int, needed: int):
+        capacity = 0 if self.matrix is None else len(self.matrix)
+        if needed <= capacity:
+            return
+        capacity = max(64, capacity)
+        while capacity < needed:
+            capacity *= 2
+        matrix = np.zeros((capacity, dim), dtype=np.float32)
+        doc_ids = np.zeros(capacity, dtype=np.int64)
+        timestamps = np.zeros(capacity, dtype=np.float64)
+        if self.matrix is not None:
+            matrix[:self.size] = self.matrix[:self.size]
+            doc_ids[:self.size] = self.doc_ids[:self.size]
+            timestamps[:self.size] = self.timestamps[:self.size]
+        self.matrix, self.doc_ids, self.timestamps = matrix, doc_ids, timestamps
+
+    def _append(self, doc_ids: List[int], timestamps: List[float], vectors: np.ndarray):
+        with self._lock:
+            start = self.size
+            self._grow(vectors.shape[1], start + len(vectors))
+            self.matrix[start:start + len(vectors)] = vectors
+            self.doc_ids[start:start + len(vectors)] = doc_ids
+            self.timestamps[start:start + len(vectors)] = timestamps
+            self.size += len(vectors)
+
+    def add(self, entry: Dict) -> Future:
+        """Embed an entry in the background; the future resolves once it is searchable"""
+        return self.add_all([entry])
+
+    def add_all(self, entries: List[Dict]) -> Future:
+        doc_ids = [entry['id'] for entry in entries]
+        timestamps = [entry['timestamp'].timestamp() for entry in entries]
+        texts = [entry_text(entry) for entry in entries]
+        return self._submit(doc_ids, timestamps, texts)
+
+    def _submit(self, doc_ids: List[int], timestamps: List[float], texts: List[str]) -> Future:
+        def work():
+            if not texts:
+                return
+            try:
+                vectors = self.embedder.encode(texts)
+            except Exception:
+                logger.exception("Embedding %d journal entries failed; retrying on the next search", len(texts))
+                with self._lock:
+                    self._failed.append((doc_ids, timestamps, texts))
+                return
+            self._append(doc_ids, timestamps, vectors)
+
+        future = _executor.submit(work)
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()] + [future]
+        return future
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            self.deleted.add(doc_id)
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for queued embeddings; failed ones are left for ``retry_failed``"""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result(timeout)
+
+    def retry_failed(self) -> List[Future]:
+        """Queue the entries whose embedding failed again"""
+        with self._lock:
+            failed, self._failed = self._failed, []
+        return [self._submit(*batch) for batch in failed]
+
+    def search(self, query: str, limit: int = 20,
+               start: Optional[datetime] = None, end: Optional[datetime] = None,
+               wait_timeout: Optional[float] = 2.0) -> List[Tuple[int, float]]:
+        """Return (doc id, cosine similarity) pairs, best first"""
+        self.retry_failed()
+        self.wait(wait_timeout)
+        if self.size == 0 or not query.strip():
+            return []
+
+        query_vector = self.embedder.encode([query])[0]
+        with self._lock:
+            size = self.size
+            matrix, doc_ids, timestamps = self.matrix, self.doc_ids, self.timestamps
+            deleted = list(self.deleted)
+
+        rows = np.arange(size)
+        scores = matrix[:size] @ query_vector
+
+        if deleted:
+            keep = ~np.isin(doc_ids[rows], deleted)
+            rows, scores = rows[keep], scores[keep]
+
+        if start is not None or end is not None:
+            stamps = timestamps[rows]
+            keep = np.ones(len(rows), dtype=bool)
+            if start is not None:
+                keep &= stamps >= start.timestamp()
+            if end is not None:
+                keep &= stamps < end.timestamp()
+            rows, scores = rows[keep], scores[keep]
+
+        if len(scores) > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(doc_ids[rows[i]]), float(scores[i])) for i in top]
@@ -0,0 +1,114 @@
+# sentiment_backends.py - Selectable CPU inference backends for the sentiment model
+import os
+from typing import Dict, List, Optional
+
+from model_registry import SENTIMENT_MODEL_NAME
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+DEFAULT_BACKEND = os.environ.get("MINDCARE_SENTIMENT_BACKEND", "torch")
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MINDCARE_MODEL_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "mindcare", "sentiment")
+)
+
+
+def _model_cache_dir(cache_dir: str, backend: str) -> str:
+    return os.path.join(cache_dir, SENTIMENT_MODEL_NAME.replace("/", "--"), backend)
+
+
+def _load_torch(cache_dir):
+    # top_k=None scores every label: one list of {label, score} dicts per text
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=SENTIMENT_MODEL_NAME, top_k=None)
+
+
+def _load_torch_int8(cache_dir):
+    """Dynamic int8 quantization of the Linear layers, cached as a state dict"""
+    import torch
+    from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_NAME)
+    weights_path = os.path.join(_model_cache_dir(cache_dir, "torch-int8"), "quantized_state_dict.pt")
+
+    if os.path.exists(weights_path):
+        # Build the fp32 skeleton from the config only, quantize its structure
+        # and load the cached int8 weights into it
+        config = AutoConfig.from_pretrained(SENTIMENT_MODEL_NAME)
+        model = AutoModelForSequenceClassification.from_config(config).eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        model.load_state_dict(torch.load(weights_path))
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_NAME).eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        os.makedirs(os.path.dirname(weights_path), exist_ok=True)
+        torch.save(model.state_dict(), weights_path)
+
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, top_k=None)
+
+
+def _load_onnx(cache_dir):
+    """ONNX graph run by onnxruntime, exported once and reused from disk"""
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError("The onnx backend needs `pip install optimum[onnxruntime]`") from e
+    from transformers import AutoTokenizer, pipeline
+
+    export_dir = _model_cache_dir(cache_dir, "onnx")
+    if os.path.exists(os.path.join(export_dir, "model.onnx")):
+        model = ORTModelForSequenceClassification.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL_NAME, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_MODEL_NAME)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, top_k=None)
+
+
+_LOADERS = {
+    "torch": _load_torch,
+    "torch-int8": _load_torch_int8,
+    "onnx": _load_onnx,
+}
+
+
+def load_sentiment_pipeline(backend: Optional[str] = None, cache_dir: str = DEFAULT_CACHE_DIR):
+    """Build the sentiment pipeline on the requested backend"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in _LOADERS:
+        raise ValueError(f"Unknown sentiment backend {backend!r}; choose one of {', '.join(BACKENDS)}")
+    return _LOADERS[backend](cache_dir)
+
+
+def _label_distribution(scores: List[Dict]) -> Dict[str, float]:
+    return {item['label']: item['score'] for item in scores}
+
+
+def check_parity(reference_outputs: List[List[Dict]], candidate_outputs: List[List[Dict]],
+                 tolerance: float = 0.05) -> Dict:
+    """Compare per-label probabilities of two backends on the same texts
+
+    Passes when no label probability differs by more than ``tolerance``.
+    The share of texts whose top label agrees is reported alongside.
+    """
+    if len(reference_outputs) != len(candidate_outputs):
+        raise ValueError("Both backends must score the same texts")
+
+    max_diff = 0.0
+    agreeing = 0
+    for reference, candidate in zip(reference_outputs, candidate_outputs):
+        expected = _label_distribution(reference)
+        actual = _label_distribution(candidate)
+        for label, probability in expected.items():
+            max_diff = max(max_diff, abs(probability - actual.get(label, 0.0)))
+        if max(expected, key=expected.get) == max(actual, key=actual.get):
+            agreeing += 1
+
+    return {
+        'passed': max_diff <= tolerance,
+        'max_abs_diff': max_diff,
+        'top_label_agreement': agreeing / len(reference_outputs) if reference_outputs else 1.0,
+        'tolerance': tolerance,
+    }
@@ -0,0 +1,150 @@
+# sentiment_cache.py - Bounded LRU/TTL cache for sentiment pipeline results
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sentiment_backends import DEFAULT_BACKEND
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def normalize_text(text: str) -> str:
+    """Cache key for a message: lowercased with whitespace collapsed"""
+    return " ".join(text.lower().split())
+
+
+class SentimentCache:
+    """LRU cache with a TTL, bounded by entry count and approximate bytes
+
+    Keys are normalized texts, so "I feel anxious" and "i feel anxious "
+    share one entry. They are prefixed with the ``backend`` that scored
+    them, as fp32, int8 and ONNX results differ slightly. When ``path`` is
+    given, entries are written through to a SQLite file and the most
+    recent ones are loaded back on start, so a restarted process does not
+    begin cold.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS, path: Optional[str] = None,
+                 backend: str = DEFAULT_BACKEND):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.size_bytes = 0
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._lock = threading.Lock()
+        # SQLite writes take their own lock, so lookups never wait on the disk
+        self._db_lock = threading.Lock()
+        self._db = None
+        if path:
+            self._open(path)
+
+    def _open(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, stored_at REAL NOT NULL)"
+        )
+        # Keep the file bounded too: drop expired rows and everything past the newest max_entries
+        self._db.execute("DELETE FROM sentiment_cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        self._db.execute(
+            "DELETE FROM sentiment_cache WHERE key NOT IN"
+            " (SELECT key FROM sentiment_cache ORDER BY stored_at DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT key, value, expires_at FROM sentiment_cache ORDER BY stored_at DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        # Oldest first, so the most recently stored entries end up most recently used
+        for key, value, expires_at in reversed(rows):
+            self._store(key, json.loads(value), expires_at, len(key) + len(value))
+
+    def _store(self, key, value, expires_at, size):
+        if key in self._entries:
+            self.size_bytes -= self._entries.pop(key)[2]
+        self._entries[key] = (value, expires_at, size)
+        self.size_bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted_size
+
+    def _key(self, text: str) -> str:
+        return f"{self.backend}:{normalize_text(text)}"
+
+    def get(self, text: str):
+        """Return the cached result for ``text`` or None"""
+        key = self._key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] < time.time():
+                self.size_bytes -= self._entries.pop(key)[2]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, text: str, value):
+        """Store a JSON-serializable result for ``text``
+
+        With persistence on this commits to SQLite; call it off the event loop.
+        """
+        key = self._key(text)
+        encoded = json.dumps(value)
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._store(key, value, expires_at, len(key) + len(encoded))
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sentiment_cache (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, encoded, expires_at, now)
+                )
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM sentiment_cache")
+                self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size_bytes': self.size_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_sentiment_cache() -> SentimentCache:
+    """Return the process-wide cache; MINDCARE_SENTIMENT_CACHE enables persistence"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = SentimentCache(path=os.environ.get("MINDCARE_SENTIMENT_CACHE"))
+    return _default_cache
@@ -0,0 +1,101 @@
+# state_backend.py - Per-session state for the Streamlit UI and the headless API
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class SessionState(dict):
+    """A dict with attribute access, like ``st.session_state``
+
+    The core classes (MentalHealthChatbot, MoodTracker, JournalManager,
+    UserManager) only use ``state.name``, ``'name' in state``,
+    ``state.get(...)`` and ``state[key]``, so they run the same on
+    Streamlit's session state and on this.
+    """
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def resolve_state(state=None):
+    """The given state, or Streamlit's session state when running in the UI"""
+    if state is not None:
+        return state
+    import streamlit as st
+    return st.session_state
+
+
+class InMemoryStateStore:
+    """Session states of one server process, evicted after ``ttl_seconds`` idle
+
+    Each worker process keeps its own sessions, so every request of a
+    session must reach the worker that created it. Session ids start with
+    ``id_prefix`` (the worker id) for the load balancer to route on. Data
+    that has to outlive a worker, such as accounts and mood logs, goes
+    through the shared user repository and mood Parquet directory instead.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600.0, id_prefix: str = ""):
+        self.ttl_seconds = ttl_seconds
+        self.id_prefix = id_prefix
+        self._sessions: Dict[str, Tuple[SessionState, threading.Lock]] = {}
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str):
+        return session_id in self._sessions
+
+    def create(self) -> str:
+        session_id = self.id_prefix + uuid.uuid4().hex
+        with self._lock:
+            self._sessions[session_id] = (SessionState(), threading.Lock())
+            self._last_used[session_id] = time.monotonic()
+        self.evict_idle()
+        return session_id
+
+    def get(self, session_id: str) -> SessionState:
+        """The session's state without taking its lock (for long-lived readers)"""
+        with self._lock:
+            state, _ = self._sessions[session_id]
+            self._last_used[session_id] = time.monotonic()
+        return state
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[SessionState]:
+        """Hold the session's lock while a request reads and changes its state"""
+        with self._lock:
+            state, lock = self._sessions[session_id]
+            self._last_used[session_id] = time.monotonic()
+        with lock:
+            yield state
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._last_used.pop(session_id, None)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            idle = [sid for sid, used in self._last_used.items() if now - used > self.ttl_seconds]
+            for session_id in idle:
+                del self._sessions[session_id]
+                del self._last_used[session_id]
+        return len(idle)
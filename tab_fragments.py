@@ -0,0 +1,62 @@
+# tab_fragments.py - Each main tab re-executes on its own as an st.fragment, with declared data dependencies
+#
+# An interaction inside a tab (a slider, a text box, a "load more")
+# reruns only that tab. A write that another tab displays escalates to a
+# full app rerun through rerun_dependents(). MINDCARE_TAB_FRAGMENTS=0
+# renders every tab on every rerun, as before.
+import os
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+import metrics
+
+ENABLED = os.environ.get("MINDCARE_TAB_FRAGMENTS", "1") != "0"
+
+# Shared data each tab displays; a change to one of these reruns every tab that reads it
+TAB_READS = {
+    "chat": {"conversation"},
+    "mood": {"mood"},
+    "journal": {"journal"},
+    "techniques": {"breathing"},
+    "insights": {"mood", "journal", "conversation"},
+}
+
+TAB_RENDER_SECONDS = metrics.registry.histogram(
+    "mindcare_tab_render_seconds", "Script time spent rendering each tab", ("tab",))
+
+_fragments = {}
+
+
+def tab_fragment(name, render):
+    """``render`` wrapped as the fragment for tab ``name``, created once per process"""
+    fragment = _fragments.get(name)
+    if fragment is None:
+        def run_tab():
+            st.session_state.rendering_tab = name
+            try:
+                with TAB_RENDER_SECONDS.time(tab=name):
+                    render()
+            finally:
+                st.session_state.rendering_tab = None
+
+        run_tab.__qualname__ = f"tab_{name}"
+        fragment = _fragments[name] = st.fragment(run_tab) if ENABLED else run_tab
+    return fragment
+
+
+def rerun_dependents(*changed):
+    """Rerun after a write: just the current tab, or the app if another tab reads ``changed``
+
+    Called with no arguments when only the tab's own view state changed.
+    """
+    tab = st.session_state.get('rendering_tab')
+    others = [other for other, reads in TAB_READS.items() if other != tab and reads & set(changed)]
+    if ENABLED and tab and not others:
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            # The tab is running as part of a full app run, where a
+            # fragment-scoped rerun isn't allowed
+            pass
+    st.rerun()
@@ -0,0 +1,75 @@
+# ui_styles.py - Page CSS shared by the login page and the main app
+import streamlit as st
+
+
+def inject_css():
+    """Custom CSS for better styling"""
+    st.markdown("""
+<style>
+    .main-header {
+        text-align: center;
+        padding: 2rem 0;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        border-radius: 10px;
+        margin-bottom: 2rem;
+    }
+    
+    .chat-message {
+        padding: 1rem;
+        border-radius: 10px;
+        margin: 1rem 0;
+        border-left: 4px solid #667eea;
+    }
+    
+    .user-message {
+        background-color: #f0f2f6;
+        border-left-color: #4CAF50;
+    }
+    
+    .bot-message {
+        background-color: #e8f4fd;
+        border-left-color: #2196F3;
+    }
+    
+    .therapy-exercise {
+        background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%);
+        padding: 1.5rem;
+        border-radius: 10px;
+        margin: 1rem 0;
+        border-left: 4px solid #ff6b6b;
+    }
+    
+    .mood-card {
+        background: white;
+        padding: 1rem;
+        border-radius: 10px;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        margin: 0.5rem 0;
+        text-align: center;
+    }
+    
+    .journal-entry {
+        background: #f8f9fa;
+        padding: 1rem;
+        border-radius: 8px;
+        border-left: 3px solid #6c757d;
+        margin: 0.5rem 0;
+    }
+    
+    .emergency-notice {
+        background-color: #fff3cd;
+        border: 1px solid #ffeaa7;
+        border-radius: 5px;
+        padding: 1rem;
+        margin: 1rem 0;
+    }
+    
+    .technique-card {
+        background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
+        padding: 1rem;
+        border-radius: 10px;
+        margin: 0.5rem 0;
+    }
+</style>
+    """, unsafe_allow_html=True)
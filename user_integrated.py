@@ -2,96 +2,50 @@ import streamlit as st
 import json
 import hashlib
 from datetime import datetime, timedelta
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 import uuid
+from user_store import LazyCollection, UserRepository, get_user_repository, mark_changed
+from state_backend import resolve_state
+from assessments import PHQ9, get_instrument
+from metrics import timed
+from figure_cache import get_figure_cache, lttb
+
+# pandas and plotly load with the first chart, not with the login page
+if TYPE_CHECKING:
+    import pandas as pd
 
 class DepressionAssessment:
-    """PHQ-9 Depression Assessment Tool"""
-    
-    def __init__(self):
-        self.questions = [
-            "Little interest or pleasure in doing things",
-            "Feeling down, depressed, or hopeless",
-            "Trouble falling or staying asleep, or sleeping too much",
-            "Feeling tired or having little energy",
-            "Poor appetite or overeating",
-            "Feeling bad about yourself or that you are a failure or have let yourself or your family down",
-            "Trouble concentrating on things, such as reading the newspaper or watching television",
-            "Moving or speaking so slowly that other people could have noticed. Or the opposite - being so fidgety or restless that you have been moving around a lot more than usual",
-            "Thoughts that you would be better off dead, or of hurting yourself"
-        ]
-        
-        self.response_options = {
-            0: "Not at all",
-            1: "Several days",
-            2: "More than half the days",
-            3: "Nearly every day"
-        }
-        
-        self.severity_levels = {
-            (0, 4): {"level": "Minimal", "color": "#28a745", "description": "Minimal depression symptoms"},
-            (5, 9): {"level": "Mild", "color": "#ffc107", "description": "Mild depression symptoms"},
-            (10, 14): {"level": "Moderate", "color": "#fd7e14", "description": "Moderate depression symptoms"},
-            (15, 19): {"level": "Moderately Severe", "color": "#dc3545", "description": "Moderately severe depression symptoms"},
-            (20, 27): {"level": "Severe", "color": "#721c24", "description": "Severe depression symptoms"}
-        }
+    """PHQ-9 Depression Assessment Tool
+
+    A view of the compiled PHQ9 instrument in assessments.py, so creating
+    one on every rerun costs nothing.
+    """
+    
+    instrument = PHQ9
+    questions = list(PHQ9.questions)
+    response_options = dict(enumerate(PHQ9.options))
+    severity_levels = {
+        (band.low, band.high): {"level": band.level, "color": band.color, "description": band.description}
+        for band in PHQ9.bands
+    }
     
     def get_severity_info(self, score: int) -> Dict:
         """Get severity information based on score"""
-        for (min_score, max_score), info in self.severity_levels.items():
-            if min_score <= score <= max_score:
-                return {**info, "score": score}
-        return {"level": "Unknown", "color": "#6c757d", "description": "Score out of range", "score": score}
+        return self.instrument.severity_info(score)
     
     def get_recommendations(self, score: int) -> List[str]:
         """Get recommendations based on depression score"""
-        severity = self.get_severity_info(score)
-        
-        recommendations = {
-            "Minimal": [
-                "Continue with your current self-care practices",
-                "Regular exercise and social connections are great for maintaining mental health",
-                "Consider journaling to track your mood patterns",
-                "Practice gratitude exercises daily"
-            ],
-            "Mild": [
-                "Try incorporating more physical activity into your routine",
-                "Consider talking to a counselor or therapist",
-                "Practice stress-reduction techniques like meditation",
-                "Maintain regular sleep and eating schedules",
-                "Stay connected with supportive friends and family"
-            ],
-            "Moderate": [
-                "It's recommended to speak with a mental health professional",
-                "Consider therapy (CBT has shown great results for depression)",
-                "Regular exercise can be as effective as medication for mild-moderate depression",
-                "Practice mindfulness and stress-reduction techniques",
-                "Avoid alcohol and drugs as they can worsen symptoms"
-            ],
-            "Moderately Severe": [
-                "Please consider seeing a mental health professional soon",
-                "A combination of therapy and medication may be helpful",
-                "Reach out to trusted friends, family, or support groups",
-                "Create a safety plan if you're having thoughts of self-harm",
-                "Consider intensive outpatient programs if available"
-            ],
-            "Severe": [
-                "Please seek professional help immediately",
-                "Contact a mental health crisis line if needed",
-                "Consider inpatient treatment if you're having suicidal thoughts",
-                "Inform a trusted person about how you're feeling",
-                "Create a comprehensive safety plan with professional help"
-            ]
-        }
-        
-        return recommendations.get(severity["level"], ["Please consult with a mental health professional"])
+        return self.instrument.recommendations(score)
 
 class UserProfile:
     """Enhanced user profile with comprehensive tracking"""
     
+    # Loaded from the user repository on first access (see user_store)
+    depression_assessments = LazyCollection()
+    anxiety_assessments = LazyCollection()
+    goals = LazyCollection()
+    achievements = LazyCollection()
+    
     def __init__(self, user_id: str, username: str, email: str):
         self.user_id = user_id
         self.username = username
@@ -121,26 +75,39 @@ class UserProfile:
             "reminder_notifications": True
         }
     
-    def add_depression_assessment(self, responses: List[int], additional_notes: str = ""):
-        """Add a depression assessment result"""
-        total_score = sum(responses)
-        assessment = DepressionAssessment()
-        severity_info = assessment.get_severity_info(total_score)
+    # Where each instrument's results are kept
+    ASSESSMENT_COLLECTIONS = {"phq9": "depression_assessments", "gad7": "anxiety_assessments"}
+    
+    def add_assessment(self, instrument_key: str, responses: List[int], additional_notes: str = ""):
+        """Score and store an assessment with one of the assessments.INSTRUMENTS"""
+        scores = get_instrument(instrument_key).score(responses)
         
         assessment_data = {
             "timestamp": datetime.now(),
             "responses": responses,
-            "total_score": total_score,
-            "severity": severity_info["level"],
+            "total_score": scores["total_score"],
+            "severity": scores["severity"],
             "additional_notes": additional_notes,
-            "recommendations": assessment.get_recommendations(total_score)
+            "recommendations": scores["recommendations"]
         }
         
-        self.depression_assessments.append(assessment_data)
+        collection = self.ASSESSMENT_COLLECTIONS[instrument_key]
+        getattr(self, collection).append(assessment_data)
+        mark_changed(self, collection)
         return assessment_data
     
-    def get_depression_history(self) -> pd.DataFrame:
+    def add_depression_assessment(self, responses: List[int], additional_notes: str = ""):
+        """Add a depression assessment result"""
+        return self.add_assessment("phq9", responses, additional_notes)
+    
+    def add_anxiety_assessment(self, responses: List[int], additional_notes: str = ""):
+        """Add a GAD-7 anxiety assessment result"""
+        return self.add_assessment("gad7", responses, additional_notes)
+    
+    @timed("mindcare_dataframe_build_seconds", "pandas DataFrame construction", frame="depression_history")
+    def get_depression_history(self) -> "pd.DataFrame":
         """Get depression assessment history as DataFrame"""
+        import pandas as pd
         if not self.depression_assessments:
             return pd.DataFrame()
         
@@ -195,6 +162,7 @@ class UserProfile:
         for goal in self.goals:
             if goal["id"] == goal_id:
                 goal["progress"] = min(100, max(0, progress))
+                mark_changed(self, "goals")
                 if progress >= 100:
                     goal["completed"] = True
                     self.achievements.append({
@@ -202,77 +170,86 @@ class UserProfile:
                         "description": f"Completed goal: {goal['goal']}",
                         "timestamp": datetime.now()
                     })
+                    mark_changed(self, "achievements")
                 break
 
 class UserManager:
     """Enhanced user management system"""
     
-    def __init__(self):
-        if 'users_db' not in st.session_state:
-            st.session_state.users_db = {}
-        if 'current_user' not in st.session_state:
-            st.session_state.current_user = None
-        if 'user_authenticated' not in st.session_state:
-            st.session_state.user_authenticated = False
+    def __init__(self, repository: Optional[UserRepository] = None, state=None):
+        # Streamlit's session state in the UI; a SessionState in the API
+        self.state = resolve_state(state)
+        self.repository = repository or get_user_repository(self.state)
+        if 'current_user' not in self.state:
+            self.state.current_user = None
+        if 'user_authenticated' not in self.state:
+            self.state.user_authenticated = False
     
     def hash_password(self, password: str) -> str:
         """Hash password for secure storage"""
         return hashlib.sha256(password.encode()).hexdigest()
     
     def create_user(self, username: str, email: str, password: str) -> bool:
-        """Create a new user account"""
-        if username in st.session_state.users_db:
+        """Create a new account with its profile; False if the username is taken"""
+        if self.repository.get_auth(username) is not None:
             return False
         
         user_id = str(uuid.uuid4())
         password_hash = self.hash_password(password)
-        
-        # Store authentication data
-        st.session_state.users_db[username] = {
-            "user_id": user_id,
-            "email": email,
-            "password_hash": password_hash,
-            "created_at": datetime.now()
-        }
-        
-        # Create user profile
         profile = UserProfile(user_id, username, email)
-        st.session_state[f"profile_{user_id}"] = profile
         
-        return True
+        return self.repository.create_user(username, email, password_hash, profile)
     
     def authenticate_user(self, username: str, password: str) -> bool:
         """Authenticate user login"""
-        if username not in st.session_state.users_db:
+        user_data = self.repository.get_auth(username)
+        if user_data is None:
             return False
         
-        user_data = st.session_state.users_db[username]
         password_hash = self.hash_password(password)
         
         if user_data["password_hash"] == password_hash:
-            st.session_state.current_user = user_data["user_id"]
-            st.session_state.user_authenticated = True
+            self.state.current_user = user_data["user_id"]
+            self.state.user_authenticated = True
             
             # Update last login
             profile = self.get_current_user_profile()
             if profile:
                 profile.last_login = datetime.now()
+                self.save_profile(profile)
             
             return True
         
         return False
     
+    def start_demo_session(self):
+        """Log in as a throwaway demo user that is never written to storage"""
+        demo_id = "demo_" + str(uuid.uuid4())[:8]
+        self.state.current_user = demo_id
+        self.state.user_authenticated = True
+        self.state.current_profile = UserProfile(demo_id, "Demo User", "demo@example.com")
+    
     def get_current_user_profile(self) -> Optional[UserProfile]:
         """Get current user's profile"""
-        if not st.session_state.user_authenticated or not st.session_state.current_user:
+        if not self.state.user_authenticated or not self.state.current_user:
             return None
         
-        return st.session_state.get(f"profile_{st.session_state.current_user}")
+        # Only the logged-in user's profile is kept in the session
+        profile = self.state.get('current_profile')
+        if profile is None or profile.user_id != self.state.current_user:
+            profile = self.repository.get_profile(self.state.current_user)
+            self.state.current_profile = profile
+        return profile
+    
+    def save_profile(self, profile: UserProfile) -> bool:
+        """Persist changes made to a profile"""
+        return self.repository.save_profile(profile)
     
     def logout_user(self):
         """Logout current user"""
-        st.session_state.user_authenticated = False
-        st.session_state.current_user = None
+        self.state.user_authenticated = False
+        self.state.current_user = None
+        self.state.current_profile = None
     
     def is_new_user(self) -> bool:
         """Check if current user is new (less than 1 day old)"""
@@ -313,10 +290,7 @@ def render_login_page():
         with col2:
             if st.button("Demo Mode", type="secondary", use_container_width=True):
                 # Create a demo user
-                demo_id = "demo_" + str(uuid.uuid4())[:8]
-                st.session_state.current_user = demo_id
-                st.session_state.user_authenticated = True
-                st.session_state[f"profile_{demo_id}"] = UserProfile(demo_id, "Demo User", "demo@example.com")
+                user_manager.start_demo_session()
                 st.success("Entered demo mode!")
                 st.rerun()
     
@@ -411,6 +385,7 @@ def render_depression_assessment():
     if submitted:
         # Save assessment
         assessment_result = profile.add_depression_assessment(responses, additional_notes)
+        user_manager.save_profile(profile)
         
         # Clear retake flag
         if 'retake_assessment' in st.session_state:
@@ -471,6 +446,35 @@ def display_assessment_results(assessment_result: Dict):
         </div>
         """, unsafe_allow_html=True)
 
+def assessment_chart(profile: UserProfile):
+    """The PHQ-9 history chart, rebuilt only when a new assessment is saved"""
+    assessments = profile.depression_assessments
+    if not assessments:
+        return None
+    # Assessments are only ever appended, so count and last timestamp identify the data
+    key = (profile.user_id, len(assessments), assessments[-1]['timestamp'], 'phq9_history', 'all')
+    return get_figure_cache().get_or_build(key, lambda: build_assessment_chart(
+        [a['timestamp'] for a in assessments], [a['total_score'] for a in assessments]))
+
+@timed("mindcare_figure_build_seconds", "Plotly figure construction", figure="phq9_history")
+def build_assessment_chart(timestamps, scores):
+    """PHQ-9 scores over time with the severity bands shaded"""
+    import plotly.express as px
+    x, y = lttb(timestamps, scores)
+    fig = px.line(x=x, y=y, 
+                 title='Depression Assessment Scores Over Time',
+                 labels={'y': 'PHQ-9 Score', 'x': 'Date'})
+    
+    # Add severity level background colors
+    fig.add_hrect(y0=0, y1=4, fillcolor="green", opacity=0.1, annotation_text="Minimal")
+    fig.add_hrect(y0=5, y1=9, fillcolor="yellow", opacity=0.1, annotation_text="Mild")
+    fig.add_hrect(y0=10, y1=14, fillcolor="orange", opacity=0.1, annotation_text="Moderate")
+    fig.add_hrect(y0=15, y1=19, fillcolor="red", opacity=0.1, annotation_text="Mod. Severe")
+    fig.add_hrect(y0=20, y1=27, fillcolor="darkred", opacity=0.1, annotation_text="Severe")
+    
+    fig.update_layout(height=400)
+    return fig
+
 def render_user_dashboard():
     """Render user dashboard with personalized insights"""
     user_manager = UserManager()
@@ -522,21 +526,8 @@ def render_user_dashboard():
     if profile.depression_assessments:
         st.subheader("📊 Your Progress Over Time")
         
-        df = profile.get_depression_history()
-        
-        if not df.empty:
-            fig = px.line(df, x='date', y='score', 
-                         title='Depression Assessment Scores Over Time',
-                         labels={'score': 'PHQ-9 Score', 'date': 'Date'})
-            
-            # Add severity level background colors
-            fig.add_hrect(y0=0, y1=4, fillcolor="green", opacity=0.1, annotation_text="Minimal")
-            fig.add_hrect(y0=5, y1=9, fillcolor="yellow", opacity=0.1, annotation_text="Mild")
-            fig.add_hrect(y0=10, y1=14, fillcolor="orange", opacity=0.1, annotation_text="Moderate")
-            fig.add_hrect(y0=15, y1=19, fillcolor="red", opacity=0.1, annotation_text="Mod. Severe")
-            fig.add_hrect(y0=20, y1=27, fillcolor="darkred", opacity=0.1, annotation_text="Severe")
-            
-            fig.update_layout(height=400)
+        fig = assessment_chart(profile)
+        if fig:
             st.plotly_chart(fig, use_container_width=True)
     
     # Goals section
@@ -579,6 +570,7 @@ def render_user_dashboard():
         
         if st.button("Save Goals") and selected_goals:
             profile.set_goals(selected_goals)
+            user_manager.save_profile(profile)
             st.session_state.setting_goals = False
             st.success("Goals saved successfully!")
             st.rerun()
@@ -0,0 +1,298 @@
+# user_store.py - Pluggable storage for user accounts and profiles
+import json
+import os
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from state_backend import resolve_state
+
+# Profile collections that are only read from storage when first accessed
+LAZY_COLLECTIONS = ("depression_assessments", "anxiety_assessments", "goals", "achievements")
+
+# Profile attributes stored together as one JSON document
+PROFILE_SETTINGS = (
+    "preferred_techniques", "crisis_contacts", "mood_patterns",
+    "journal_insights", "technique_usage", "privacy_settings",
+)
+
+_DATETIME_KEYS = ("timestamp", "created_at")
+
+
+class LazyCollection:
+    """Profile attribute that loads its list from storage on first access
+
+    Assigning to the attribute (as ``UserProfile.__init__`` does) marks it
+    loaded and changed, so freshly created profiles never touch storage.
+    Profiles read from a repository get a ``_collection_loader`` and only
+    pay for the collections a page actually uses. Changes made in place
+    are recorded with ``mark_changed``.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.slot = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if self.slot not in instance.__dict__:
+            loader = instance.__dict__.get("_collection_loader")
+            instance.__dict__[self.slot] = loader(self.name) if loader else []
+        return instance.__dict__[self.slot]
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.slot] = value
+        mark_changed(instance, self.name)
+
+
+def mark_changed(profile, *collections: str):
+    """Record that lazy collections of a profile were changed and need saving"""
+    profile.__dict__.setdefault("_changed_collections", set()).update(collections)
+
+
+def changed_collections(profile) -> List[str]:
+    """Names of the lazy collections changed since the profile was loaded or last saved"""
+    changed = profile.__dict__.get("_changed_collections", ())
+    return [name for name in LAZY_COLLECTIONS if name in changed]
+
+
+def _encode_item(item: Dict) -> str:
+    return json.dumps(item, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+
+
+def _decode_item(payload: str) -> Dict:
+    item = json.loads(payload)
+    for key in _DATETIME_KEYS:
+        if isinstance(item.get(key), str):
+            item[key] = datetime.fromisoformat(item[key])
+    return item
+
+
+class UserRepository(ABC):
+    """Interface every user storage backend implements"""
+
+    @abstractmethod
+    def get_auth(self, username: str) -> Optional[Dict]:
+        """Return {'user_id', 'email', 'password_hash', 'created_at'} or None"""
+
+    @abstractmethod
+    def create_user(self, username: str, email: str, password_hash: str, profile) -> bool:
+        """Store a new account with its profile; False if the username is taken"""
+
+    @abstractmethod
+    def get_profile(self, user_id: str):
+        """Return the stored profile, or None"""
+
+    @abstractmethod
+    def save_profile(self, profile) -> bool:
+        """Persist changes to an existing profile; False if it is not stored here"""
+
+
+class SessionStateUserRepository(UserRepository):
+    """Keeps accounts in the session state (lost when the session ends)"""
+
+    def __init__(self, state=None):
+        self.state = resolve_state(state)
+        if 'users_db' not in self.state:
+            self.state.users_db = {}
+
+    def get_auth(self, username):
+        return self.state.users_db.get(username)
+
+    def create_user(self, username, email, password_hash, profile):
+        if username in self.state.users_db:
+            return False
+        self.state.users_db[username] = {
+            "user_id": profile.user_id,
+            "email": email,
+            "password_hash": password_hash,
+            "created_at": profile.created_at
+        }
+        self.state[f"profile_{profile.user_id}"] = profile
+        return True
+
+    def get_profile(self, user_id):
+        return self.state.get(f"profile_{user_id}")
+
+    def save_profile(self, profile):
+        # Profiles are the live objects in session state already
+        return f"profile_{profile.user_id}" in self.state
+
+
+class SQLiteConnectionPool:
+    """Fixed-size pool of SQLite connections shared by Streamlit's script threads
+
+    Each connection is used by one thread at a time; WAL mode lets readers
+    proceed while another connection writes.
+    """
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self._pool = queue.Queue()
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success and rolls back on error"""
+        conn = self._pool.get()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+class SQLiteUserRepository(UserRepository):
+    """Durable accounts and profiles in a SQLite database (WAL mode)"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id TEXT PRIMARY KEY,
+        username TEXT NOT NULL UNIQUE,
+        email TEXT NOT NULL,
+        password_hash TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        last_login TEXT NOT NULL,
+        settings TEXT NOT NULL DEFAULT '{}'
+    );
+    CREATE TABLE IF NOT EXISTS profile_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+        collection TEXT NOT NULL,
+        payload TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_profile_items_user ON profile_items(user_id, collection, id);
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.pool = SQLiteConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def get_auth(self, username):
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT user_id, email, password_hash, created_at FROM users WHERE username = ?",
+                (username,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "user_id": row[0],
+            "email": row[1],
+            "password_hash": row[2],
+            "created_at": datetime.fromisoformat(row[3])
+        }
+
+    def create_user(self, username, email, password_hash, profile):
+        try:
+            with self.pool.connection() as conn:
+                conn.execute(
+                    "INSERT INTO users (user_id, username, email, password_hash, created_at, last_login, settings)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (profile.user_id, username, email, password_hash,
+                     profile.created_at.isoformat(), profile.last_login.isoformat(),
+                     self._encode_settings(profile))
+                )
+                self._write_collections(conn, profile)
+        except sqlite3.IntegrityError:
+            return False
+        profile._changed_collections = set()
+        return True
+
+    def get_profile(self, user_id):
+        from user_integrated import UserProfile
+
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT username, email, created_at, last_login, settings FROM users WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        profile = UserProfile.__new__(UserProfile)
+        profile.user_id = user_id
+        profile.username = row[0]
+        profile.email = row[1]
+        profile.created_at = datetime.fromisoformat(row[2])
+        profile.last_login = datetime.fromisoformat(row[3])
+        for name, value in json.loads(row[4]).items():
+            setattr(profile, name, value)
+        profile._collection_loader = self._collection_loader(user_id)
+        return profile
+
+    def save_profile(self, profile):
+        with self.pool.connection() as conn:
+            updated = conn.execute(
+                "UPDATE users SET email = ?, last_login = ?, settings = ? WHERE user_id = ?",
+                (profile.email, profile.last_login.isoformat(), self._encode_settings(profile), profile.user_id)
+            ).rowcount
+            if updated:
+                self._write_collections(conn, profile)
+        if updated:
+            profile._changed_collections = set()
+        return bool(updated)
+
+    def _collection_loader(self, user_id) -> Callable[[str], List[Dict]]:
+        def load(collection):
+            with self.pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT payload FROM profile_items WHERE user_id = ? AND collection = ? ORDER BY id",
+                    (user_id, collection)
+                ).fetchall()
+            return [_decode_item(payload) for (payload,) in rows]
+        return load
+
+    def _write_collections(self, conn, profile):
+        # Unchanged collections are left alone, e.g. when a login only updates last_login
+        for collection in changed_collections(profile):
+            conn.execute(
+                "DELETE FROM profile_items WHERE user_id = ? AND collection = ?",
+                (profile.user_id, collection)
+            )
+            conn.executemany(
+                "INSERT INTO profile_items (user_id, collection, payload) VALUES (?, ?, ?)",
+                [(profile.user_id, collection, _encode_item(item)) for item in getattr(profile, collection)]
+            )
+
+    @staticmethod
+    def _encode_settings(profile) -> str:
+        return json.dumps({name: getattr(profile, name) for name in PROFILE_SETTINGS if hasattr(profile, name)})
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_user_repository(state=None) -> UserRepository:
+    """SQLite repository when MINDCARE_USER_DB is set, session state otherwise"""
+    global _repository
+    path = os.environ.get("MINDCARE_USER_DB")
+    if not path:
+        return SessionStateUserRepository(state)
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = SQLiteUserRepository(path)
+    return _repository